@@ -9,6 +9,7 @@ This module provides:
 """
 
 import os
+from datetime import datetime, timezone
 from typing import Optional
 
 import httpx
@@ -249,6 +250,23 @@ async def get_current_user_id_optional(
         )
 
 
+def _login_time(payload: dict) -> Optional[datetime]:
+    """
+    When the session of a JWT was signed in.
+
+    Supabase lists the sign-in methods in 'amr' with their timestamps; refreshed
+    tokens keep them, so this only changes on a real login. Falls back to 'iat'.
+    """
+    timestamps = [entry["timestamp"] for entry in payload.get("amr") or [] if isinstance(entry, dict) and "timestamp" in entry]
+    if not timestamps and "iat" not in payload:
+        return None
+    return datetime.fromtimestamp(max(timestamps) if timestamps else payload["iat"], tz=timezone.utc)
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
 async def get_current_user_id(current_user: dict = Depends(get_current_user)) -> int:
     """
     Extract integer user ID from JWT payload and validate against database.
@@ -284,6 +302,7 @@ async def get_current_user_id(current_user: dict = Depends(get_current_user)) ->
     from dependencies import get_db as _get_db
     from models import User
     from sqlalchemy.orm import Session
+    from write_behind import write_behind
 
     try:
         user_sub = current_user["sub"]
@@ -310,6 +329,11 @@ async def get_current_user_id(current_user: dict = Depends(get_current_user)) ->
                     detail="User not found in database",
                 )
 
+            # Only a new sign-in moves last_login (buffered, not committed here)
+            logged_in_at = _login_time(current_user)
+            if logged_in_at is not None and (user.last_login is None or _as_utc(user.last_login) < logged_in_at):
+                write_behind.record("user_last_login", user.id, logged_in_at)
+
             return user.id
         finally:
             db.close()
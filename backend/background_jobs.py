@@ -0,0 +1,153 @@
+"""
+Background jobs
+
+Periodic maintenance tasks (counter reconciliation, ...) run inside the API
+process. Each run gets its own database session and executes in a worker
+thread, so the event loop is never blocked by a long statement.
+
+Jobs are registered by name (registering twice replaces the job) and started
+/ stopped from the FastAPI lifespan in main.py.
+
+Tracked jobs are one-off tasks started by a request (account deletion, ...).
+Their status and progress live in the background_jobs table, so any worker
+can answer GET /api/v1/jobs/{job_id}.
+"""
+
+import asyncio
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from models import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PeriodicJob:
+    """A function run every interval_seconds with a fresh database session"""
+
+    name: str
+    interval_seconds: float
+    func: Callable[[Session], None]
+
+
+_jobs: Dict[str, PeriodicJob] = {}
+_tasks: List[asyncio.Task] = []
+
+
+def register_periodic_job(name: str, interval_seconds: float, func: Callable[[Session], None]) -> None:
+    """
+    Register a periodic job (started by start_background_jobs).
+
+    Args:
+        name: Unique job name (used in logs)
+        interval_seconds: Delay between runs
+        func: Function receiving a database session; it must commit its own work
+    """
+    _jobs[name] = PeriodicJob(name=name, interval_seconds=interval_seconds, func=func)
+
+
+def run_job(job: PeriodicJob) -> None:
+    """Run a job once with its own session (rolls back and logs on error)"""
+    db = SessionLocal()
+    try:
+        job.func(db)
+    except Exception:
+        db.rollback()
+        logger.exception(f"❌ Background job '{job.name}' failed")
+    finally:
+        db.close()
+
+
+async def _run_periodically(job: PeriodicJob) -> None:
+    while True:
+        await asyncio.sleep(job.interval_seconds)
+        await asyncio.to_thread(run_job, job)
+
+
+def start_background_jobs() -> None:
+    """Start every registered job (call from the lifespan startup)"""
+    for job in _jobs.values():
+        _tasks.append(asyncio.create_task(_run_periodically(job), name=job.name))
+        logger.info(f"⏱️  Background job '{job.name}' scheduled every {job.interval_seconds}s")
+
+
+async def stop_background_jobs() -> None:
+    """Cancel running jobs (call from the lifespan shutdown)"""
+    for task in _tasks:
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
+
+
+# ============================================================================
+# Tracked one-off jobs
+# ============================================================================
+
+
+class JobReporter:
+    """Progress updates of a tracked job (written and committed on the job's session)"""
+
+    def __init__(self, db: Session, job_id: str):
+        self.db = db
+        self.job_id = job_id
+
+    def _set(self, **values) -> None:
+        self.db.execute(update(BackgroundJob).where(BackgroundJob.id == self.job_id).values(**values))
+        self.db.commit()
+
+    def stage(self, stage: str, total: Optional[int] = None) -> None:
+        """Start a new stage (progress goes back to 0)"""
+        self._set(stage=stage, progress=0, total=total)
+
+    def progress(self, progress: int) -> None:
+        """Rows processed so far in the current stage"""
+        self._set(progress=progress)
+
+
+def create_tracked_job(db: Session, *, kind: str, requested_by: Optional[int]) -> BackgroundJob:
+    """
+    Create the pending row of a tracked job (run it with run_tracked_job).
+
+    Args:
+        db: Database session
+        kind: Job kind (e.g. 'delete_account')
+        requested_by: User who started it
+
+    Returns:
+        BackgroundJob with its random id
+    """
+    job = BackgroundJob(id=uuid.uuid4().hex, kind=kind, requested_by=requested_by, status="pending", progress=0)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def run_tracked_job(job_id: str, func: Callable[[Session, JobReporter], Optional[Dict[str, Any]]]) -> None:
+    """
+    Run a tracked job with its own session, recording status and result.
+
+    Args:
+        job_id: ID returned by create_tracked_job
+        func: Receives a session and a JobReporter; returns the job result (JSON)
+    """
+    db = SessionLocal()
+    reporter = JobReporter(db, job_id)
+    try:
+        reporter._set(status="running")
+        result = func(db, reporter)
+        reporter._set(status="done", result=result, finished_at=datetime.now(timezone.utc))
+    except Exception as e:
+        db.rollback()
+        logger.exception(f"❌ Tracked job {job_id} failed")
+        reporter._set(status="failed", error=str(e), finished_at=datetime.now(timezone.utc))
+    finally:
+        db.close()
@@ -16,7 +16,10 @@ Usage example:
 """
 
 from crud.crud_calendar import calendar, calendar_membership
+from crud.crud_contact_link import contact_link
+from crud.crud_counters import event_counter, user_counter
 from crud.crud_event import event
+from crud.crud_event_access import event_access
 from crud.crud_event_ban import event_ban
 from crud.crud_event_cancellation import event_cancellation
 from crud.crud_group import group
@@ -30,9 +33,11 @@ from crud.crud_user_contact import user_contact
 __all__ = [
     "user",
     "event",
+    "event_access",
     "calendar",
     "calendar_membership",
     "user_contact",
+    "contact_link",
     "event_interaction",
     "user_block",
     "event_ban",
@@ -40,4 +45,6 @@ __all__ = [
     "group_membership",
     "recurring_config",
     "event_cancellation",
+    "event_counter",
+    "user_counter",
 ]
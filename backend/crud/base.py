@@ -5,14 +5,90 @@ Provides generic CRUD operations that can be reused across all models.
 Uses SQLAlchemy ORM for database access with optimized queries.
 """
 
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from collections import namedtuple
+from typing import Any, Dict, Generic, List, Optional, Tuple, Type, TypeVar, Union
 
 from pydantic import BaseModel
 from sqlalchemy import func
+from sqlalchemy.engine import Connection
 from sqlalchemy.orm import Session
 
 from database import Base
 
+
+def dialect_insert(db: Union[Session, Connection], model):
+    """
+    Build an INSERT construct for the dialect bound to the session (or connection).
+
+    PostgreSQL (production) and SQLite (tests) both support
+    ``INSERT ... ON CONFLICT``, but each exposes it through its own
+    ``insert`` construct. Bulk upserts should go through this helper.
+
+    Args:
+        db: Database session, or a Connection (e.g. inside mapper hooks)
+        model: SQLAlchemy model class or Table
+
+    Returns:
+        Dialect-specific Insert statement
+    """
+    dialect = db.dialect if isinstance(db, Connection) else db.get_bind().dialect
+    if dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
+
+
+def keyset_paginate(query, id_column, *, cursor: Optional[int] = None, limit: int = 50, with_total: bool = False) -> Tuple[List[Any], Optional[int], Optional[int]]:
+    """
+    Cursor (keyset) pagination on an increasing integer column.
+
+    The cursor is the id of the last row of the previous page, so deep pages
+    cost the same as the first one (no OFFSET scan). On the first page
+    (cursor is None) with_total adds COUNT(*) OVER () to the same statement
+    to return the number of rows matching the query.
+
+    Args:
+        query: Query with filters applied (without ordering or limit)
+        id_column: Column used as cursor; the first entity/column of each row must carry it
+        cursor: Return rows with id_column > cursor
+        limit: Page size
+        with_total: Also return the total number of matching rows (first page only)
+
+    Returns:
+        Tuple of (rows, next_cursor or None if last page, total or None)
+    """
+    names = [description["name"] or "_" for description in query.column_descriptions]
+    single_entity = len(names) == 1
+    with_total = with_total and cursor is None
+
+    if cursor is not None:
+        query = query.filter(id_column > cursor)
+    if with_total:
+        # Window count is evaluated before LIMIT, over every matching row
+        query = query.add_columns(func.count().over().label("total_count"))
+
+    rows = query.order_by(id_column).limit(limit + 1).all()
+
+    total = None
+    if with_total:
+        total = rows[0][-1] if rows else 0
+        if single_entity:
+            rows = [row[0] for row in rows]
+        else:
+            # Drop the count column, keeping attribute access by label
+            page_row = namedtuple("PageRow", names, rename=True)
+            rows = [page_row(*row[:-1]) for row in rows]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        first = rows[-1] if single_entity else rows[-1][0]
+        next_cursor = first if isinstance(first, int) else first.id
+
+    return rows, next_cursor, total
+
+
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
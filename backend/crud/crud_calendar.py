@@ -3,10 +3,11 @@ CRUD operations for Calendar and CalendarMembership models
 """
 
 from typing import List, Optional
-from sqlalchemy import or_
+from sqlalchemy import delete, or_, select, update
 from sqlalchemy.orm import Session
 from crud.base import CRUDBase
-from models import Calendar, CalendarMembership
+from crud.crud_event import event as event_crud
+from models import Calendar, CalendarMembership, CalendarSubscription, Event, EventAccess
 from schemas import CalendarBase, CalendarCreate, CalendarMembershipBase, CalendarMembershipCreate
 
 
@@ -169,7 +170,7 @@ class CRUDCalendar(CRUDBase[Calendar, CalendarCreate, CalendarBase]):
         Returns:
             List of calendars
         """
-        from models import User, CalendarSubscription
+        from models import User
 
         # Build query with UNION for owned, membership, and subscription calendars
         # 1. Owned calendars
@@ -187,6 +188,40 @@ class CRUDCalendar(CRUDBase[Calendar, CalendarCreate, CalendarBase]):
         # Apply pagination
         return combined_query.offset(skip).limit(limit).all()
 
+    def delete_with_events(self, db: Session, *, calendar_id: int, delete_events: bool = False) -> dict:
+        """
+        Delete a calendar and handle all of its events in one transaction.
+
+        Set-based, so the cost doesn't depend on the number of events:
+        - delete_events=True: the events are soft-deleted (one UPDATE; the purge
+          job removes them with their interactions later)
+        - delete_events=False: the events are detached (UPDATE ... SET calendar_id = NULL)
+          and lose the access granted through the calendar
+        Memberships and subscriptions are deleted with one statement each.
+
+        Args:
+            db: Database session
+            calendar_id: Calendar ID
+            delete_events: Delete the events instead of detaching them
+
+        Returns:
+            Dict with the number of events deleted/detached, memberships and subscriptions deleted
+        """
+        calendar_events = select(Event.id).where(Event.calendar_id == calendar_id)
+        counts = {"events_deleted": 0, "events_detached": 0}
+
+        if delete_events:
+            counts["events_deleted"] = event_crud.soft_delete(db, event_ids=calendar_events)
+        else:
+            db.execute(delete(EventAccess).where(EventAccess.via.in_(["calendar", "subscribed_calendar"]), EventAccess.event_id.in_(calendar_events)))
+            counts["events_detached"] = db.execute(update(Event).where(Event.calendar_id == calendar_id).values(calendar_id=None)).rowcount
+
+        counts["memberships_deleted"] = db.execute(delete(CalendarMembership).where(CalendarMembership.calendar_id == calendar_id)).rowcount
+        counts["subscriptions_deleted"] = db.execute(delete(CalendarSubscription).where(CalendarSubscription.calendar_id == calendar_id)).rowcount
+        db.execute(delete(Calendar).where(Calendar.id == calendar_id))
+        db.commit()
+        return counts
+
 
 class CRUDCalendarMembership(CRUDBase[CalendarMembership, CalendarMembershipCreate, CalendarMembershipBase]):
     """CRUD operations for CalendarMembership model with specific methods"""
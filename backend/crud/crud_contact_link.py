@@ -0,0 +1,119 @@
+"""
+CRUD operations for UserContactLink model (reverse contact index)
+"""
+
+from typing import List, Set, Tuple
+
+from sqlalchemy import and_, exists, or_, select
+from sqlalchemy.orm import Session, aliased
+
+from crud.base import CRUDBase, dialect_insert
+from models import User, UserContact, UserContactLink
+from schemas import UserContactLinkResponse
+from social_graph import stash_changes
+
+
+class CRUDContactLink(CRUDBase[UserContactLink, UserContactLinkResponse, UserContactLinkResponse]):
+    """
+    CRUD operations for the reverse contact index.
+
+    Rows are derived from user_contacts and never written directly by the API.
+    The refresh methods don't commit: they run inside the caller's transaction
+    and queue the matching social graph updates (applied after commit).
+    """
+
+    def refresh_for_owner(self, db: Session, *, owner_id: int) -> None:
+        """
+        Rebuild the links of one address book after a contact sync.
+
+        Args:
+            db: Database session
+            owner_id: ID of the address book owner
+        """
+        registered = select(UserContact.registered_user_id, UserContact.owner_id).where(UserContact.owner_id == owner_id, UserContact.registered_user_id.isnot(None), UserContact.registered_user_id != owner_id).distinct()
+        db.execute(dialect_insert(db, UserContactLink).from_select(["registered_user_id", "owner_id"], registered).on_conflict_do_nothing(index_elements=["registered_user_id", "owner_id"]))
+
+        # Contacts that no longer point to a registered user
+        still_linked = exists().where(UserContact.owner_id == owner_id, UserContact.registered_user_id == UserContactLink.registered_user_id)
+        db.query(UserContactLink).filter(UserContactLink.owner_id == owner_id, ~still_linked).delete(synchronize_session=False)
+
+        self._refresh_mutual(db, user_id=owner_id)
+
+        registered_ids = db.scalars(select(UserContactLink.registered_user_id).where(UserContactLink.owner_id == owner_id)).all()
+        stash_changes(db, [("set_row", "contact", owner_id, {registered_id: 1 for registered_id in registered_ids})])
+
+    def refresh_for_registered_user(self, db: Session, *, user_id: int) -> None:
+        """
+        Add the links of a newly registered user (everyone who has their number).
+
+        Args:
+            db: Database session
+            user_id: ID of the registered user
+        """
+        owners = select(UserContact.registered_user_id, UserContact.owner_id).where(UserContact.registered_user_id == user_id, UserContact.owner_id != user_id).distinct()
+        db.execute(dialect_insert(db, UserContactLink).from_select(["registered_user_id", "owner_id"], owners).on_conflict_do_nothing(index_elements=["registered_user_id", "owner_id"]))
+
+        self._refresh_mutual(db, user_id=user_id)
+
+        owner_ids = db.scalars(select(UserContactLink.owner_id).where(UserContactLink.registered_user_id == user_id)).all()
+        stash_changes(db, [("set_edge", "contact", owner_id, user_id, 1) for owner_id in owner_ids])
+
+    def rebuild(self, db: Session) -> None:
+        """
+        Rebuild the whole reverse index from user_contacts (bulk, used after seeding).
+
+        Args:
+            db: Database session
+        """
+        db.query(UserContactLink).delete(synchronize_session=False)
+
+        registered = select(UserContact.registered_user_id, UserContact.owner_id).where(UserContact.registered_user_id.isnot(None), UserContact.registered_user_id != UserContact.owner_id).distinct()
+        db.execute(dialect_insert(db, UserContactLink).from_select(["registered_user_id", "owner_id"], registered).on_conflict_do_nothing(index_elements=["registered_user_id", "owner_id"]))
+
+        reverse = aliased(UserContactLink)
+        has_reverse = exists().where(reverse.owner_id == UserContactLink.registered_user_id, reverse.registered_user_id == UserContactLink.owner_id)
+        db.query(UserContactLink).update({"is_mutual": has_reverse}, synchronize_session=False)
+
+    def _refresh_mutual(self, db: Session, *, user_id: int) -> None:
+        """Recompute is_mutual for every link involving a user (single UPDATE)"""
+        reverse = aliased(UserContactLink)
+        has_reverse = exists().where(reverse.owner_id == UserContactLink.registered_user_id, reverse.registered_user_id == UserContactLink.owner_id)
+        db.query(UserContactLink).filter(or_(UserContactLink.owner_id == user_id, UserContactLink.registered_user_id == user_id)).update({"is_mutual": has_reverse}, synchronize_session=False)
+
+    def get_contact_ids(self, db: Session, *, owner_id: int) -> Set[int]:
+        """
+        Get the registered users in an address book (single index scan).
+
+        Args:
+            db: Database session
+            owner_id: ID of the address book owner
+
+        Returns:
+            Set of registered user IDs
+        """
+        return set(db.scalars(select(UserContactLink.registered_user_id).where(UserContactLink.owner_id == owner_id)).all())
+
+    def get_known_by(self, db: Session, *, user_id: int, mutual_only: bool = False, skip: int = 0, limit: int = 100) -> List[Tuple[User, bool]]:
+        """
+        Get the users that have a given user in their address book.
+
+        Args:
+            db: Database session
+            user_id: ID of the registered user ("who knows me")
+            mutual_only: If True, only users that are also in user_id's contacts
+            skip: Number of records to skip
+            limit: Maximum number of records
+
+        Returns:
+            List of (User, is_mutual) tuples
+        """
+        query = db.query(User, UserContactLink.is_mutual).join(UserContactLink, and_(UserContactLink.owner_id == User.id, UserContactLink.registered_user_id == user_id))
+
+        if mutual_only:
+            query = query.filter(UserContactLink.is_mutual == True)
+
+        return query.order_by(User.display_name, User.id).offset(skip).limit(limit).all()
+
+
+# Singleton instance
+contact_link = CRUDContactLink(UserContactLink)
@@ -0,0 +1,162 @@
+"""
+CRUD operations for denormalized counters (EventCounter, UserCounter)
+"""
+
+import logging
+import os
+from typing import Dict, List, Optional
+
+from sqlalchemy import case, distinct, func, or_, select, true
+from sqlalchemy.orm import Session
+
+from crud.base import CRUDBase, dialect_insert
+from models import Event, EventCounter, EventInteraction, User, UserCounter
+from schemas import EventCounterResponse, UserCounterResponse
+
+logger = logging.getLogger(__name__)
+
+# Interval of the background reconciliation job (seconds)
+COUNTER_RECONCILE_INTERVAL_SECONDS = int(os.getenv("COUNTER_RECONCILE_INTERVAL_SECONDS", "900"))
+
+EVENT_COUNTER_COLUMNS = ["joined_count", "subscribed_count", "invited_count", "invited_accepted_count", "invited_pending_count", "invited_rejected_count"]
+USER_COUNTER_COLUMNS = ["total_events_count", "subscribers_count"]
+
+
+def _upsert_changed(db: Session, model, key: str, columns: List[str], source) -> int:
+    """
+    INSERT ... SELECT ... ON CONFLICT DO UPDATE, only touching rows whose values drifted.
+
+    Returns:
+        Number of inserted or repaired rows
+    """
+    stmt = dialect_insert(db, model).from_select([key] + columns, source)
+    table = model.__table__
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[key],
+        set_={**{column: stmt.excluded[column] for column in columns}, "updated_at": func.now()},
+        where=or_(*(table.c[column] != stmt.excluded[column] for column in columns)),
+    )
+    return db.execute(stmt).rowcount
+
+
+def invitation_stats_from_counter(counter: EventCounter) -> dict:
+    """Invitation statistics (same keys as get_invitation_stats) from an event counter row"""
+    return {"total_invited": counter.invited_count, "accepted": counter.invited_accepted_count, "pending": counter.invited_pending_count, "rejected": counter.invited_rejected_count}
+
+
+class CRUDEventCounter(CRUDBase[EventCounter, EventCounterResponse, EventCounterResponse]):
+    """
+    Per-event counters.
+
+    Kept up to date by the update_event_counters trigger (PostgreSQL) and
+    repaired by reconcile(). Readers must fall back to live queries for events
+    without a counter row.
+    """
+
+    def get_by_event_ids(self, db: Session, *, event_ids: List[int]) -> Dict[int, EventCounter]:
+        """
+        Get the counter rows of several events.
+
+        Args:
+            db: Database session
+            event_ids: List of event IDs
+
+        Returns:
+            Dict mapping event_id to EventCounter (events without a row are missing)
+        """
+        if not event_ids:
+            return {}
+        return {counter.event_id: counter for counter in db.query(EventCounter).filter(EventCounter.event_id.in_(event_ids)).all()}
+
+    def reconcile(self, db: Session, *, event_ids: Optional[List[int]] = None) -> int:
+        """
+        Recompute event counters from event_interactions and repair drift.
+
+        Single INSERT ... SELECT ... GROUP BY statement. Doesn't commit.
+
+        Args:
+            db: Database session
+            event_ids: Only reconcile these events (all events if None)
+
+        Returns:
+            Number of counter rows inserted or repaired
+        """
+        is_invited = EventInteraction.interaction_type == "invited"
+        source = (
+            select(
+                Event.id,
+                func.count(case((EventInteraction.interaction_type == "joined", 1))),
+                func.count(case((EventInteraction.interaction_type == "subscribed", 1))),
+                func.count(case((is_invited, 1))),
+                func.count(case((is_invited & (EventInteraction.status == "accepted"), 1))),
+                func.count(case((is_invited & (EventInteraction.status == "pending"), 1))),
+                func.count(case((is_invited & (EventInteraction.status == "rejected"), 1))),
+            )
+            .select_from(Event)
+            .outerjoin(EventInteraction, EventInteraction.event_id == Event.id)
+            # WHERE is required by SQLite to parse INSERT ... SELECT ... ON CONFLICT
+            .where(Event.id.in_(event_ids) if event_ids is not None else true())
+            .group_by(Event.id)
+        )
+        return _upsert_changed(db, EventCounter, "event_id", EVENT_COUNTER_COLUMNS, source)
+
+
+class CRUDUserCounter(CRUDBase[UserCounter, UserCounterResponse, UserCounterResponse]):
+    """
+    Per-user counters (as event owner).
+
+    total_events_count is kept by the update_user_event_counters trigger,
+    subscribers_count by update_event_counters. Repaired by reconcile().
+    """
+
+    def get_by_user(self, db: Session, *, user_id: int) -> Optional[UserCounter]:
+        """Get the counter row of a user (None if not computed yet)"""
+        return db.query(UserCounter).filter(UserCounter.user_id == user_id).first()
+
+    def reconcile(self, db: Session, *, user_ids: Optional[List[int]] = None) -> int:
+        """
+        Recompute user counters from events and event_interactions and repair drift.
+
+        Single INSERT ... SELECT statement over pre-aggregated subqueries. Doesn't commit.
+
+        Args:
+            db: Database session
+            user_ids: Only reconcile these users (all users if None)
+
+        Returns:
+            Number of counter rows inserted or repaired
+        """
+        events_per_owner = select(Event.owner_id, func.count(Event.id).label("total")).group_by(Event.owner_id).subquery()
+        subscribers_per_owner = (
+            select(Event.owner_id, func.count(distinct(EventInteraction.user_id)).label("total"))
+            .join(Event, Event.id == EventInteraction.event_id)
+            .where(EventInteraction.interaction_type == "subscribed")
+            .group_by(Event.owner_id)
+            .subquery()
+        )
+        source = (
+            select(User.id, func.coalesce(events_per_owner.c.total, 0), func.coalesce(subscribers_per_owner.c.total, 0))
+            .select_from(User)
+            .outerjoin(events_per_owner, events_per_owner.c.owner_id == User.id)
+            .outerjoin(subscribers_per_owner, subscribers_per_owner.c.owner_id == User.id)
+            .where(User.id.in_(user_ids) if user_ids is not None else true())
+        )
+        return _upsert_changed(db, UserCounter, "user_id", USER_COUNTER_COLUMNS, source)
+
+
+def reconcile_counters(db: Session) -> None:
+    """
+    Reconciliation job: repair drift of every event and user counter and commit.
+
+    Drift comes from writes that bypass the triggers (bulk loads before the
+    triggers exist, manual SQL) or races between concurrent subscriptions.
+    """
+    repaired_events = event_counter.reconcile(db)
+    repaired_users = user_counter.reconcile(db)
+    db.commit()
+    logger.info(f"Counters reconciled: {repaired_events} event rows, {repaired_users} user rows updated")
+
+
+# Singleton instances
+event_counter = CRUDEventCounter(EventCounter)
+user_counter = CRUDUserCounter(UserCounter)
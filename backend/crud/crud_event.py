@@ -2,15 +2,37 @@
 CRUD operations for Event model
 """
 
+import logging
+import os
 from datetime import datetime, timezone
-from typing import List, Optional, Set, Tuple
+from typing import List, Optional, Tuple, Union
 
-from sqlalchemy import and_, or_
-from sqlalchemy.orm import Session
+from sqlalchemy import Select, and_, case, delete, exists, func, literal, or_, select, union_all, update
+from sqlalchemy.event import listens_for
+from sqlalchemy.orm import Session, aliased, with_loader_criteria
 
 from crud.base import CRUDBase
-from models import CalendarMembership, Event, EventCancellation, EventInteraction, User
+from crud.crud_counters import invitation_stats_from_counter
+from crud.crud_event_access import event_access
+from crud.crud_event_cancellation import event_cancellation
+from crud.crud_user_block import user_block
+from models import CalendarMembership, Event, EventAccess, EventBan, EventCounter, EventInteraction, Group, GroupMembership, RecurringEventConfig, User, UserBlock, UserContactLink
 from schemas import EventBase, EventCreate
+from social_graph import social_graph, stash_events_removed
+
+logger = logging.getLogger(__name__)
+
+# Affinity weights used to rank available invitees
+INVITEE_SCORE_CONTACT = 3
+INVITEE_SCORE_SHARED_GROUP = 2
+INVITEE_SCORE_CO_ATTENDANCE = 1
+
+# Neighbours taken from the social graph before the rest of users (by id)
+MAX_GRAPH_INVITEE_CANDIDATES = 500
+
+# Soft-deleted events purged per batch / delay between purge runs
+EVENT_PURGE_BATCH_SIZE = int(os.getenv("EVENT_PURGE_BATCH_SIZE", "500"))
+EVENT_PURGE_INTERVAL_SECONDS = int(os.getenv("EVENT_PURGE_INTERVAL_SECONDS", "60"))
 
 
 class CRUDEvent(CRUDBase[Event, EventCreate, EventBase]):
@@ -96,63 +118,89 @@ class CRUDEvent(CRUDBase[Event, EventCreate, EventBase]):
         """
         Check if a user has access to an event.
 
-        Access granted if user is:
+        Access granted if user is (see crud_event_access):
         - Event owner
-        - Has EventInteraction (invited or subscribed)
+        - Has EventInteraction (invited, subscribed or joined)
         - Member of calendar containing the event (owner/admin with accepted status)
+        - Subscribed to the calendar containing the event (active subscription)
         """
-        event = self.get(db, id=event_id)
-        if not event:
-            return False
-
-        # Check 1: Is owner
-        if event.owner_id == user_id:
-            return True
-
-        # Check 2: Has EventInteraction
-        has_interaction = db.query(EventInteraction.id).filter(EventInteraction.event_id == event_id, EventInteraction.user_id == user_id).first() is not None
-        if has_interaction:
-            return True
-
-        # Check 3: Member of calendar containing the event
-        if event.calendar_id:
-            has_calendar_access = db.query(CalendarMembership.id).filter(CalendarMembership.calendar_id == event.calendar_id, CalendarMembership.user_id == user_id, CalendarMembership.status == "accepted", CalendarMembership.role.in_(["owner", "admin"])).first() is not None
-            if has_calendar_access:
-                return True
+        return event_access.has_access(db, user_id=user_id, event_id=event_id)
 
-        return False
-
-    def get_user_accessible_event_ids(self, db: Session, user_id: int) -> Set[int]:
+    def get_detail_context(self, db: Session, *, event_id: int, user_id: Optional[int] = None) -> Optional[dict]:
         """
-        Get all event IDs accessible to a user (owned, invited, subscribed, calendar).
+        Load the event, its owner and everything about the current user in one query.
 
-        Optimized single query to get all event IDs at once.
+        Used by the event detail endpoint. The current user's calendar
+        membership, interactions (with inviter) and subscription/block status
+        with the owner are outer-joined or computed as EXISTS columns, so the
+        access check and the per-user parts of the response need no extra
+        queries. Invitation stats come from the counter row, or from live
+        counts outer-joined in the same query for events without one.
 
         Args:
             db: Database session
-            user_id: User ID
+            event_id: Event ID
+            user_id: Current user ID (optional)
 
         Returns:
-            Set of event IDs
+            None if the event doesn't exist, otherwise a dict with:
+            - event: Event
+            - owner: User or None
+            - membership: current user's CalendarMembership in the event's calendar or None
+            - interactions: list of (EventInteraction, inviter User or None) of the current user, ordered by id
+            - has_access: bool (event_access row for the current user)
+            - is_subscribed_to_owner: bool
+            - is_blocked_with_owner: bool
+            - invitation_stats: dict with the get_invitation_stats keys (None if user_id is None)
         """
-        event_ids = set()
-
-        # Own events
-        own_events = db.query(Event.id).filter(Event.owner_id == user_id).all()
-        event_ids.update([e[0] for e in own_events])
-
-        # Subscribed and invited events
-        interactions = db.query(EventInteraction.event_id).filter(EventInteraction.user_id == user_id, or_(EventInteraction.interaction_type == "subscribed", and_(EventInteraction.interaction_type == "invited", EventInteraction.status == "accepted"))).all()
-        event_ids.update([i[0] for i in interactions])
-
-        # Calendar events (where user is owner or admin with accepted status)
-        calendar_ids = db.query(CalendarMembership.calendar_id).filter(CalendarMembership.user_id == user_id, CalendarMembership.status == "accepted", CalendarMembership.role.in_(["owner", "admin"])).all()
-
-        if calendar_ids:
-            calendar_events = db.query(Event.id).filter(Event.calendar_id.in_([c[0] for c in calendar_ids])).all()
-            event_ids.update([e[0] for e in calendar_events])
-
-        return event_ids
+        owner = aliased(User)
+
+        if user_id is None:
+            row = db.query(Event, owner).outerjoin(owner, owner.id == Event.owner_id).filter(Event.id == event_id).first()
+            if not row:
+                return None
+            return {"event": row[0], "owner": row[1], "membership": None, "interactions": [], "has_access": False, "is_subscribed_to_owner": False, "is_blocked_with_owner": False, "invitation_stats": None}
+
+        inviter = aliased(User)
+        owner_event = aliased(Event)
+        subscription = aliased(EventInteraction)
+
+        has_access = event_access.visible_filter(user_id=user_id)
+        is_subscribed = db.query(subscription.id).join(owner_event, subscription.event_id == owner_event.id).filter(owner_event.owner_id == Event.owner_id, subscription.user_id == user_id, subscription.interaction_type == "subscribed").exists()
+        is_blocked = db.query(UserBlock.id).filter(or_(and_(UserBlock.blocker_user_id == user_id, UserBlock.blocked_user_id == Event.owner_id), and_(UserBlock.blocker_user_id == Event.owner_id, UserBlock.blocked_user_id == user_id))).exists()
+        live_stats = (
+            select(
+                EventInteraction.event_id,
+                func.count(EventInteraction.id).label("total_invited"),
+                func.count(case((EventInteraction.status == "accepted", 1))).label("accepted"),
+                func.count(case((EventInteraction.status == "pending", 1))).label("pending"),
+                func.count(case((EventInteraction.status == "rejected", 1))).label("rejected"),
+            )
+            .where(EventInteraction.event_id == event_id, EventInteraction.interaction_type == "invited")
+            .group_by(EventInteraction.event_id)
+            .subquery()
+        )
+
+        rows = (
+            db.query(Event, owner, CalendarMembership, EventInteraction, inviter, has_access, is_subscribed, is_blocked, EventCounter, live_stats.c.total_invited, live_stats.c.accepted, live_stats.c.pending, live_stats.c.rejected)
+            .outerjoin(owner, owner.id == Event.owner_id)
+            .outerjoin(EventCounter, EventCounter.event_id == Event.id)
+            .outerjoin(live_stats, live_stats.c.event_id == Event.id)
+            .outerjoin(CalendarMembership, and_(CalendarMembership.calendar_id == Event.calendar_id, CalendarMembership.user_id == user_id))
+            .outerjoin(EventInteraction, and_(EventInteraction.event_id == Event.id, EventInteraction.user_id == user_id))
+            .outerjoin(inviter, inviter.id == EventInteraction.invited_by_user_id)
+            .filter(Event.id == event_id)
+            .order_by(EventInteraction.id)
+            .all()
+        )
+        if not rows:
+            return None
+
+        db_event, db_owner, membership, _, _, accessible, subscribed, blocked, counters, *live_counts = rows[0]
+        interactions = [(interaction, interaction_inviter) for _, _, _, interaction, interaction_inviter, *_ in rows if interaction is not None]
+        invitation_stats = invitation_stats_from_counter(counters) if counters else dict(zip(["total_invited", "accepted", "pending", "rejected"], [count or 0 for count in live_counts]))
+
+        return {"event": db_event, "owner": db_owner, "membership": membership, "interactions": interactions, "has_access": bool(accessible), "is_subscribed_to_owner": bool(subscribed), "is_blocked_with_owner": bool(blocked), "invitation_stats": invitation_stats}
 
     def create_with_validation(self, db: Session, *, obj_in: EventCreate) -> Tuple[Optional[Event], Optional[str], Optional[dict]]:
         """
@@ -225,6 +273,8 @@ class CRUDEvent(CRUDBase[Event, EventCreate, EventBase]):
         Delete an event and optionally create cancellation notifications.
 
         For recurring events: deleting the base event also deletes all instances.
+        Events are soft-deleted (hidden at once); purge_deleted removes the rows
+        and their interactions later.
 
         Returns:
             (deleted_count, None) if successful
@@ -234,61 +284,174 @@ class CRUDEvent(CRUDBase[Event, EventCreate, EventBase]):
         if not db_event:
             return None, "Event not found"
 
-        events_to_delete = [db_event]
+        event_ids = [event_id]
 
-        # If it's a recurring base event, get all instances
+        # If it's a recurring base event, get all instances (they point at the series config)
         if db_event.event_type == "recurring":
-            instances = db.query(Event).filter(Event.parent_recurring_event_id == event_id).all()
-            events_to_delete.extend(instances)
+            config_ids = select(RecurringEventConfig.id).where(RecurringEventConfig.event_id == event_id)
+            event_ids.extend(db.execute(select(Event.id).where(Event.parent_recurring_event_id.in_(config_ids))).scalars())
 
-        # Create cancellation records if requested
+        # Create cancellation records (and the recipients' inbox rows) if requested
         if cancelled_by_user_id:
-            for event in events_to_delete:
-                # Get all users with interactions to this event
-                interactions = db.query(EventInteraction).filter(EventInteraction.event_id == event.id).all()
+            event_cancellation.create_for_events(db, event_ids=event_ids, cancelled_by_user_id=cancelled_by_user_id, message=cancellation_message)
 
-                if interactions:
-                    # Create cancellation record
-                    cancellation = EventCancellation(event_id=event.id, event_name=event.name, cancelled_by_user_id=cancelled_by_user_id, message=cancellation_message)
-                    db.add(cancellation)
-                    db.flush()
+        self.soft_delete(db, event_ids=event_ids)
+        db.commit()
+        return len(event_ids), None
 
-        # Delete all events
-        for event in events_to_delete:
-            db.delete(event)
+    def soft_delete(self, db: Session, *, event_ids: Union[List[int], Select]) -> int:
+        """
+        Mark events as deleted without touching their children (does not commit).
 
-        db.commit()
-        return len(events_to_delete), None
+        One UPDATE of deleted_at plus dropping their event_access rows, so the
+        events disappear from every query right away. Bulk statements skip the
+        mapper hooks, so the owners' public stats versions are bumped and the
+        social graph changes stashed here; the later purge only removes rows
+        that neither of them counts any more.
 
-    def get_available_invitees(self, db: Session, *, event_id: int) -> List[tuple]:
+        Args:
+            db: Database session
+            event_ids: Event IDs, or a SELECT of event IDs (e.g. every event of a calendar)
+
+        Returns:
+            Number of events marked as deleted
         """
-        Get list of users available to invite to an event.
+        # Imported here: crud_user imports this module
+        from crud.crud_user import public_stats_versions
 
-        Excludes:
-        - Event owner
-        - Already invited users
-        - Blocked users (mutual blocks with owner)
-        - Public users
+        for owner_id in db.execute(select(Event.owner_id).where(Event.id.in_(event_ids)).distinct()).scalars():
+            public_stats_versions.bump(owner_id)
+        stash_events_removed(db, event_ids)
+
+        deleted = db.execute(update(Event).where(Event.id.in_(event_ids), Event.deleted_at.is_(None)).values(deleted_at=datetime.now(timezone.utc))).rowcount
+        db.execute(delete(EventAccess).where(EventAccess.event_id.in_(event_ids)))
+        return deleted
+
+    def purge_deleted(self, db: Session, *, batch_size: int = EVENT_PURGE_BATCH_SIZE) -> int:
+        """
+        Permanently delete soft-deleted events, committing every batch.
+
+        Interactions (possibly thousands per event) are deleted in batches of
+        their own so no statement holds locks for long; configs, counters and
+        access rows go with the event through ON DELETE CASCADE. Instances are
+        purged before their series.
 
         Returns:
-            List of tuples (User)
+            Number of events purged
+        """
+        purged = 0
+        while True:
+            event_ids = list(db.execute(select(Event.id).where(Event.deleted_at.isnot(None)).order_by(Event.parent_recurring_event_id.is_(None), Event.id).limit(batch_size), execution_options={"include_deleted": True}).scalars())
+            if not event_ids:
+                return purged
+
+            interaction_batch = select(EventInteraction.id).where(EventInteraction.event_id.in_(event_ids)).limit(batch_size)
+            while db.execute(delete(EventInteraction).where(EventInteraction.id.in_(interaction_batch))).rowcount:
+                db.commit()
+
+            db.execute(delete(EventBan).where(EventBan.event_id.in_(event_ids)))
+            db.execute(delete(Event).where(Event.id.in_(event_ids)))
+            db.commit()
+            purged += len(event_ids)
+
+    def _invitee_affinity(self, *, inviter_id: int):
         """
-        from models import EventInteraction, User, UserBlock
+        Social neighbours of the inviter with an affinity score (subquery: user_id, score).
 
-        db_event = self.get(db, id=event_id)
-        if not db_event:
-            return []
+        Sum of INVITEE_SCORE_CONTACT if the inviter has the user in their
+        contacts, INVITEE_SCORE_SHARED_GROUP per shared group (member of the
+        same group or of a group owned by the inviter) and
+        INVITEE_SCORE_CO_ATTENDANCE per event both accepted or joined.
+        """
+        own_membership = aliased(GroupMembership)
+        other_membership = aliased(GroupMembership)
+        own_interaction = aliased(EventInteraction)
+        other_interaction = aliased(EventInteraction)
+
+        contacts = select(UserContactLink.registered_user_id.label("user_id"), literal(INVITEE_SCORE_CONTACT).label("score")).where(UserContactLink.owner_id == inviter_id)
+        shared_groups = select(other_membership.user_id, literal(INVITEE_SCORE_SHARED_GROUP)).join(own_membership, own_membership.group_id == other_membership.group_id).where(own_membership.user_id == inviter_id)
+        owned_groups = select(GroupMembership.user_id, literal(INVITEE_SCORE_SHARED_GROUP)).join(Group, Group.id == GroupMembership.group_id).where(Group.owner_id == inviter_id)
+        co_attendance = (
+            select(other_interaction.user_id, literal(INVITEE_SCORE_CO_ATTENDANCE))
+            .join(own_interaction, own_interaction.event_id == other_interaction.event_id)
+            .where(own_interaction.user_id == inviter_id, own_interaction.status == "accepted", other_interaction.status == "accepted", other_interaction.interaction_type.in_(["invited", "joined"]))
+        )
+
+        neighbours = union_all(contacts, shared_groups, owned_groups, co_attendance).subquery()
+        return select(neighbours.c.user_id, func.sum(neighbours.c.score).label("score")).group_by(neighbours.c.user_id).subquery()
+
+    def get_available_invitees(self, db: Session, *, event_id: int, inviter_id: Optional[int] = None, search: Optional[str] = None, skip: int = 0, limit: int = 50) -> List[User]:
+        """
+        Get a page of users available to invite to an event, best candidates first.
 
-        # Get user IDs that already have interactions with this event
-        invited_user_ids_subquery = db.query(EventInteraction.user_id).filter(EventInteraction.event_id == event_id).scalar_subquery()
+        Excludes:
+        - Event owner and the inviter
+        - Users with any interaction with the event (NOT EXISTS anti-join)
+        - Blocked users (mutual blocks with the owner or the inviter, from the cached block sets)
+        - Public users
 
-        # Get user IDs that have mutual blocks with the event owner
-        blocked_user_ids_subquery = db.query(UserBlock.blocked_user_id).filter(UserBlock.blocker_user_id == db_event.owner_id).union(db.query(UserBlock.blocker_user_id).filter(UserBlock.blocked_user_id == db_event.owner_id)).scalar_subquery()
+        Ranking: the inviter's social neighbours (contacts, shared groups,
+        past co-attendance) ordered by score, then the remaining users by id.
+        Neighbours come from the in-memory social graph when it's built (top
+        MAX_GRAPH_INVITEE_CANDIDATES), otherwise from SQL (_invitee_affinity).
+        Only the neighbour set is sorted by score, so a page costs
+        O(neighbours + limit) instead of O(users).
 
-        # Get all users NOT in the invited list, NOT the owner, NOT blocked, NOT public
-        results = db.query(User).filter(User.id != db_event.owner_id, User.is_public == False, ~User.id.in_(invited_user_ids_subquery), ~User.id.in_(blocked_user_ids_subquery)).all()
+        Args:
+            db: Database session
+            event_id: Event ID
+            inviter_id: User who invites (defaults to the event owner)
+            search: Case-insensitive search in display_name and instagram_username
+            skip: Number of candidates to skip
+            limit: Maximum number of candidates
 
-        return results
+        Returns:
+            List of User objects
+        """
+        db_event = self.get(db, id=event_id)
+        if not db_event:
+            return []
+        inviter_id = inviter_id or db_event.owner_id
+
+        already_interacting = exists().where(EventInteraction.event_id == event_id, EventInteraction.user_id == User.id)
+        filters = [User.is_public == False, User.id != db_event.owner_id, User.id != inviter_id, ~already_interacting]
+        blocked_ids = user_block.blocked_set(db, user_id=db_event.owner_id)
+        if inviter_id != db_event.owner_id:
+            blocked_ids |= user_block.blocked_set(db, user_id=inviter_id)
+        if blocked_ids:
+            filters.append(User.id.notin_(blocked_ids))
+        if search:
+            search_term = f"%{search}%"
+            filters.append(or_(User.display_name.ilike(search_term), User.instagram_username.ilike(search_term)))
+
+        if social_graph.ready:
+            # 1. Ranked neighbours from the in-memory graph (top-K)
+            candidate_ids = [user_id for user_id, _ in social_graph.top_neighbours(inviter_id, MAX_GRAPH_INVITEE_CANDIDATES)]
+            eligible = {u.id: u for u in db.query(User).filter(User.id.in_(candidate_ids), *filters).all()} if candidate_ids else {}
+            ranked = [eligible[user_id] for user_id in candidate_ids if user_id in eligible]
+            page = ranked[skip : skip + limit]
+            if len(page) == limit:
+                return page
+
+            # 2. Everyone else, by id
+            rest_query = db.query(User).filter(*filters)
+            if candidate_ids:
+                rest_query = rest_query.filter(User.id.notin_(candidate_ids))
+            return page + rest_query.order_by(User.id).offset(max(0, skip - len(ranked))).limit(limit - len(page)).all()
+
+        affinity = self._invitee_affinity(inviter_id=inviter_id)
+
+        # 1. Ranked neighbours
+        ranked = db.query(User).join(affinity, affinity.c.user_id == User.id).filter(*filters)
+        page = ranked.order_by(affinity.c.score.desc(), User.id).offset(skip).limit(limit).all()
+        if len(page) == limit:
+            return page
+
+        # 2. Everyone else, by id (indexed scan that stops at the page size)
+        ranked_total = skip + len(page) if page else ranked.count()
+        is_neighbour = exists().where(affinity.c.user_id == User.id)
+        rest = db.query(User).filter(*filters, ~is_neighbour).order_by(User.id).offset(max(0, skip - ranked_total)).limit(limit - len(page)).all()
+        return page + rest
 
     def get_instances_by_parent_config(self, db: Session, *, parent_config_id: int) -> List[Event]:
         """
@@ -375,5 +538,33 @@ class CRUDEvent(CRUDBase[Event, EventCreate, EventBase]):
         return db.query(Event).filter(Event.owner_id == owner_id, Event.start_date >= now).order_by(Event.start_date.asc()).limit(limit).all()
 
 
+def purge_deleted_events(db: Session) -> None:
+    """Purge job: permanently delete soft-deleted events"""
+    purged = event.purge_deleted(db)
+    if purged:
+        logger.info(f"Purged {purged} deleted events")
+
+
+# ============================================================================
+# Soft delete: deleted events are hidden from every ORM query
+# ============================================================================
+
+
+@listens_for(Session, "do_orm_execute")
+def _hide_deleted_events(state):
+    """
+    Add "not deleted" criteria to every SELECT on events (also when joined).
+
+    Interactions are not filtered here: per-event queries go through an event
+    that is already hidden, and per-user listings join events so the criteria
+    applies (see CRUDEventInteraction). Their rows are removed by the purger.
+
+    Pass execution_options(include_deleted=True) to see them (purger).
+    """
+    if not state.is_select or state.execution_options.get("include_deleted", False):
+        return
+    state.statement = state.statement.options(with_loader_criteria(Event, lambda cls: cls.deleted_at.is_(None), include_aliases=True))
+
+
 # Singleton instance
 event = CRUDEvent(Event)
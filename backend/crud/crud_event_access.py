@@ -0,0 +1,245 @@
+"""
+CRUD operations for EventAccess (who can see which event)
+
+Single source of truth for event visibility: single checks (has_access),
+bulk filtering (filter_accessible) and listing (visible_filter, used as a
+semi-join on event queries). Rows are maintained by the mapper hooks at the
+bottom of this module and can be rebuilt from scratch with rebuild().
+"""
+
+import logging
+from typing import Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, delete, exists, func, insert, inspect, literal, or_, select, union
+from sqlalchemy.engine import Connection
+from sqlalchemy.event import listens_for
+from sqlalchemy.orm import Session
+
+from crud.base import CRUDBase, dialect_insert
+from models import CalendarMembership, CalendarSubscription, Event, EventAccess, EventInteraction
+from schemas import EventAccessResponse
+
+logger = logging.getLogger(__name__)
+
+# Interaction statuses that hide an event from the user's feed (access is kept)
+HIDDEN_INVITATION_STATUSES = ["rejected", "rejected_invitation_accepted_event"]
+
+# Access paths listed by GET /events regardless of status (invitations are listed once accepted)
+LISTED_VIAS = ["owned", "subscribed", "calendar", "subscribed_calendar"]
+
+
+def _access_source(*, user_id: Optional[int] = None, event_id: Optional[int] = None, calendar_id: Optional[int] = None, event_ids: Optional[List[int]] = None):
+    """
+    SELECT (user_id, event_id, via) of every access path, restricted to a scope.
+
+    Args:
+        user_id: Only rows of this user
+        event_id: Only rows of this event
+        calendar_id: Only rows of events in this calendar
+        event_ids: Only rows of these events
+    """
+
+    def scoped(stmt, user_column):
+        # Soft-deleted events are visible to nobody
+        stmt = stmt.where(Event.deleted_at.is_(None))
+        if user_id is not None:
+            stmt = stmt.where(user_column == user_id)
+        if event_id is not None:
+            stmt = stmt.where(Event.id == event_id)
+        if calendar_id is not None:
+            stmt = stmt.where(Event.calendar_id == calendar_id)
+        if event_ids is not None:
+            stmt = stmt.where(Event.id.in_(event_ids))
+        return stmt
+
+    owned = scoped(select(Event.owner_id, Event.id, literal("owned")), Event.owner_id)
+    interactions = scoped(select(EventInteraction.user_id, Event.id, EventInteraction.interaction_type).join(Event, Event.id == EventInteraction.event_id), EventInteraction.user_id)
+    calendar = scoped(
+        select(CalendarMembership.user_id, Event.id, literal("calendar"))
+        .join(Event, Event.calendar_id == CalendarMembership.calendar_id)
+        .where(CalendarMembership.status == "accepted", CalendarMembership.role.in_(["owner", "admin"])),
+        CalendarMembership.user_id,
+    )
+    subscribed_calendar = scoped(
+        select(CalendarSubscription.user_id, Event.id, literal("subscribed_calendar")).join(Event, Event.calendar_id == CalendarSubscription.calendar_id).where(CalendarSubscription.status == "active"),
+        CalendarSubscription.user_id,
+    )
+    return union(owned, interactions, calendar, subscribed_calendar)
+
+
+def refresh_access(conn, *, user_id: Optional[int] = None, event_id: Optional[int] = None, calendar_id: Optional[int] = None, event_ids: Optional[List[int]] = None) -> None:
+    """
+    Recompute the event_access rows in a scope (DELETE + INSERT ... SELECT).
+
+    The insert skips rows that already exist (ON CONFLICT DO NOTHING), so two
+    transactions refreshing overlapping scopes (e.g. an event created in a
+    calendar while a member joins it) don't fail on the primary key.
+
+    At least one of user_id/event_id/calendar_id/event_ids must be given; use
+    CRUDEventAccess.rebuild() for the whole table.
+
+    Args:
+        conn: Connection or Session
+        user_id: Only rows of this user
+        event_id: Only rows of this event
+        calendar_id: Only rows of events in this calendar
+        event_ids: Only rows of these events (e.g. a bulk-inserted batch)
+    """
+    conditions = []
+    if user_id is not None:
+        conditions.append(EventAccess.user_id == user_id)
+    if event_id is not None:
+        conditions.append(EventAccess.event_id == event_id)
+    if calendar_id is not None:
+        conditions.append(EventAccess.event_id.in_(select(Event.id).where(Event.calendar_id == calendar_id)))
+    if event_ids is not None:
+        conditions.append(EventAccess.event_id.in_(event_ids))
+    if not conditions:
+        raise ValueError("refresh_access needs a scope")
+
+    conn.execute(delete(EventAccess).where(*conditions))
+    source = _access_source(user_id=user_id, event_id=event_id, calendar_id=calendar_id, event_ids=event_ids)
+    conn.execute(dialect_insert(conn, EventAccess).from_select(["user_id", "event_id", "via"], source).on_conflict_do_nothing(index_elements=["user_id", "event_id", "via"]))
+
+
+class CRUDEventAccess(CRUDBase[EventAccess, EventAccessResponse, EventAccessResponse]):
+    """
+    Event visibility.
+
+    A user can see an event if they own it, have any interaction with it, are
+    an accepted owner/admin of its calendar or have an active subscription to
+    its calendar.
+    """
+
+    def visible_filter(self, *, user_id: int, event_id_column=Event.id):
+        """EXISTS clause to filter an event query down to the events a user can see"""
+        return exists().where(EventAccess.user_id == user_id, EventAccess.event_id == event_id_column)
+
+    def listed_filter(self, *, user_id: int, event_id_column=Event.id):
+        """
+        EXISTS clause for the GET /events listing.
+
+        Narrower than visible_filter: owned events, subscriptions, calendar
+        events and accepted invitations. Pending/rejected invitations and joins
+        grant access (detail) but are not listed.
+        """
+        accepted_invitation = exists().where(EventInteraction.event_id == EventAccess.event_id, EventInteraction.user_id == EventAccess.user_id, EventInteraction.interaction_type == "invited", EventInteraction.status == "accepted")
+        return exists().where(EventAccess.user_id == user_id, EventAccess.event_id == event_id_column, or_(EventAccess.via.in_(LISTED_VIAS), and_(EventAccess.via == "invited", accepted_invitation)))
+
+    def has_access(self, db: Session, *, user_id: int, event_id: int) -> bool:
+        """Check if a user can see an event (single primary key lookup)"""
+        return db.query(EventAccess.event_id).filter(EventAccess.user_id == user_id, EventAccess.event_id == event_id).first() is not None
+
+    def filter_accessible(self, db: Session, *, user_id: int, event_ids: Iterable[int]) -> Set[int]:
+        """
+        Filter event IDs down to the ones a user can see (single query).
+
+        Args:
+            db: Database session
+            user_id: User ID
+            event_ids: Candidate event IDs
+
+        Returns:
+            Set of visible event IDs
+        """
+        event_ids = list(event_ids)
+        if not event_ids:
+            return set()
+        return set(db.scalars(select(EventAccess.event_id).where(EventAccess.user_id == user_id, EventAccess.event_id.in_(event_ids)).distinct()).all())
+
+    def get_feed_sources(self, db: Session, *, user_id: int) -> List[Tuple[int, str]]:
+        """
+        Get the (event_id, via) rows that put events in a user's feed.
+
+        Same rows as has_access, minus joins that are not accepted and
+        rejected invitations (the user keeps access to those but they're not
+        shown in the feed).
+
+        Args:
+            db: Database session
+            user_id: User ID
+
+        Returns:
+            List of (event_id, via) tuples
+        """
+        status = func.coalesce(EventInteraction.status, "")
+        hidden = or_(and_(EventAccess.via == "joined", status != "accepted"), and_(EventAccess.via == "invited", status.in_(HIDDEN_INVITATION_STATUSES)))
+        rows = (
+            db.query(EventAccess.event_id, EventAccess.via)
+            .outerjoin(EventInteraction, and_(EventInteraction.event_id == EventAccess.event_id, EventInteraction.user_id == EventAccess.user_id, EventInteraction.interaction_type == EventAccess.via))
+            .filter(EventAccess.user_id == user_id, ~hidden)
+            .all()
+        )
+        return [(event_id, via) for event_id, via in rows]
+
+    def rebuild(self, db: Session) -> None:
+        """
+        Rebuild the whole table from events, interactions and calendars (bulk). Doesn't commit.
+
+        Args:
+            db: Database session
+        """
+        db.execute(delete(EventAccess))
+        db.execute(insert(EventAccess).from_select(["user_id", "event_id", "via"], _access_source()))
+        logger.info(f"🔐 Event access rebuilt: {db.query(EventAccess).count()} rows")
+
+
+# ============================================================================
+# Incremental maintenance (runs inside the flush, same transaction)
+# ============================================================================
+
+
+def _changed(target, *attributes: str) -> bool:
+    state = inspect(target)
+    return any(state.attrs[attribute].history.has_changes() for attribute in attributes)
+
+
+def _previous(target, attribute: str):
+    """Value of an attribute before the flush (current value if unchanged)"""
+    history = inspect(target).attrs[attribute].history
+    return history.deleted[0] if history.deleted else getattr(target, attribute)
+
+
+@listens_for(Event, "after_insert")
+@listens_for(Event, "after_delete")
+def _event_written(mapper, connection: Connection, target):
+    refresh_access(connection, event_id=target.id)
+
+
+@listens_for(Event, "after_update")
+def _event_updated(mapper, connection: Connection, target):
+    if _changed(target, "owner_id", "calendar_id", "deleted_at"):
+        refresh_access(connection, event_id=target.id)
+
+
+@listens_for(EventInteraction, "after_insert")
+@listens_for(EventInteraction, "after_delete")
+def _interaction_written(mapper, connection: Connection, target):
+    refresh_access(connection, user_id=target.user_id, event_id=target.event_id)
+
+
+@listens_for(EventInteraction, "after_update")
+def _interaction_updated(mapper, connection: Connection, target):
+    if _changed(target, "user_id", "event_id", "interaction_type"):
+        refresh_access(connection, user_id=_previous(target, "user_id"), event_id=_previous(target, "event_id"))
+        refresh_access(connection, user_id=target.user_id, event_id=target.event_id)
+
+
+@listens_for(CalendarMembership, "after_insert")
+@listens_for(CalendarMembership, "after_delete")
+@listens_for(CalendarSubscription, "after_insert")
+@listens_for(CalendarSubscription, "after_delete")
+def _calendar_access_written(mapper, connection: Connection, target):
+    refresh_access(connection, user_id=target.user_id, calendar_id=target.calendar_id)
+
+
+@listens_for(CalendarMembership, "after_update")
+@listens_for(CalendarSubscription, "after_update")
+def _calendar_access_updated(mapper, connection: Connection, target):
+    if _changed(target, "status", "user_id", "calendar_id") or (isinstance(target, CalendarMembership) and _changed(target, "role")):
+        refresh_access(connection, user_id=_previous(target, "user_id"), calendar_id=_previous(target, "calendar_id"))
+        refresh_access(connection, user_id=target.user_id, calendar_id=target.calendar_id)
+
+
+# Singleton instance
+event_access = CRUDEventAccess(EventAccess)
@@ -2,22 +2,64 @@
 CRUD operations for EventCancellation model
 """
 
+from datetime import datetime, timezone
 from typing import List, Optional
 
+from sqlalchemy import Text, insert, literal, select
 from sqlalchemy.orm import Session
 
-from crud.base import CRUDBase
-from models import EventCancellation, EventCancellationView
+from crud.base import CRUDBase, dialect_insert
+from models import Event, EventCancellation, EventCancellationRecipient, EventCancellationView, EventInteraction
 from schemas import EventCancellationCreate
 
 
 class CRUDEventCancellation(CRUDBase[EventCancellation, EventCancellationCreate, EventCancellationCreate]):
     """CRUD operations for EventCancellation"""
 
+    def create_for_events(self, db: Session, *, event_ids: List[int], cancelled_by_user_id: int, message: Optional[str] = None) -> List[int]:
+        """
+        Create the cancellations of some events and fan them out to the inboxes.
+
+        One cancellation per event with interactions (INSERT ... SELECT from
+        events) and one inbox row per user who interacted with it, except the
+        one cancelling (INSERT ... SELECT from event_interactions). Must run
+        before the events and their interactions are deleted; does not commit.
+
+        Args:
+            db: Database session
+            event_ids: Events being cancelled
+            cancelled_by_user_id: User cancelling the events
+            message: Optional cancellation message
+
+        Returns:
+            IDs of the created cancellations
+        """
+        if not event_ids:
+            return []
+
+        has_interactions = select(EventInteraction.id).where(EventInteraction.event_id == Event.id).exists()
+        source = select(Event.id, Event.name, literal(cancelled_by_user_id), literal(message, Text)).where(Event.id.in_(event_ids), has_interactions)
+        stmt = insert(EventCancellation).from_select(["event_id", "event_name", "cancelled_by_user_id", "message"], source).returning(EventCancellation.id)
+        cancellation_ids = list(db.execute(stmt).scalars())
+        if not cancellation_ids:
+            return []
+
+        recipients = (
+            select(EventCancellation.id, EventInteraction.user_id)
+            .join(EventInteraction, EventInteraction.event_id == EventCancellation.event_id)
+            .where(EventCancellation.id.in_(cancellation_ids), EventInteraction.user_id != cancelled_by_user_id)
+            .distinct()
+        )
+        db.execute(insert(EventCancellationRecipient).from_select(["cancellation_id", "user_id"], recipients))
+        return cancellation_ids
+
     def get_unviewed_by_user(self, db: Session, *, user_id: int) -> List[EventCancellation]:
         """
         Get all unviewed cancellations for a user.
 
+        Reads the user's inbox (event_cancellation_recipients, indexed by
+        user_id) minus the cancellations already viewed.
+
         Args:
             db: Database session
             user_id: User ID
@@ -25,13 +67,9 @@ class CRUDEventCancellation(CRUDBase[EventCancellation, EventCancellationCreate,
         Returns:
             List of EventCancellation instances not yet viewed by the user
         """
-        # Get cancellation IDs already viewed by this user
-        viewed_cancellation_ids = db.query(EventCancellationView.cancellation_id).filter(EventCancellationView.user_id == user_id).scalar_subquery()
-
-        # Get all cancellations for this user that haven't been viewed
-        cancellations = db.query(EventCancellation).filter(EventCancellation.event_id.in_(db.query(EventCancellation.event_id).distinct()), ~EventCancellation.id.in_(viewed_cancellation_ids)).all()
+        viewed = select(EventCancellationView.id).where(EventCancellationView.cancellation_id == EventCancellationRecipient.cancellation_id, EventCancellationView.user_id == user_id).exists()
 
-        return cancellations
+        return db.query(EventCancellation).join(EventCancellationRecipient, EventCancellationRecipient.cancellation_id == EventCancellation.id).filter(EventCancellationRecipient.user_id == user_id, ~viewed).order_by(EventCancellation.id).all()
 
     def mark_as_viewed(self, db: Session, *, cancellation_id: int, user_id: int) -> tuple[Optional[int], Optional[str]]:
         """
@@ -66,6 +104,35 @@ class CRUDEventCancellation(CRUDBase[EventCancellation, EventCancellationCreate,
 
         return view.id, None
 
+    def mark_as_viewed_batch(self, db: Session, *, user_id: int, cancellation_ids: Optional[List[int]] = None, before: Optional[datetime] = None) -> int:
+        """
+        Mark many cancellations as viewed with a single INSERT ... SELECT ... ON CONFLICT DO NOTHING.
+
+        Only cancellations in the user's inbox are considered; unknown IDs are
+        skipped and already viewed cancellations are left as they are.
+
+        Args:
+            db: Database session
+            user_id: User ID
+            cancellation_ids: Only these cancellations
+            before: Only cancellations made at or before this timestamp
+
+        Returns:
+            Number of new view records
+        """
+        source = select(EventCancellationRecipient.cancellation_id, literal(user_id)).where(EventCancellationRecipient.user_id == user_id)
+        if cancellation_ids is not None:
+            source = source.where(EventCancellationRecipient.cancellation_id.in_(cancellation_ids))
+        if before is not None:
+            if before.tzinfo is None:
+                before = before.replace(tzinfo=timezone.utc)
+            source = source.join(EventCancellation, EventCancellation.id == EventCancellationRecipient.cancellation_id).where(EventCancellation.cancelled_at <= before)
+
+        stmt = dialect_insert(db, EventCancellationView).from_select(["cancellation_id", "user_id"], source).on_conflict_do_nothing(index_elements=["cancellation_id", "user_id"])
+        inserted = db.execute(stmt).rowcount
+        db.commit()
+        return inserted
+
 
 # Singleton instance
 event_cancellation = CRUDEventCancellation(EventCancellation)
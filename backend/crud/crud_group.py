@@ -4,7 +4,7 @@ CRUD operations for Group model
 
 from typing import List, Optional
 
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, selectinload
 
 from crud.base import CRUDBase
 from models import Group, User, GroupMembership
@@ -16,12 +16,38 @@ class CRUDGroup(CRUDBase[Group, GroupCreate, GroupBase]):
 
     def get_with_relations(self, db: Session, *, id: int) -> Optional[Group]:
         """Get a group with all its relations loaded (owner, members, admins)"""
-        return db.query(Group).options(joinedload(Group.owner)).filter(Group.id == id).first()
+        return db.query(Group).options(joinedload(Group.owner), selectinload(Group.memberships).joinedload(GroupMembership.user)).filter(Group.id == id).first()
 
     def get_multi_with_relations(self, db: Session, *, skip: int = 0, limit: int = 100) -> List[Group]:
         """Get multiple groups with all their relations loaded"""
         return db.query(Group).options(joinedload(Group.owner)).offset(skip).limit(limit).all()
 
+    def get_user_groups(self, db: Session, *, user_id: int, owner_id: Optional[int] = None, skip: int = 0, limit: int = 50, order_by: str = "id", order_dir: str = "asc") -> List[Group]:
+        """
+        Get groups where a user is a member (owner, admin, or member).
+
+        Filtering, ordering and pagination run in SQL; owner and
+        memberships -> user are eager loaded, so the whole page costs a fixed
+        number of queries regardless of its size.
+
+        Args:
+            user_id: Member user ID
+            owner_id: Optional filter by owner user ID
+            skip: Number of records to skip
+            limit: Maximum number of records to return
+            order_by: Column name to order by
+            order_dir: Order direction (asc/desc)
+        """
+        query = db.query(Group).join(GroupMembership, (GroupMembership.group_id == Group.id) & (GroupMembership.user_id == user_id)).options(selectinload(Group.owner), selectinload(Group.memberships).joinedload(GroupMembership.user))
+
+        if owner_id is not None:
+            query = query.filter(Group.owner_id == owner_id)
+
+        order_col = Group.__table__.c[order_by] if order_by in Group.__table__.c else Group.id
+        order_col = order_col.desc() if order_dir.lower() == "desc" else order_col.asc()
+
+        return query.order_by(order_col, Group.id).offset(skip).limit(limit).all()
+
     def get_by_owner(self, db: Session, *, owner_id: int) -> List[Group]:
         """Get all groups owned by a specific user"""
         return self.get_multi(db, filters={"owner_id": owner_id})
@@ -18,6 +18,10 @@ class CRUDGroupMembership(CRUDBase[GroupMembership, GroupMembershipCreate, Group
         """Get all memberships for a specific group"""
         return self.get_multi(db, filters={"group_id": group_id})
 
+    def get_member_ids(self, db: Session, *, group_id: int) -> List[int]:
+        """Get the user IDs of all members of a group (single column query, no limit)"""
+        return [user_id for (user_id,) in db.query(GroupMembership.user_id).filter(GroupMembership.group_id == group_id).order_by(GroupMembership.id).all()]
+
     def get_by_user(self, db: Session, *, user_id: int) -> List[GroupMembership]:
         """Get all group memberships for a specific user"""
         return self.get_multi(db, filters={"user_id": user_id})
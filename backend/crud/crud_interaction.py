@@ -2,14 +2,21 @@
 CRUD operations for EventInteraction model
 """
 
-from typing import List, Optional, Union
-
-from sqlalchemy import or_, select
-from sqlalchemy.orm import Session
-
-from crud.base import CRUDBase
-from models import Event, EventInteraction, RecurringEventConfig, User
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple, Union
+
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.orm.attributes import set_committed_value
+
+from crud.base import CRUDBase, dialect_insert, keyset_paginate
+from crud.crud_counters import event_counter, invitation_stats_from_counter
+from crud.crud_event_access import refresh_access
+from crud.crud_user_block import user_block
+from models import Event, EventBan, EventInteraction, RecurringEventConfig, User
+from permissions import get_permission_resolver
 from schemas import EventInteractionCreate, EventInteractionUpdate
+from write_behind import write_behind
 
 
 class CRUDEventInteraction(CRUDBase[EventInteraction, EventInteractionCreate, EventInteractionUpdate]):
@@ -102,6 +109,97 @@ class CRUDEventInteraction(CRUDBase[EventInteraction, EventInteractionCreate, Ev
         """
         return db.query(EventInteraction, User).outerjoin(User, EventInteraction.user_id == User.id).filter(EventInteraction.event_id == event_id).all()
 
+    def _filter_by_event(self, query, *, event_id: int, interaction_type: Optional[str] = None, status: Optional[str] = None):
+        """Apply event and optional type/status filters to an interactions query"""
+        query = query.filter(EventInteraction.event_id == event_id)
+        if interaction_type:
+            query = query.filter(EventInteraction.interaction_type == interaction_type)
+        if status:
+            query = query.filter(EventInteraction.status == status)
+        return query
+
+    def get_page_by_event(self, db: Session, *, event_id: int, interaction_type: Optional[str] = None, status: Optional[str] = None, cursor: Optional[int] = None, limit: int = 50, with_total: bool = False) -> Tuple[List[EventInteraction], Optional[int], Optional[int]]:
+        """
+        Get one cursor-paginated page of interactions for an event.
+
+        Args:
+            db: Database session
+            event_id: Event ID
+            interaction_type: Optional filter by type
+            status: Optional filter by status
+            cursor: Interaction id of the last row of the previous page
+            limit: Page size
+            with_total: Also count matching interactions (first page only)
+
+        Returns:
+            Tuple of (interactions, next_cursor, total)
+        """
+        query = self._filter_by_event(db.query(EventInteraction), event_id=event_id, interaction_type=interaction_type, status=status)
+        return keyset_paginate(query, EventInteraction.id, cursor=cursor, limit=limit, with_total=with_total)
+
+    def get_enriched_page_by_event(self, db: Session, *, event_id: int, interaction_type: Optional[str] = None, status: Optional[str] = None, cursor: Optional[int] = None, limit: int = 50, with_total: bool = False) -> Tuple[List[tuple[EventInteraction, Optional[User], Optional[User]]], Optional[int], Optional[int]]:
+        """
+        Get one cursor-paginated page of interactions with user and inviter information.
+
+        Single query with two outer joins on users (no per-row inviter lookups).
+
+        Args:
+            db: Database session
+            event_id: Event ID
+            interaction_type: Optional filter by type
+            status: Optional filter by status
+            cursor: Interaction id of the last row of the previous page
+            limit: Page size
+            with_total: Also count matching interactions (first page only)
+
+        Returns:
+            Tuple of (list of (EventInteraction, User, inviter User) tuples, next_cursor, total)
+        """
+        inviter = aliased(User)
+        query = db.query(EventInteraction, User, inviter).outerjoin(User, EventInteraction.user_id == User.id).outerjoin(inviter, EventInteraction.invited_by_user_id == inviter.id)
+        query = self._filter_by_event(query, event_id=event_id, interaction_type=interaction_type, status=status)
+        return keyset_paginate(query, EventInteraction.id, cursor=cursor, limit=limit, with_total=with_total)
+
+    def get_attendees(self, db: Session, *, event_id: int, current_user_id: int, inviter_id: Optional[int] = None, cursor: Optional[int] = None, limit: int = 50, with_total: bool = False) -> Tuple[List[tuple], Optional[int], Optional[int]]:
+        """
+        Get one cursor-paginated page of attendee users of an event (users joined in).
+
+        Public users and the current user are excluded. If inviter_id is set
+        (current user accepted an invitation from that user) only "related
+        attendees" are returned: the inviter (accepted) and other users
+        invited by the same inviter who accepted. Otherwise, every user who
+        accepted or rejected but is attending.
+
+        One row per matching interaction; the cursor is the interaction id.
+
+        Args:
+            db: Database session
+            event_id: Event ID
+            current_user_id: Current user ID
+            inviter_id: Inviter of the current user's accepted invitation
+            cursor: Interaction id of the last row of the previous page
+            limit: Page size
+            with_total: Also count attendees (first page only)
+
+        Returns:
+            Tuple of (list of (interaction_id, id, display_name, profile_picture_url, phone) rows, next_cursor, total)
+        """
+        query = db.query(EventInteraction.id.label("interaction_id"), User.id, User.display_name, User.profile_picture_url, User.phone).join(User, EventInteraction.user_id == User.id).filter(EventInteraction.event_id == event_id, User.is_public == False)
+
+        if inviter_id:
+            query = query.filter(
+                or_(
+                    # The inviter (any interaction type, accepted status)
+                    and_(EventInteraction.user_id == inviter_id, EventInteraction.status == "accepted"),
+                    # Other users invited by same inviter who accepted
+                    and_(EventInteraction.invited_by_user_id == inviter_id, EventInteraction.interaction_type == "invited", EventInteraction.status == "accepted", EventInteraction.user_id != current_user_id),
+                )
+            )
+        else:
+            query = query.filter(or_(EventInteraction.status == "accepted", and_(EventInteraction.status == "rejected", EventInteraction.is_attending == True)), EventInteraction.user_id != current_user_id)
+
+        return keyset_paginate(query, EventInteraction.id, cursor=cursor, limit=limit, with_total=with_total)
+
     def get_enriched_by_user(self, db: Session, user_id: int, *, interaction_type: Optional[str] = None, status: Optional[str] = None) -> List[tuple[EventInteraction, Event]]:
         """
         Get user interactions with event information (enriched).
@@ -165,6 +263,74 @@ class CRUDEventInteraction(CRUDBase[EventInteraction, EventInteractionCreate, Ev
         db.commit()
         return result
 
+    def create_invitations_batch(self, db: Session, *, db_event: Event, user_ids: List[int], inviter_id: int, invited_via_group_id: Optional[int] = None) -> List[Tuple[int, str, Optional[int]]]:
+        """
+        Invite many users to an event with set-wise validation and a single INSERT.
+
+        Validation runs once per set, not once per user: user flags (one
+        query), blocks with inviter and owner (cached block sets), bans and
+        existing interactions (one query each). Valid invitations are written
+        with one INSERT ... ON CONFLICT DO NOTHING RETURNING; rows lost to a
+        concurrent insert are reported as already_interacting. Commits.
+
+        Outcomes:
+        - invited: invitation created (interaction_id is set)
+        - not_found: user doesn't exist
+        - not_invitable: the inviter or the event owner
+        - public_user: public users can't be invited
+        - blocked: block with the inviter or the event owner
+        - banned: banned from the event
+        - already_interacting: user already has an interaction with the event
+
+        Args:
+            db: Database session
+            db_event: Event to invite to
+            user_ids: Users to invite (duplicates are ignored)
+            inviter_id: ID of the inviting user (stored as invited_by_user_id)
+            invited_via_group_id: Group the invitation was fanned out from
+
+        Returns:
+            List of (user_id, outcome, interaction_id) in input order
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        if not user_ids:
+            return []
+
+        flags = get_permission_resolver(db).user_flags_many(user_ids)
+        blocked = user_block.blocked_set(db, user_id=inviter_id) | user_block.blocked_set(db, user_id=db_event.owner_id)
+        banned = set(db.scalars(select(EventBan.user_id).where(EventBan.event_id == db_event.id, EventBan.user_id.in_(user_ids))).all())
+        interacting = set(db.scalars(select(EventInteraction.user_id).where(EventInteraction.event_id == db_event.id, EventInteraction.user_id.in_(user_ids))).all())
+
+        outcomes: Dict[int, str] = {}
+        for user_id in user_ids:
+            if flags[user_id] is None:
+                outcomes[user_id] = "not_found"
+            elif user_id in (inviter_id, db_event.owner_id):
+                outcomes[user_id] = "not_invitable"
+            elif flags[user_id].is_public:
+                outcomes[user_id] = "public_user"
+            elif user_id in blocked:
+                outcomes[user_id] = "blocked"
+            elif user_id in banned:
+                outcomes[user_id] = "banned"
+            elif user_id in interacting:
+                outcomes[user_id] = "already_interacting"
+
+        to_invite = [user_id for user_id in user_ids if user_id not in outcomes]
+        created: Dict[int, int] = {}
+        if to_invite:
+            rows = [{"event_id": db_event.id, "user_id": user_id, "interaction_type": "invited", "status": "pending", "invited_by_user_id": inviter_id, "invited_via_group_id": invited_via_group_id} for user_id in to_invite]
+            stmt = dialect_insert(db, EventInteraction).values(rows).on_conflict_do_nothing(index_elements=["event_id", "user_id", "interaction_type"]).returning(EventInteraction.id, EventInteraction.user_id)
+            created = {user_id: interaction_id for interaction_id, user_id in db.execute(stmt).all()}
+
+            # Core INSERT bypasses the mapper hooks: refresh access rows of the event
+            refresh_access(db, event_id=db_event.id)
+            db.commit()
+
+        for user_id in to_invite:
+            outcomes[user_id] = "invited" if user_id in created else "already_interacting"
+        return [(user_id, outcomes[user_id], created.get(user_id)) for user_id in user_ids]
+
     def get_event_ids_by_user_type_status(self, db: Session, *, user_id: int, interaction_type: str, status: Optional[str] = None) -> List[int]:
         """
         Get list of event IDs for a user filtered by interaction type and optional status.
@@ -178,7 +344,8 @@ class CRUDEventInteraction(CRUDBase[EventInteraction, EventInteractionCreate, Ev
         Returns:
             List of event IDs
         """
-        query = db.query(EventInteraction.event_id).filter(EventInteraction.user_id == user_id, EventInteraction.interaction_type == interaction_type)
+        # Through the events join, so soft-deleted events are left out
+        query = db.query(EventInteraction.event_id).join(Event, EventInteraction.event_id == Event.id).filter(EventInteraction.user_id == user_id, EventInteraction.interaction_type == interaction_type)
 
         if status:
             query = query.filter(EventInteraction.status == status)
@@ -256,8 +423,11 @@ class CRUDEventInteraction(CRUDBase[EventInteraction, EventInteractionCreate, Ev
         if needs_event_data:
             # Single optimized query with JOIN
             query = db.query(EventInteraction, Event).join(Event, EventInteraction.event_id == Event.id)
-        else:
+        elif event_id:
             query = db.query(EventInteraction)
+        else:
+            # Through the events join, so interactions of soft-deleted events are left out
+            query = db.query(EventInteraction).join(Event, EventInteraction.event_id == Event.id)
 
         # Apply filters
         if event_id:
@@ -334,6 +504,10 @@ class CRUDEventInteraction(CRUDBase[EventInteraction, EventInteractionCreate, Ev
         """
         Mark an interaction as read by setting read_at to current timestamp.
 
+        The write goes through the write-behind buffer (flushed within
+        WRITE_BEHIND_FLUSH_INTERVAL_MS); the returned instance already carries
+        read_at. An interaction that was already read keeps its read_at.
+
         Args:
             db: Database session
             interaction_id: Interaction ID
@@ -342,26 +516,53 @@ class CRUDEventInteraction(CRUDBase[EventInteraction, EventInteractionCreate, Ev
             (EventInteraction, None) if successful
             (None, error_message) if failed
         """
-        from datetime import datetime, timezone
-
         interaction = self.get(db, id=interaction_id)
         if not interaction:
             return None, "Interaction not found"
 
-        # Set read_at to current timestamp
-        interaction.read_at = datetime.now(timezone.utc)
-        db.commit()
-        db.refresh(interaction)
+        if interaction.read_at is None:
+            now = datetime.now(timezone.utc)
+            write_behind.record("interaction_read_at", interaction.id, now)
+            # Visible in the response without dirtying the session
+            set_committed_value(interaction, "read_at", now)
 
         return interaction, None
 
-    def get_invitation_stats(self, db: Session, *, event_id: int) -> dict:
+    def mark_as_read_batch(self, db: Session, *, user_id: int, interaction_ids: Optional[List[int]] = None, before: Optional[datetime] = None) -> int:
+        """
+        Mark many of a user's interactions as read with a single UPDATE.
+
+        Only unread rows are touched, so repeating the call is cheap.
+
+        Args:
+            db: Database session
+            user_id: Owner of the interactions (other users' rows are never touched)
+            interaction_ids: Only these interactions
+            before: Only interactions created at or before this timestamp
+
+        Returns:
+            Number of interactions marked as read
+        """
+        query = db.query(EventInteraction).filter(EventInteraction.user_id == user_id, EventInteraction.read_at.is_(None))
+        if interaction_ids is not None:
+            query = query.filter(EventInteraction.id.in_(interaction_ids))
+        if before is not None:
+            if before.tzinfo is None:
+                before = before.replace(tzinfo=timezone.utc)
+            query = query.filter(EventInteraction.created_at <= before)
+
+        updated = query.update({"read_at": datetime.now(timezone.utc)}, synchronize_session=False)
+        db.commit()
+        return updated
+
+    def get_invitation_stats(self, db: Session, *, event_id: int, use_counters: bool = True) -> dict:
         """
         Get invitation statistics for an event.
 
         Args:
             db: Database session
             event_id: Event ID
+            use_counters: Read the event_counters row if present (see get_invitation_stats_batch)
 
         Returns:
             Dictionary with invitation statistics:
@@ -370,15 +571,42 @@ class CRUDEventInteraction(CRUDBase[EventInteraction, EventInteractionCreate, Ev
             - pending: number of pending invitations
             - rejected: number of rejected invitations
         """
-        # Get all invitations for this event
-        invitations = db.query(EventInteraction).filter(EventInteraction.event_id == event_id, EventInteraction.interaction_type == "invited").all()
+        return self.get_invitation_stats_batch(db, event_ids=[event_id], use_counters=use_counters)[event_id]
+
+    def get_invitation_stats_batch(self, db: Session, *, event_ids: List[int], use_counters: bool = True) -> Dict[int, dict]:
+        """
+        Get invitation statistics for several events.
+
+        Events with a counter row (maintained by triggers) are read from
+        event_counters; the rest are computed live with a single GROUP BY query.
+
+        Args:
+            db: Database session
+            event_ids: List of event IDs
+            use_counters: If False, always compute live
+
+        Returns:
+            Dict mapping every requested event ID to its statistics
+            (same keys as get_invitation_stats, zeros if no invitations)
+        """
+        stats = {}
+        if use_counters:
+            stats = {event_id: invitation_stats_from_counter(counter) for event_id, counter in event_counter.get_by_event_ids(db, event_ids=event_ids).items()}
+
+        live_ids = [event_id for event_id in event_ids if event_id not in stats]
+        if not live_ids:
+            return stats
+
+        stats.update({event_id: {"total_invited": 0, "accepted": 0, "pending": 0, "rejected": 0} for event_id in live_ids})
+        rows = db.query(EventInteraction.event_id, EventInteraction.status, func.count(EventInteraction.id)).filter(EventInteraction.event_id.in_(live_ids), EventInteraction.interaction_type == "invited").group_by(EventInteraction.event_id, EventInteraction.status).all()
 
-        total_invited = len(invitations)
-        accepted = sum(1 for i in invitations if i.status == "accepted")
-        pending = sum(1 for i in invitations if i.status == "pending")
-        rejected = sum(1 for i in invitations if i.status == "rejected")
+        for event_id, status, count in rows:
+            event_stats = stats[event_id]
+            event_stats["total_invited"] += count
+            if status in event_stats:
+                event_stats[status] += count
 
-        return {"total_invited": total_invited, "accepted": accepted, "pending": pending, "rejected": rejected}
+        return stats
 
 
 # Singleton instance
@@ -2,14 +2,33 @@
 CRUD operations for User model
 """
 
-from typing import List, Optional
+import os
+from datetime import datetime
+from typing import List, Optional, Tuple
 
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, case, delete, distinct, func, select
+from sqlalchemy.event import listens_for
+from sqlalchemy.orm import Session, aliased
 
+from background_jobs import JobReporter
+from cache import TTLCache, VersionRegistry
 from crud.base import CRUDBase
-from models import User
+from crud.crud_calendar import calendar as calendar_crud
+from crud.crud_counters import user_counter
+from crud.crud_event import event as event_crud
+from crud.crud_user_block import blocked_sets_cache, user_block
+from models import Calendar, Event, EventCounter, EventInteraction, User, UserContact, UserCounter
+from phone_utils import normalize_phone
 from schemas import UserBase, UserCreate
 
+PUBLIC_STATS_CACHE_TTL_SECONDS = int(os.getenv("PUBLIC_STATS_CACHE_TTL_SECONDS", "30"))
+
+# Rows deleted per statement when deleting an account
+ACCOUNT_DELETE_BATCH_SIZE = int(os.getenv("ACCOUNT_DELETE_BATCH_SIZE", "1000"))
+
+public_stats_cache = TTLCache(ttl_seconds=PUBLIC_STATS_CACHE_TTL_SECONDS, maxsize=1024)
+public_stats_versions = VersionRegistry()
+
 
 class CRUDUser(CRUDBase[User, UserCreate, UserBase]):
     """CRUD operations for User model with specific methods"""
@@ -34,12 +53,15 @@ class CRUDUser(CRUDBase[User, UserCreate, UserBase]):
 
         Args:
             db: Database session
-            phone: Phone number (should be in international format)
+            phone: Phone number (normalized to E.164 before matching)
 
         Returns:
             User instance or None
         """
-        return db.query(User).filter(User.phone == phone).first()
+        phone_e164 = normalize_phone(phone)
+        if not phone_e164:
+            return None
+        return db.query(User).filter(User.phone_e164 == phone_e164).first()
 
     def get_with_contact(self, db: Session, user_id: int) -> Optional[tuple[User]]:
         """
@@ -161,13 +183,66 @@ class CRUDUser(CRUDBase[User, UserCreate, UserBase]):
 
         return query.all()
 
-    def get_public_user_stats(self, db: Session, *, user_id: int) -> Optional[dict]:
+    def get_subscriptions_with_stats(self, db: Session, *, user_id: int, new_since: datetime) -> List[Tuple[User, int, int, int]]:
+        """
+        Get the public users a user is subscribed to, with their statistics, in a single query.
+
+        Aggregates are computed only for the followed owners (grouped
+        subqueries); total events and subscribers come from user_counters when
+        the owner has a counter row.
+
+        Args:
+            db: Database session
+            user_id: Subscriber user ID
+            new_since: Events created at or after this moment count as new
+
+        Returns:
+            List of (User, new_events_count, total_events_count, subscribers_count) tuples ordered by user id
+        """
+        followed = select(Event.owner_id).join(EventInteraction, EventInteraction.event_id == Event.id).where(EventInteraction.user_id == user_id, EventInteraction.interaction_type == "subscribed").distinct().subquery()
+
+        events_stats = select(Event.owner_id, func.count(Event.id).label("total"), func.count(case((Event.created_at >= new_since, 1))).label("new")).where(Event.owner_id.in_(select(followed.c.owner_id))).group_by(Event.owner_id).subquery()
+
+        subscriber_event = aliased(Event)
+        subscribers = (
+            select(subscriber_event.owner_id, func.count(distinct(EventInteraction.user_id)).label("total"))
+            .join(subscriber_event, subscriber_event.id == EventInteraction.event_id)
+            .where(EventInteraction.interaction_type == "subscribed", subscriber_event.owner_id.in_(select(followed.c.owner_id)))
+            .group_by(subscriber_event.owner_id)
+            .subquery()
+        )
+
+        return (
+            db.query(
+                User,
+                func.coalesce(events_stats.c.new, 0),
+                func.coalesce(UserCounter.total_events_count, events_stats.c.total, 0),
+                func.coalesce(UserCounter.subscribers_count, subscribers.c.total, 0),
+            )
+            .join(followed, followed.c.owner_id == User.id)
+            .outerjoin(UserCounter, UserCounter.user_id == User.id)
+            .outerjoin(events_stats, events_stats.c.owner_id == User.id)
+            .outerjoin(subscribers, subscribers.c.owner_id == User.id)
+            .filter(User.is_public == True)
+            .order_by(User.id)
+            .all()
+        )
+
+    def get_public_user_stats(self, db: Session, *, user_id: int, skip: int = 0, limit: int = 50) -> Optional[dict]:
         """
         Get statistics for a public user.
 
+        events_stats is paginated (ordered by event id) and built with a single
+        LEFT JOIN ... GROUP BY query; joined users are only counted live for
+        events without an event_counters row. Totals come from user_counters
+        when available. Results are cached for PUBLIC_STATS_CACHE_TTL_SECONDS,
+        keyed on the user's event/interaction version (bumped on writes).
+
         Args:
             db: Database session
             user_id: User ID
+            skip: Number of events to skip in events_stats
+            limit: Maximum number of events in events_stats
 
         Returns:
             Dictionary with statistics or None if user doesn't exist or isn't public:
@@ -177,30 +252,124 @@ class CRUDUser(CRUDBase[User, UserCreate, UserBase]):
             - total_events: Total number of events created
             - events_stats: List of event statistics (event_id, event_name, event_start_date, total_joined)
         """
-        from models import Event, EventInteraction
+        cache_key = (user_id, skip, limit, public_stats_versions.get(user_id))
+        cached = public_stats_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
         # Get user and verify it's public
         db_user = self.get(db, id=user_id)
         if not db_user or not db_user.is_public:
             return None
 
-        # Count total subscribers (users with "subscribed" interaction to any event from this user)
-        from sqlalchemy import func
+        # Joined users per event: counter row if present, otherwise counted in the same query
+        joined = and_(EventInteraction.event_id == Event.id, EventInteraction.interaction_type == "joined", EventCounter.event_id.is_(None))
+        events = (
+            db.query(Event.id, Event.name, Event.start_date, func.coalesce(EventCounter.joined_count, func.count(EventInteraction.id)).label("total_joined"))
+            .outerjoin(EventCounter, EventCounter.event_id == Event.id)
+            .outerjoin(EventInteraction, joined)
+            .filter(Event.owner_id == user_id)
+            .group_by(Event.id, Event.name, Event.start_date, EventCounter.event_id, EventCounter.joined_count)
+            .order_by(Event.id)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+        events_stats = [{"event_id": e.id, "event_name": e.name, "event_start_date": e.start_date, "total_joined": e.total_joined} for e in events]
+
+        # Subscribers (users with "subscribed" interaction to any event from this user) and events from counters
+        counters = user_counter.get_by_user(db, user_id=user_id)
+        if counters:
+            total_subscribers = counters.subscribers_count
+            total_events = counters.total_events_count
+        else:
+            total_subscribers = db.query(func.count(func.distinct(EventInteraction.user_id))).join(Event, EventInteraction.event_id == Event.id).filter(Event.owner_id == user_id, EventInteraction.interaction_type == "subscribed").scalar()
+            total_events = db.query(func.count(Event.id)).filter(Event.owner_id == user_id).scalar()
 
-        total_subscribers = db.query(func.count(func.distinct(EventInteraction.user_id))).join(Event, EventInteraction.event_id == Event.id).filter(Event.owner_id == user_id, EventInteraction.interaction_type == "subscribed").scalar()
+        stats = {"user_id": user_id, "instagram_username": db_user.instagram_username, "total_subscribers": total_subscribers, "total_events": total_events, "events_stats": events_stats}
+        public_stats_cache.set(cache_key, stats)
+        return stats
 
-        # Get all events created by this user
-        events = db.query(Event).filter(Event.owner_id == user_id).all()
-        total_events = len(events)
+    def delete_account(self, db: Session, *, user_id: int, reporter: JobReporter, batch_size: int = ACCOUNT_DELETE_BATCH_SIZE) -> dict:
+        """
+        Delete a user and everything that depends on them (tracked background job).
 
-        # Get stats for each event (number of "joined" users)
-        events_stats = []
-        for event in events:
-            total_joined = db.query(EventInteraction).filter(EventInteraction.event_id == event.id, EventInteraction.interaction_type == "joined").count()
+        The big collections are removed in committed batches so no statement
+        holds locks for long: owned events (soft-deleted at once, then purged
+        with their interactions), the user's own interactions and their
+        contacts. Owned calendars are deleted with calendar.delete_with_events
+        (other users' events in them are detached and lose the access granted
+        through the calendar). Deleting the users row does the rest through
+        ON DELETE CASCADE / SET NULL (memberships, groups, blocks, ...).
 
-            events_stats.append({"event_id": event.id, "event_name": event.name, "event_start_date": event.start_date, "total_joined": total_joined})
+        Args:
+            db: Database session (the job's own)
+            user_id: User to delete
+            reporter: Progress reporting of the job
+            batch_size: Rows deleted per statement
 
-        return {"user_id": user_id, "instagram_username": db_user.instagram_username, "total_subscribers": total_subscribers, "total_events": total_events, "events_stats": events_stats}
+        Returns:
+            Dict with the number of rows deleted per stage
+        """
+        blocked = user_block.blocked_set(db, user_id=user_id)
+
+        owned_event_ids = list(db.execute(select(Event.id).where(Event.owner_id == user_id)).scalars())
+        reporter.stage("events", total=len(owned_event_ids))
+        if owned_event_ids:
+            event_crud.soft_delete(db, event_ids=owned_event_ids)
+            db.commit()
+            event_crud.purge_deleted(db, batch_size=batch_size)
+        reporter.progress(len(owned_event_ids))
+
+        counts = {"events": len(owned_event_ids)}
+        for stage, model, column in (("interactions", EventInteraction, EventInteraction.user_id), ("contacts", UserContact, UserContact.owner_id)):
+            reporter.stage(stage, total=db.query(func.count(model.id)).filter(column == user_id).scalar())
+            deleted = 0
+            batch = select(model.id).where(column == user_id).limit(batch_size)
+            while True:
+                rowcount = db.execute(delete(model).where(model.id.in_(batch))).rowcount
+                if not rowcount:
+                    break
+                db.commit()
+                deleted += rowcount
+                reporter.progress(deleted)
+            counts[stage] = deleted
+
+        # A DB cascade would detach the events without updating event_access
+        owned_calendar_ids = list(db.execute(select(Calendar.id).where(Calendar.owner_id == user_id)).scalars())
+        reporter.stage("calendars", total=len(owned_calendar_ids))
+        for done, calendar_id in enumerate(owned_calendar_ids, start=1):
+            calendar_crud.delete_with_events(db, calendar_id=calendar_id)
+            reporter.progress(done)
+        counts["calendars"] = len(owned_calendar_ids)
+
+        reporter.stage("account")
+        db.execute(delete(User).where(User.id == user_id))
+        db.commit()
+
+        # Core statements bypass the block cache hooks
+        for other_id in (user_id, *blocked):
+            blocked_sets_cache.delete(other_id)
+        return counts
+
+
+# Public stats cache invalidation: any write to an owner's events or their interactions
+@listens_for(Event, "after_insert")
+@listens_for(Event, "after_update")
+@listens_for(Event, "after_delete")
+def _bump_owner_stats_version(mapper, connection, target):
+    public_stats_versions.bump(target.owner_id)
+
+
+@listens_for(EventInteraction, "after_insert")
+@listens_for(EventInteraction, "after_update")
+@listens_for(EventInteraction, "after_delete")
+def _bump_event_owner_stats_version(mapper, connection, target):
+    if not len(public_stats_cache):
+        return
+    owner_id = connection.scalar(select(Event.owner_id).where(Event.id == target.event_id))
+    if owner_id is not None:
+        public_stats_versions.bump(owner_id)
 
 
 # Singleton instance
@@ -2,14 +2,28 @@
 CRUD operations for UserBlock model
 """
 
-from typing import List, Optional
+import os
+from typing import FrozenSet, Iterable, List, Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select, union
+from sqlalchemy.event import listens_for
+from sqlalchemy.orm import Session, object_session
 
+from cache import TTLCache
 from crud.base import CRUDBase
 from models import User, UserBlock
 from schemas import UserBlockCreate, UserBlockResponse
 
+# Bounds how long another worker may keep blocking after an unblock (new
+# blocks are seen at once through the block version, see blocked_set)
+BLOCK_CACHE_TTL_SECONDS = int(os.getenv("BLOCK_CACHE_TTL_SECONDS", "30"))
+
+# user_id -> (block version, frozenset of users blocked by or blocking that user)
+blocked_sets_cache = TTLCache(ttl_seconds=BLOCK_CACHE_TTL_SECONDS, maxsize=10000)
+
+_DIRTY_KEY = "user_block_dirty"
+_VERSION_KEY = "user_block_version"
+
 
 class CRUDUserBlock(CRUDBase[UserBlock, UserBlockCreate, UserBlockResponse]):
     """CRUD operations for UserBlock"""
@@ -75,6 +89,58 @@ class CRUDUserBlock(CRUDBase[UserBlock, UserBlockCreate, UserBlockResponse]):
         db_block = self.create(db, obj_in=obj_in)
         return db_block, None
 
+    def blocked_set(self, db: Session, *, user_id: int) -> FrozenSet[int]:
+        """
+        Get the users blocked by or blocking a user (cached).
+
+        Loaded with a single UNION query on a cache miss and invalidated when a
+        block involving the user is created or deleted in this process. Cached
+        sets are only served while the block version (max user_blocks.id, a
+        primary key lookup) is unchanged, so a block created by another worker
+        is enforced from the next transaction on. The version is read once per
+        session transaction, so repeated checks in a request cost no queries.
+        Unblocks elsewhere are picked up within BLOCK_CACHE_TTL_SECONDS (until
+        then the check errs on the blocking side).
+
+        Args:
+            db: Database session
+            user_id: User ID
+
+        Returns:
+            Frozen set of user IDs
+        """
+        version = db.info.get(_VERSION_KEY)
+        if version is None:
+            version = db.info[_VERSION_KEY] = db.scalar(select(func.max(UserBlock.id))) or 0
+        cached = blocked_sets_cache.get(user_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        blocked_by_me = select(UserBlock.blocked_user_id).where(UserBlock.blocker_user_id == user_id)
+        blocking_me = select(UserBlock.blocker_user_id).where(UserBlock.blocked_user_id == user_id)
+        blocked = frozenset(db.scalars(union(blocked_by_me, blocking_me)).all())
+        blocked_sets_cache.set(user_id, (version, blocked))
+        return blocked
+
+    def is_blocked(self, db: Session, *, user_a_id: int, user_b_id: int) -> bool:
+        """Check if either user blocked the other (loads only user_a_id's set)"""
+        return user_b_id in self.blocked_set(db, user_id=user_a_id)
+
+    def filter_blocked(self, db: Session, *, user_id: int, candidate_ids: Iterable[int]) -> List[int]:
+        """
+        Drop candidates that have a block with a user (either direction).
+
+        Args:
+            db: Database session
+            user_id: User ID
+            candidate_ids: User IDs to filter (order is kept)
+
+        Returns:
+            Candidate IDs without blocks with user_id
+        """
+        blocked = self.blocked_set(db, user_id=user_id)
+        return [candidate_id for candidate_id in candidate_ids if candidate_id not in blocked]
+
     def get_blocked_user_ids_bidirectional(self, db: Session, *, user_id: int) -> set:
         """
         Get all user IDs that have mutual blocks with the specified user.
@@ -90,17 +156,35 @@ class CRUDUserBlock(CRUDBase[UserBlock, UserBlockCreate, UserBlockResponse]):
         Returns:
             Set of blocked user IDs
         """
-        blocked_ids = set()
-
-        # Users blocked by this user
-        blocks_by_me = db.query(UserBlock.blocked_user_id).filter(UserBlock.blocker_user_id == user_id).all()
-        blocked_ids.update([bid for (bid,) in blocks_by_me])
-
-        # Users who blocked this user
-        blocks_on_me = db.query(UserBlock.blocker_user_id).filter(UserBlock.blocked_user_id == user_id).all()
-        blocked_ids.update([bid for (bid,) in blocks_on_me])
-
-        return blocked_ids
+        return set(self.blocked_set(db, user_id=user_id))
+
+
+# Block cache invalidation: drop both users' sets when the row is flushed (this
+# process) and again after commit, so a concurrent reader can't re-cache the
+# pre-commit state. The memoized block version ends with the transaction.
+@listens_for(UserBlock, "after_insert")
+@listens_for(UserBlock, "after_delete")
+def _invalidate_blocked_sets(mapper, connection, target):
+    user_ids = (target.blocker_user_id, target.blocked_user_id)
+    for user_id in user_ids:
+        blocked_sets_cache.delete(user_id)
+    db = object_session(target)
+    if db is not None:
+        db.info.setdefault(_DIRTY_KEY, set()).update(user_ids)
+
+
+@listens_for(Session, "after_commit")
+def _invalidate_committed_blocked_sets(session):
+    session.info.pop(_VERSION_KEY, None)
+    for user_id in session.info.pop(_DIRTY_KEY, ()):
+        blocked_sets_cache.delete(user_id)
+
+
+@listens_for(Session, "after_rollback")
+def _discard_dirty_blocked_sets(session):
+    session.info.pop(_VERSION_KEY, None)
+    for user_id in session.info.pop(_DIRTY_KEY, ()):
+        blocked_sets_cache.delete(user_id)
 
 
 # Singleton instance
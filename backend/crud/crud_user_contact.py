@@ -2,14 +2,20 @@
 CRUD operations for UserContact model
 """
 
-from datetime import datetime
-from typing import List, Optional
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
 
 from sqlalchemy.orm import Session
 
-from crud.base import CRUDBase
-from models import UserContact
-from schemas import UserContactBase, UserContactCreate
+from crud.base import CRUDBase, dialect_insert
+from crud.crud_contact_link import contact_link
+from models import User, UserContact, UserContactSyncChunk
+from phone_utils import country_code_of, normalize_phone, normalize_phones
+from schemas import ContactSyncChunk, UserContactBase, UserContactCreate
+from write_behind import write_behind
+
+# Rows per upsert statement (keeps bound parameters under SQLite/psycopg limits)
+SYNC_BATCH_SIZE = 500
 
 
 class CRUDUserContact(CRUDBase[UserContact, UserContactCreate, UserContactBase]):
@@ -50,74 +56,145 @@ class CRUDUserContact(CRUDBase[UserContact, UserContactCreate, UserContactBase])
         """
         return db.query(UserContact).filter(UserContact.owner_id == owner_id, UserContact.phone_number == phone_number).first()
 
-    def sync_contacts(self, db: Session, owner_id: int, contacts: List[UserContactBase]) -> dict:
+    def get_owner_country_code(self, db: Session, owner_id: int) -> Optional[str]:
         """
-        Sync contacts from device.
+        Country calling code of the owner's phone.
 
-        This method:
-        1. For each contact, checks if it already exists (same owner_id + phone)
-        2. If exists, updates name and timestamp
-        3. If not exists, creates new UserContact
-        4. Finds which phones are registered users
-        5. Updates registered_user_id for registered contacts
-        6. Returns list of registered contacts
+        Numbers without international prefix in the owner's address book are
+        interpreted in this country.
 
         Args:
             db: Database session
             owner_id: ID of the owner user
-            contacts: List of contact data from device
 
         Returns:
-            Dict with sync results
+            Country code (e.g. "34") or None
         """
-        synced_contacts = []
+        owner_phone = db.query(User.phone_e164).filter(User.id == owner_id).scalar()
+        return country_code_of(owner_phone)
+
+    def upsert_batch(self, db: Session, *, owner_id: int, name_by_phone: Dict[str, str], country_code: Optional[str], synced_at: datetime) -> List[dict]:
+        """
+        Upsert one batch of contacts without committing.
+
+        Resolves registered users by normalized phone in one indexed query and
+        writes all rows with INSERT ... ON CONFLICT (owner_id, phone_number).
+        The batch must not repeat phones and should hold at most
+        SYNC_BATCH_SIZE rows.
+
+        Args:
+            db: Database session
+            owner_id: ID of the owner user
+            name_by_phone: Dict phone_number -> contact_name
+            country_code: Country for numbers without international prefix
+            synced_at: Timestamp stored as last_synced_at
+
+        Returns:
+            List of registered contacts found in the batch
+        """
+        if not name_by_phone:
+            return []
+
+        e164_by_phone = normalize_phones(name_by_phone, country_code)
+        keys = set(e164_by_phone.values()) - {None}
+        e164_to_user = {u.phone_e164: u for u in db.query(User).filter(User.phone_e164.in_(keys)).all()} if keys else {}
+
+        rows = []
         registered_contacts = []
+        for phone, name in name_by_phone.items():
+            e164 = e164_by_phone[phone]
+            registered_user = e164_to_user.get(e164)
+            rows.append({"owner_id": owner_id, "contact_name": name, "phone_number": phone, "phone_e164": e164, "registered_user_id": registered_user.id if registered_user else None, "last_synced_at": synced_at})
 
-        # Extract list of phone numbers
-        phone_numbers = [c.phone_number for c in contacts]
+            if registered_user:
+                registered_contacts.append({"id": registered_user.id, "display_name": registered_user.display_name, "phone": registered_user.phone, "profile_picture_url": registered_user.profile_picture_url})
 
-        # Find registered users with those phones (1 query)
-        registered_users = db.query(User).filter(User.phone.in_(phone_numbers), User.is_public == False).all()  # Only private users (phone auth)
+        stmt = dialect_insert(db, UserContact).values(rows)
+        stmt = stmt.on_conflict_do_update(index_elements=["owner_id", "phone_number"], set_={"contact_name": stmt.excluded.contact_name, "phone_e164": stmt.excluded.phone_e164, "registered_user_id": stmt.excluded.registered_user_id, "last_synced_at": stmt.excluded.last_synced_at, "updated_at": synced_at})
+        db.execute(stmt)
 
-        # Create map phone -> user
-        phone_to_user = {u.phone: u for u in registered_users}
+        return registered_contacts
 
-        # Sync each contact
-        for contact_data in contacts:
-            phone = contact_data.phone_number
-            name = contact_data.contact_name
+    def sync_contacts(self, db: Session, owner_id: int, contacts: List[UserContactBase], chunks: Optional[List[ContactSyncChunk]] = None) -> dict:
+        """
+        Sync contacts from device using bulk statements.
+
+        This method:
+        1. Compares each chunk digest with the one stored on the last sync and
+           skips unchanged chunks (chunks with a new digest but no contacts are
+           reported as stale so the client resends them)
+        2. Normalizes phones to E.164 (owner's country for national numbers) and
+           resolves registered users in one indexed query per batch
+        3. Upserts all contacts with INSERT ... ON CONFLICT (owner_id, phone_number)
+        4. Stores the new chunk digests
+        5. Refreshes the reverse contact index of the owner
+        6. Returns list of registered contacts
+
+        Args:
+            db: Database session
+            owner_id: ID of the owner user
+            contacts: List of contact data from device (always processed)
+            chunks: Optional list of digested chunks for delta sync
 
-            # Check if already exists
-            existing = self.get_by_phone(db, owner_id, phone)
+        Returns:
+            Dict with sync results
+        """
+        now = datetime.now(timezone.utc)
+        to_process = list(contacts)
+        changed_chunks = []
+        skipped_chunks = []
+        skipped_chunk_ids = []
+        stale_chunks = []
+
+        if chunks:
+            stored = {key: (chunk_id, digest) for chunk_id, key, digest in db.query(UserContactSyncChunk.id, UserContactSyncChunk.chunk_key, UserContactSyncChunk.digest).filter(UserContactSyncChunk.owner_id == owner_id, UserContactSyncChunk.chunk_key.in_([c.chunk_key for c in chunks])).all()}
+
+            for chunk in chunks:
+                chunk_id, digest = stored.get(chunk.chunk_key, (None, None))
+                if digest == chunk.digest:
+                    skipped_chunks.append(chunk.chunk_key)
+                    skipped_chunk_ids.append(chunk_id)
+                elif chunk.contacts is None:
+                    stale_chunks.append(chunk.chunk_key)
+                else:
+                    to_process.extend(chunk.contacts)
+                    changed_chunks.append(chunk)
+
+        # One row per phone (last occurrence wins) - ON CONFLICT can't touch the same row twice
+        name_by_phone = {c.phone_number: c.contact_name for c in to_process}
+        phones = list(name_by_phone)
+
+        country_code = self.get_owner_country_code(db, owner_id)
 
-            registered_user = phone_to_user.get(phone)
-            registered_user_id = registered_user.id if registered_user else None
+        registered_contacts = []
+        for i in range(0, len(phones), SYNC_BATCH_SIZE):
+            batch = {phone: name_by_phone[phone] for phone in phones[i : i + SYNC_BATCH_SIZE]}
+            registered_contacts.extend(self.upsert_batch(db, owner_id=owner_id, name_by_phone=batch, country_code=country_code, synced_at=now))
 
-            if existing:
-                # Update
-                existing.contact_name = name
-                existing.registered_user_id = registered_user_id
-                existing.last_synced_at = datetime.now()
-                synced_contacts.append(existing)
-            else:
-                # Create new
-                new_contact = UserContact(owner_id=owner_id, contact_name=name, phone_number=phone, registered_user_id=registered_user_id)
-                db.add(new_contact)
-                synced_contacts.append(new_contact)
+        if changed_chunks:
+            stmt = dialect_insert(db, UserContactSyncChunk).values([{"owner_id": owner_id, "chunk_key": c.chunk_key, "digest": c.digest, "contact_count": len(c.contacts), "last_synced_at": now} for c in changed_chunks])
+            stmt = stmt.on_conflict_do_update(index_elements=["owner_id", "chunk_key"], set_={"digest": stmt.excluded.digest, "contact_count": stmt.excluded.contact_count, "last_synced_at": stmt.excluded.last_synced_at})
+            db.execute(stmt)
 
-            # If registered, add to return list
-            if registered_user:
-                registered_contacts.append({"user_id": registered_user.id, "display_name": registered_user.display_name, "phone": registered_user.phone, "profile_picture_url": registered_user.profile_picture_url, "contact_name": name})  # Name that owner uses
+        if phones:
+            contact_link.refresh_for_owner(db, owner_id=owner_id)
 
         db.commit()
 
-        return {"synced_count": len(synced_contacts), "registered_count": len(registered_contacts), "registered_contacts": registered_contacts}
+        # Unchanged chunks only get their last_synced_at touched: write-behind
+        for chunk_id in skipped_chunk_ids:
+            write_behind.record("sync_chunk_last_synced_at", chunk_id, now)
+
+        return {"synced_count": len(phones), "registered_count": len(registered_contacts), "registered_contacts": registered_contacts, "skipped_chunks": skipped_chunks, "stale_chunks": stale_chunks}
 
     def update_registered_user_for_phone(self, db: Session, phone_number: str, user_id: int) -> int:
         """
         Update all contacts with a specific phone number to link to a registered user.
 
-        This is called when a new user registers with a phone number.
+        This is called when a new user registers with a phone number. Matching
+        uses the normalized phone_e164 key, so the update only touches the
+        partial index of unlinked contacts. The reverse contact index is
+        updated in the same transaction.
 
         Args:
             db: Database session
@@ -127,7 +204,13 @@ class CRUDUserContact(CRUDBase[UserContact, UserContactCreate, UserContactBase])
         Returns:
             Number of contacts updated
         """
-        updated_count = db.query(UserContact).filter(UserContact.phone_number == phone_number, UserContact.registered_user_id.is_(None)).update({"registered_user_id": user_id, "updated_at": datetime.now()})  # Only update unlinked contacts
+        phone_e164 = normalize_phone(phone_number)
+        if not phone_e164:
+            return 0
+
+        updated_count = db.query(UserContact).filter(UserContact.phone_e164 == phone_e164, UserContact.registered_user_id.is_(None)).update({"registered_user_id": user_id, "updated_at": datetime.now(timezone.utc)}, synchronize_session=False)  # Only update unlinked contacts
+
+        contact_link.refresh_for_registered_user(db, user_id=user_id)
 
         db.commit()
         return updated_count
@@ -1,5 +1,8 @@
 """
 Common dependencies for FastAPI routes
+
+Owner/admin and user-flag checks go through the per-request PermissionResolver
+(permissions.py), so repeated checks in one request hit the memo.
 """
 
 from typing import Optional
@@ -8,7 +11,9 @@ from fastapi import HTTPException
 from sqlalchemy.orm import Session
 
 from database import SessionLocal
-from models import Calendar, CalendarMembership, Event, EventInteraction, Group, GroupMembership, User, UserBlock
+from crud import user_block
+from models import Event, EventInteraction
+from permissions import get_permission_resolver
 
 
 def get_db():
@@ -34,11 +39,11 @@ def check_users_not_blocked(user_a_id: int, user_b_id: int, db: Session):
 
     Raises:
         HTTPException 403 if there's a block between the users
-    """
-    # Check if A blocked B or B blocked A
-    block = db.query(UserBlock).filter(((UserBlock.blocker_user_id == user_a_id) & (UserBlock.blocked_user_id == user_b_id)) | ((UserBlock.blocker_user_id == user_b_id) & (UserBlock.blocked_user_id == user_a_id))).first()
 
-    if block:
+    Uses the block cache of user_a_id: pass the user shared by several checks first.
+    """
+    # Check if A blocked B or B blocked A (cached block set of user A)
+    if user_block.is_blocked(db, user_a_id=user_a_id, user_b_id=user_b_id):
         raise HTTPException(status_code=403, detail="Cannot interact with this user due to blocking")
 
 
@@ -58,20 +63,12 @@ def check_event_permission(event_id: int, current_user_id: int, db: Session) ->
         HTTPException 404 if event not found
         HTTPException 403 if user doesn't have permission
     """
-    # Get event
-    event = db.query(Event).filter(Event.id == event_id).first()
-    if not event:
+    allowed = get_permission_resolver(db).can_manage("event", event_id, current_user_id)
+    if allowed is None:
         raise HTTPException(status_code=404, detail="Event not found")
 
-    # Check if user is owner
-    if event.owner_id == current_user_id:
-        return  # Owner has permission
-
-    # Check if user is admin of this event
-    interaction = db.query(EventInteraction).filter(EventInteraction.event_id == event_id, EventInteraction.user_id == current_user_id, EventInteraction.interaction_type == "joined", EventInteraction.role == "admin", EventInteraction.status == "accepted").first()
-
-    if interaction:
-        return  # Admin has permission
+    if allowed:
+        return  # Owner or admin has permission
 
     # No permission
     raise HTTPException(status_code=403, detail="You don't have permission to modify this event. Only the event owner or admins can perform this action.")
@@ -93,20 +90,12 @@ def check_calendar_permission(calendar_id: int, current_user_id: int, db: Sessio
         HTTPException 404 if calendar not found
         HTTPException 403 if user doesn't have permission
     """
-    # Get calendar
-    calendar = db.query(Calendar).filter(Calendar.id == calendar_id).first()
-    if not calendar:
+    allowed = get_permission_resolver(db).can_manage("calendar", calendar_id, current_user_id)
+    if allowed is None:
         raise HTTPException(status_code=404, detail="Calendar not found")
 
-    # Check if user is owner
-    if calendar.owner_id == current_user_id:
-        return  # Owner has permission
-
-    # Check if user is admin of this calendar
-    membership = db.query(CalendarMembership).filter(CalendarMembership.calendar_id == calendar_id, CalendarMembership.user_id == current_user_id, CalendarMembership.role == "admin", CalendarMembership.status == "accepted").first()
-
-    if membership:
-        return  # Admin has permission
+    if allowed:
+        return  # Owner or admin has permission
 
     # No permission
     raise HTTPException(status_code=403, detail="You don't have permission to modify this calendar. Only the calendar owner or admins can perform this action.")
@@ -128,20 +117,12 @@ def check_group_permission(group_id: int, current_user_id: int, db: Session) ->
         HTTPException 404 if group not found
         HTTPException 403 if user doesn't have permission
     """
-    # Get group
-    group = db.query(Group).filter(Group.id == group_id).first()
-    if not group:
+    allowed = get_permission_resolver(db).can_manage("group", group_id, current_user_id)
+    if allowed is None:
         raise HTTPException(status_code=404, detail="Group not found")
 
-    # Check if user is owner
-    if group.owner_id == current_user_id:
-        return  # Owner has permission
-
-    # Check if user is admin of this group
-    membership = db.query(GroupMembership).filter(GroupMembership.group_id == group_id, GroupMembership.user_id == current_user_id, GroupMembership.role == "admin").first()
-
-    if membership:
-        return  # Admin has permission
+    if allowed:
+        return  # Creator or admin has permission
 
     # No permission
     raise HTTPException(status_code=403, detail="You don't have permission to modify this group. Only the group creator or admins can perform this action.")
@@ -159,19 +140,7 @@ def is_event_owner_or_admin(event_id: int, user_id: int, db: Session) -> bool:
     Returns:
         True if user is owner or admin, False otherwise
     """
-    # Get event
-    event = db.query(Event).filter(Event.id == event_id).first()
-    if not event:
-        return False
-
-    # Check if user is owner
-    if event.owner_id == user_id:
-        return True
-
-    # Check if user is admin
-    interaction = db.query(EventInteraction).filter(EventInteraction.event_id == event_id, EventInteraction.user_id == user_id, EventInteraction.interaction_type == "joined", EventInteraction.role == "admin", EventInteraction.status == "accepted").first()
-
-    return interaction is not None
+    return bool(get_permission_resolver(db).can_manage("event", event_id, user_id))
 
 
 def is_calendar_owner_or_admin(calendar_id: int, user_id: int, db: Session) -> bool:
@@ -186,19 +155,7 @@ def is_calendar_owner_or_admin(calendar_id: int, user_id: int, db: Session) -> b
     Returns:
         True if user is owner or admin, False otherwise
     """
-    # Get calendar
-    calendar = db.query(Calendar).filter(Calendar.id == calendar_id).first()
-    if not calendar:
-        return False
-
-    # Check if user is owner
-    if calendar.owner_id == user_id:
-        return True
-
-    # Check if user is admin
-    membership = db.query(CalendarMembership).filter(CalendarMembership.calendar_id == calendar_id, CalendarMembership.user_id == user_id, CalendarMembership.role == "admin", CalendarMembership.status == "accepted").first()
-
-    return membership is not None
+    return bool(get_permission_resolver(db).can_manage("calendar", calendar_id, user_id))
 
 
 def is_group_creator_or_admin(group_id: int, user_id: int, db: Session) -> bool:
@@ -213,19 +170,7 @@ def is_group_creator_or_admin(group_id: int, user_id: int, db: Session) -> bool:
     Returns:
         True if user is creator or admin, False otherwise
     """
-    # Get group
-    group = db.query(Group).filter(Group.id == group_id).first()
-    if not group:
-        return False
-
-    # Check if user is owner
-    if group.owner_id == user_id:
-        return True
-
-    # Check if user is admin
-    membership = db.query(GroupMembership).filter(GroupMembership.group_id == group_id, GroupMembership.user_id == user_id, GroupMembership.role == "admin").first()
-
-    return membership is not None
+    return bool(get_permission_resolver(db).can_manage("group", group_id, user_id))
 
 
 def check_contact_permission(contact_id: int, current_user_id: int, db: Session) -> None:
@@ -269,8 +214,7 @@ def check_is_admin(current_user_id: int, db: Session) -> None:
         HTTPException 404 if user not found
         HTTPException 403 if user is not admin
     """
-    # Get user
-    user = db.query(User).filter(User.id == current_user_id).first()
+    user = get_permission_resolver(db).user_flags(current_user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -293,8 +237,7 @@ def check_user_not_public(user_id: int, db: Session, action_description: str = "
         HTTPException 404 if user not found
         HTTPException 403 if user is public
     """
-    # Get user
-    user = db.query(User).filter(User.id == user_id).first()
+    user = get_permission_resolver(db).user_flags(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -0,0 +1,45 @@
+"""
+Functional tests for set-based calendar deletion (DELETE /calendars/{id})
+"""
+
+from datetime import datetime, timedelta
+
+from crud import event_access as access_crud
+from models import Calendar, CalendarSubscription, Event
+
+
+def _calendar_with_events(db, owner_id, subscriber_id, name, count):
+    calendar = Calendar(owner_id=owner_id, name=name, is_public=True)
+    db.add(calendar)
+    db.commit()
+    start = datetime.now() + timedelta(days=1)
+    db.add_all([Event(name=f"{name} {i}", start_date=start + timedelta(days=i), owner_id=owner_id, calendar_id=calendar.id) for i in range(count)])
+    db.add(CalendarSubscription(calendar_id=calendar.id, user_id=subscriber_id, status="active"))
+    db.commit()
+    return calendar.id
+
+
+def test_delete_calendar_handles_every_event(client, test_db, make_users):
+    """
+    Borrar un calendario desvincula o borra todos sus eventos (más de 100) en una transacción
+    """
+    owner, subscriber = make_users(2)
+    detached_id = _calendar_with_events(test_db, owner.id, subscriber.id, "Festivos", 120)
+    deleted_id = _calendar_with_events(test_db, owner.id, subscriber.id, "Partidos", 110)
+    some_event_id = test_db.query(Event.id).filter(Event.calendar_id == detached_id).first()[0]
+    assert access_crud.has_access(test_db, user_id=subscriber.id, event_id=some_event_id)
+
+    client._auth_context["user_id"] = owner.id
+    response = client.delete(f"/api/v1/calendars/{detached_id}")
+    assert response.status_code == 200
+    assert response.json() == {"message": "Calendar deleted successfully", "id": detached_id, "events_deleted": 0, "events_detached": 120, "memberships_deleted": 0, "subscriptions_deleted": 1}
+
+    # Events stay with their owner but the subscriber no longer sees them
+    assert test_db.query(Event).filter(Event.owner_id == owner.id, Event.calendar_id.is_(None)).count() == 120
+    assert not access_crud.has_access(test_db, user_id=subscriber.id, event_id=some_event_id)
+    assert access_crud.has_access(test_db, user_id=owner.id, event_id=some_event_id)
+
+    response = client.delete(f"/api/v1/calendars/{deleted_id}", params={"delete_events": True})
+    assert response.json()["events_deleted"] == 110
+    assert test_db.query(Event).filter(Event.calendar_id == deleted_id).count() == 0
+    assert test_db.query(Calendar).count() == 0
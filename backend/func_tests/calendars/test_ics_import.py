@@ -0,0 +1,150 @@
+"""
+Functional tests for the ICS importer (POST /calendars/{id}/import, ics_import.py)
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from background_jobs import JobReporter, create_tracked_job
+from crud import event_access as access_crud
+from ics_import import import_ics, iter_vevents, rrule_to_recurrence
+from models import Calendar, CalendarSubscription, Event, RecurringEventConfig
+
+ICS = """BEGIN:VCALENDAR\r
+VERSION:2.0\r
+PRODID:-//Test//ES\r
+BEGIN:VEVENT\r
+UID:partido-1@example.com\r
+DTSTART;TZID=Europe/Madrid:20250310T200000\r
+SUMMARY:Partido de liga\\, jornada 1\r
+DESCRIPTION:Una descripción larga que ocupa\r
+  dos líneas\r
+BEGIN:VALARM\r
+ACTION:DISPLAY\r
+DESCRIPTION:Recordatorio\r
+END:VALARM\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+UID:entreno@example.com\r
+DTSTART:20250303T180000Z\r
+SUMMARY:Entreno\r
+RRULE:FREQ=WEEKLY;BYDAY=MO,WE;UNTIL=20250630T000000Z\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+UID:entreno@example.com\r
+RECURRENCE-ID:20250305T180000Z\r
+DTSTART:20250305T190000Z\r
+SUMMARY:Entreno (cambiado)\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+UID:partido-1@example.com\r
+DTSTART:20250310T190000Z\r
+SUMMARY:Duplicado\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+UID:cuotas@example.com\r
+DTSTART;VALUE=DATE:20250101\r
+SUMMARY:Cuotas\r
+RRULE:FREQ=MONTHLY;BYDAY=1MO\r
+END:VEVENT\r
+END:VCALENDAR\r
+"""
+
+
+def test_import_ics_into_calendar(client, test_db, make_users):
+    """
+    Importa los VEVENT de un ICS como eventos del calendario, con series y deduplicando por UID
+    """
+    owner, subscriber, stranger = make_users(3)
+    calendar = Calendar(owner_id=owner.id, name="Club", is_public=True)
+    test_db.add(calendar)
+    test_db.commit()
+    test_db.add(CalendarSubscription(calendar_id=calendar.id, user_id=subscriber.id, status="active"))
+    test_db.commit()
+    calendar_id = calendar.id
+
+    client._auth_context["user_id"] = stranger.id
+    assert client.post(f"/api/v1/calendars/{calendar_id}/import", content=ICS, headers={"Content-Type": "text/calendar"}).status_code == 403
+
+    client._auth_context["user_id"] = owner.id
+    response = client.post(f"/api/v1/calendars/{calendar_id}/import", content=ICS, headers={"Content-Type": "text/calendar"})
+    assert response.status_code == 202
+    job = client.get(f"/api/v1/jobs/{response.json()['job_id']}").json()
+    assert (job["kind"], job["status"], job["progress"]) == ("import_ics", "done", 5)
+    assert job["result"] == {"imported": 3, "duplicates": 1, "recurring": 1, "unsupported_rrules": 1, "skipped": 1}
+
+    test_db.expire_all()
+    events = {e.external_uid: e for e in test_db.query(Event).filter(Event.calendar_id == calendar_id).all()}
+    assert set(events) == {"partido-1@example.com", "entreno@example.com", "cuotas@example.com"}
+
+    match = events["partido-1@example.com"]
+    assert (match.name, match.description, match.owner_id) == ("Partido de liga, jornada 1", "Una descripción larga que ocupa dos líneas", owner.id)
+    assert match.start_date.replace(tzinfo=timezone.utc) == datetime(2025, 3, 10, 19, 0, tzinfo=timezone.utc)
+    assert events["cuotas@example.com"].event_type == "regular"
+
+    series = events["entreno@example.com"]
+    config = test_db.query(RecurringEventConfig).filter(RecurringEventConfig.event_id == series.id).one()
+    assert (series.event_type, config.recurrence_type) == ("recurring", "weekly")
+    assert [(s["day"], s["time"]) for s in config.schedule] == [(0, "18:00"), (2, "18:00")]
+    assert config.recurrence_end_date.date() == datetime(2025, 6, 30).date()
+    assert access_crud.has_access(test_db, user_id=subscriber.id, event_id=series.id)
+
+    # Importing the same file again doesn't duplicate anything
+    response = client.post(f"/api/v1/calendars/{calendar_id}/import", content=ICS, headers={"Content-Type": "text/calendar"})
+    job = client.get(f"/api/v1/jobs/{response.json()['job_id']}").json()
+    assert (job["result"]["imported"], job["result"]["duplicates"]) == (0, 4)
+    assert test_db.query(Event).filter(Event.calendar_id == calendar_id).count() == 3
+
+
+def test_ics_parsing_is_streaming():
+    """
+    El parser consume las líneas de forma perezosa y traduce las RRULE soportadas
+    """
+
+    def lines():
+        yield "BEGIN:VCALENDAR\n"
+        for i in range(3):
+            yield from ("BEGIN:VEVENT\n", f"UID:{i}\n", "DTSTART:20250101T100000Z\n", "END:VEVENT\n")
+        raise AssertionError("read past the requested events")
+
+    vevents = iter_vevents(lines())
+    assert next(vevents)["UID"] == ({}, "0")
+    assert next(vevents)["UID"] == ({}, "1")
+
+    start = datetime(2025, 1, 15, 10, 0, tzinfo=timezone.utc)
+    assert rrule_to_recurrence("FREQ=DAILY;INTERVAL=2;COUNT=5", start) == {"recurrence_type": "daily", "schedule": [{"interval_days": 2}], "recurrence_end_date": datetime(2025, 1, 23, 10, 0, tzinfo=timezone.utc)}
+    assert rrule_to_recurrence("FREQ=YEARLY", start)["schedule"] == [{"month": 1, "day_of_month": 15}]
+    assert rrule_to_recurrence("FREQ=MONTHLY;BYMONTHDAY=1,15", start)["schedule"] == [{"day_of_month": 1}, {"day_of_month": 15}]
+    assert rrule_to_recurrence("FREQ=WEEKLY;INTERVAL=2", start) is None
+    assert rrule_to_recurrence("FREQ=YEARLY;BYMONTHDAY=-1", start) is None
+
+    # COUNT ends the series on its exact last occurrence
+    monday = datetime(2025, 1, 13, 18, 0, tzinfo=timezone.utc)
+    assert rrule_to_recurrence("FREQ=WEEKLY;BYDAY=MO,WE,FR;COUNT=4", monday)["recurrence_end_date"] == datetime(2025, 1, 20, 18, 0, tzinfo=timezone.utc)
+    end_of_month = datetime(2025, 1, 31, 9, 0, tzinfo=timezone.utc)
+    assert rrule_to_recurrence("FREQ=MONTHLY;BYMONTHDAY=31;COUNT=3", end_of_month)["recurrence_end_date"] == datetime(2025, 5, 31, 9, 0, tzinfo=timezone.utc)
+
+
+def test_failed_import_keeps_access_of_committed_batches(client, test_db, make_users):
+    """
+    Si la importación falla a medias, los lotes ya confirmados tienen sus filas de event_access
+    """
+    [owner] = make_users(1)
+    calendar = Calendar(owner_id=owner.id, name="Club", is_public=True)
+    test_db.add(calendar)
+    test_db.commit()
+
+    def lines():
+        for i in range(3):
+            yield from ("BEGIN:VEVENT\n", f"UID:{i}\n", "DTSTART:20250101T100000Z\n", "END:VEVENT\n")
+        # Fails while the third VEVENT is still being read
+        raise OSError("connection lost")
+
+    job = create_tracked_job(test_db, kind="import_ics", requested_by=owner.id)
+    with pytest.raises(OSError):
+        import_ics(test_db, lines=lines(), calendar_id=calendar.id, owner_id=owner.id, reporter=JobReporter(test_db, job.id), batch_size=1)
+
+    event_ids = [event_id for (event_id,) in test_db.query(Event.id).filter(Event.calendar_id == calendar.id)]
+    assert len(event_ids) == 2
+    assert [access_crud.has_access(test_db, user_id=owner.id, event_id=event_id) for event_id in event_ids] == [True, True]
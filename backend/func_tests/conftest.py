@@ -2,6 +2,7 @@
 Fixtures para tests funcionales basados en JSON
 """
 
+import itertools
 import os
 
 import pytest
@@ -13,8 +14,12 @@ def pytest_addoption(parser):
     parser.addoption("--update-expected", action="store_true", default=False, help="Update expected.body in test files with actual normalized responses")
 
 
+import sqlite3
+
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.event import listens_for
 from sqlalchemy.orm import sessionmaker
 
 # Set test database URL BEFORE importing database module
@@ -27,6 +32,15 @@ from main import app
 TEST_DATABASE_URL = "sqlite:///./func_test.db"
 
 
+@listens_for(Engine, "connect")
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    """SQLite no aplica las FK (ni ON DELETE CASCADE / SET NULL) salvo que se active por conexión"""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
 @pytest.fixture(scope="function")
 def test_engine():
     """Crear engine de BD para tests"""
@@ -36,6 +50,17 @@ def test_engine():
     Base.metadata.drop_all(bind=engine)
     engine.dispose()
 
+    # Las cachés en proceso apuntan a filas que ya no existen (los ids se reutilizan)
+    from crud.crud_user import public_stats_cache
+    from crud.crud_user_block import blocked_sets_cache
+    from social_graph import social_graph
+    from write_behind import write_behind
+
+    public_stats_cache.clear()
+    blocked_sets_cache.clear()
+    social_graph.clear()
+    write_behind.clear()
+
 
 @pytest.fixture(scope="function")
 def test_db(test_engine):
@@ -50,6 +75,26 @@ def test_db(test_engine):
         db.close()
 
 
+@pytest.fixture
+def make_users(test_db):
+    """Factoría de usuarios privados con teléfono y auth_id únicos: make_users(n, **overrides) -> lista de User"""
+    from crud import user as user_crud
+    from schemas import UserCreate
+
+    sequence = itertools.count()
+
+    def make(n, **overrides):
+        users = []
+        for _ in range(n):
+            i = next(sequence)
+            phone = f"+34698{i:06d}"
+            fields = {"display_name": f"User {i}", "phone": phone, "auth_provider": "phone", "auth_id": phone, "is_public": False, **overrides}
+            users.append(user_crud.create(test_db, obj_in=UserCreate(**fields)))
+        return users
+
+    return make
+
+
 # Shared context for auth_user_id across requests
 _test_auth_context = {"user_id": None}
 
@@ -0,0 +1,173 @@
+"""
+Functional tests for contact sync (POST /contacts/sync)
+
+Tests the bulk upsert and the digest-based delta protocol.
+"""
+
+import json
+
+import pytest
+from crud import user as user_crud
+from models import UserContact
+from routers.user_contacts import STREAM_MAX_LINE_BYTES
+from schemas import UserCreate
+
+
+@pytest.fixture
+def test_users(test_db):
+    """Create owner and one registered contact"""
+    owner = user_crud.create(test_db, obj_in=UserCreate(display_name="Owner", phone="+34600000001", auth_provider="phone", auth_id="+34600000001", is_public=False))
+    friend = user_crud.create(test_db, obj_in=UserCreate(display_name="Friend", phone="+34600000002", auth_provider="phone", auth_id="+34600000002", is_public=False))
+    return owner, friend
+
+
+def test_sync_upserts_and_links_registered_users(client, test_db, test_users):
+    """
+    Sync crea contactos nuevos, actualiza los existentes y enlaza los registrados
+    """
+    owner, friend = test_users
+    client._auth_context["user_id"] = owner.id
+
+    payload = {"contacts": [{"contact_name": "Amigo", "phone_number": friend.phone}, {"contact_name": "Desconocido", "phone_number": "+34699999999"}]}
+    response = client.post("/api/v1/contacts/sync", json=payload)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["synced_count"] == 2
+    assert data["registered_count"] == 1
+    assert data["registered_contacts"][0]["id"] == friend.id
+
+    # Second sync renames the contact instead of duplicating it
+    payload["contacts"][0]["contact_name"] = "Amigo renombrado"
+    response = client.post("/api/v1/contacts/sync", json=payload)
+    assert response.status_code == 200
+
+    contacts = test_db.query(UserContact).filter(UserContact.owner_id == owner.id).all()
+    assert len(contacts) == 2
+    by_phone = {c.phone_number: c for c in contacts}
+    assert by_phone[friend.phone].contact_name == "Amigo renombrado"
+    assert by_phone[friend.phone].registered_user_id == friend.id
+    assert by_phone["+34699999999"].registered_user_id is None
+
+
+def test_sync_skips_unchanged_chunks(client, test_db, test_users):
+    """
+    Los bloques con el mismo digest no se reprocesan; los cambiados sin contactos se marcan como stale
+    """
+    owner, friend = test_users
+    client._auth_context["user_id"] = owner.id
+
+    chunk = {"chunk_key": "A", "digest": "d1", "contacts": [{"contact_name": "Amigo", "phone_number": friend.phone}]}
+    response = client.post("/api/v1/contacts/sync", json={"chunks": [chunk]})
+    assert response.json()["synced_count"] == 1
+
+    # Same digest: nothing processed
+    response = client.post("/api/v1/contacts/sync", json={"chunks": [{"chunk_key": "A", "digest": "d1"}]})
+    data = response.json()
+    assert data["synced_count"] == 0
+    assert data["skipped_chunks"] == ["A"]
+
+    # New digest without contacts: client must resend the chunk
+    response = client.post("/api/v1/contacts/sync", json={"chunks": [{"chunk_key": "A", "digest": "d2"}]})
+    data = response.json()
+    assert data["synced_count"] == 0
+    assert data["stale_chunks"] == ["A"]
+
+
+def test_sync_matches_national_format_in_owner_country(client, test_db, test_users):
+    """
+    Un número sin prefijo internacional se normaliza con el país del owner
+    """
+    owner, friend = test_users
+    client._auth_context["user_id"] = owner.id
+
+    response = client.post("/api/v1/contacts/sync", json={"contacts": [{"contact_name": "Amigo", "phone_number": "600 00 00 02"}]})
+    assert response.status_code == 200
+    assert response.json()["registered_contacts"][0]["id"] == friend.id
+
+    contact = test_db.query(UserContact).filter(UserContact.owner_id == owner.id).one()
+    assert contact.phone_e164 == "+34600000002"
+
+
+def test_sync_stream_ndjson(client, test_db, test_users):
+    """
+    Sync por NDJSON: procesa por lotes y devuelve los registrados más un resumen
+    """
+    owner, friend = test_users
+    client._auth_context["user_id"] = owner.id
+
+    lines = [json.dumps({"contact_name": f"Contacto {i}", "phone_number": f"+3461{i:07d}"}) for i in range(1200)]
+    lines.append(json.dumps({"contact_name": "Amigo", "phone_number": friend.phone}))
+    response = client.post("/api/v1/contacts/sync/stream", content="\n".join(lines).encode(), headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200
+
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert results[0]["registered_contact"]["id"] == friend.id
+    assert results[-1]["summary"] == {"synced_count": 1201, "registered_count": 1}
+    assert test_db.query(UserContact).filter(UserContact.owner_id == owner.id).count() == 1201
+
+
+def test_sync_stream_invalid_line_rolls_back(client, test_db, test_users):
+    """
+    Una línea inválida devuelve 400 y no guarda nada
+    """
+    owner, friend = test_users
+    client._auth_context["user_id"] = owner.id
+
+    body = json.dumps({"contact_name": "Amigo", "phone_number": friend.phone}) + "\n{not json}\n"
+    response = client.post("/api/v1/contacts/sync/stream", content=body.encode())
+    assert response.status_code == 400
+    assert "line 2" in response.json()["detail"]
+    assert test_db.query(UserContact).filter(UserContact.owner_id == owner.id).count() == 0
+
+
+def test_sync_stream_rejects_unbounded_line(client, test_db, test_users):
+    """
+    Una línea sin salto de línea que supera el límite devuelve 413 y no guarda nada
+    """
+    owner, friend = test_users
+    client._auth_context["user_id"] = owner.id
+
+    body = json.dumps({"contact_name": "Amigo", "phone_number": friend.phone}) + "\n" + "x" * (STREAM_MAX_LINE_BYTES + 1)
+    response = client.post("/api/v1/contacts/sync/stream", content=body.encode())
+    assert response.status_code == 413
+    assert "Line 2" in response.json()["detail"]
+    assert test_db.query(UserContact).filter(UserContact.owner_id == owner.id).count() == 0
+
+
+def test_known_by_and_mutual_contacts(client, test_db, test_users):
+    """
+    El índice inverso responde "quién me tiene" y los contactos mutuos tras cada sync
+    """
+    owner, friend = test_users
+
+    # Owner has friend in contacts
+    client._auth_context["user_id"] = owner.id
+    client.post("/api/v1/contacts/sync", json={"contacts": [{"contact_name": "Amigo", "phone_number": friend.phone}]})
+
+    client._auth_context["user_id"] = friend.id
+    response = client.get("/api/v1/contacts/known-by")
+    assert [(u["id"], u["is_mutual"]) for u in response.json()] == [(owner.id, False)]
+    assert client.get("/api/v1/contacts/mutual").json() == []
+
+    # Friend adds owner back: now mutual on both sides
+    client.post("/api/v1/contacts/sync", json={"contacts": [{"contact_name": "Owner", "phone_number": owner.phone}]})
+    assert [u["id"] for u in client.get("/api/v1/contacts/mutual").json()] == [owner.id]
+
+    client._auth_context["user_id"] = owner.id
+    assert [u["id"] for u in client.get("/api/v1/contacts/mutual").json()] == [friend.id]
+
+
+def test_registration_links_existing_contacts(client, test_db, test_users):
+    """
+    Al registrarse, los contactos existentes se enlazan y aparecen en el índice inverso
+    """
+    owner, friend = test_users
+    client._auth_context["user_id"] = owner.id
+    client.post("/api/v1/contacts/sync", json={"contacts": [{"contact_name": "Nuevo", "phone_number": "600 00 00 03"}]})
+
+    response = client.post("/api/v1/users", json={"display_name": "Nuevo", "phone": "+34600000003", "auth_provider": "phone", "auth_id": "+34600000003"})
+    assert response.status_code in (200, 201)
+    new_user_id = response.json()["id"]
+
+    client._auth_context["user_id"] = new_user_id
+    assert [u["id"] for u in client.get("/api/v1/contacts/known-by").json()] == [owner.id]
@@ -0,0 +1,59 @@
+"""
+Functional tests for batch invitations (POST /events/{id}/interaction/invite/batch)
+"""
+
+from datetime import datetime, timedelta
+
+from crud import event as event_crud, event_access as access_crud, event_interaction as interaction_crud, group as group_crud, group_membership as membership_crud, user as user_crud
+from models import EventBan, EventInteraction, UserBlock
+from schemas import EventCreate, EventInteractionCreate, GroupCreate, GroupMembershipCreate, UserCreate
+
+
+def test_batch_invite_group_with_outcomes(client, test_db, make_users):
+    """
+    Invitar a un grupo crea las invitaciones válidas y devuelve el resultado de cada usuario
+    """
+    users = make_users(6)
+    owner, ok_a, ok_b, blocked, banned, already = users
+    public_user = user_crud.create(test_db, obj_in=UserCreate(display_name="Public", auth_provider="instagram", auth_id="public_batch", instagram_username="public_batch", is_public=True))
+
+    db_event = event_crud.create(test_db, obj_in=EventCreate(name="Cena", start_date=datetime.now() + timedelta(days=1), owner_id=owner.id))
+    db_group, _ = group_crud.create_with_validation(test_db, obj_in=GroupCreate(name="Amigos", owner_id=owner.id))
+    for member in (ok_a, ok_b, blocked, banned, already, public_user):
+        membership_crud.create(test_db, obj_in=GroupMembershipCreate(group_id=db_group.id, user_id=member.id, role="member"))
+    interaction_crud.create(test_db, obj_in=EventInteractionCreate(user_id=already.id, event_id=db_event.id, interaction_type="invited", status="pending", invited_by_user_id=owner.id))
+    test_db.add(UserBlock(blocker_user_id=blocked.id, blocked_user_id=owner.id))
+    test_db.add(EventBan(event_id=db_event.id, user_id=banned.id, banned_by=owner.id))
+    test_db.commit()
+
+    client._auth_context["user_id"] = owner.id
+    response = client.post(f"/api/v1/events/{db_event.id}/interaction/invite/batch", json={"group_id": db_group.id, "user_ids": [999999]})
+    assert response.status_code == 200
+    data = response.json()
+
+    outcomes = {r["user_id"]: r["outcome"] for r in data["results"]}
+    assert outcomes == {
+        999999: "not_found",
+        ok_a.id: "invited",
+        ok_b.id: "invited",
+        blocked.id: "blocked",
+        banned.id: "banned",
+        already.id: "already_interacting",
+        public_user.id: "public_user",
+    }
+    assert data["invited_count"] == 2
+
+    created = test_db.query(EventInteraction).filter(EventInteraction.event_id == db_event.id, EventInteraction.user_id.in_([ok_a.id, ok_b.id])).all()
+    assert {(i.status, i.invited_by_user_id, i.invited_via_group_id) for i in created} == {("pending", owner.id, db_group.id)}
+    assert access_crud.has_access(test_db, user_id=ok_a.id, event_id=db_event.id)
+
+    # Inviting the same users again is idempotent
+    response = client.post(f"/api/v1/events/{db_event.id}/interaction/invite/batch", json={"user_ids": [ok_a.id, ok_b.id]})
+    assert response.json()["invited_count"] == 0
+
+    # Only group members can fan out a group invitation
+    client._auth_context["user_id"] = ok_a.id
+    other_event = event_crud.create(test_db, obj_in=EventCreate(name="Otra", start_date=datetime.now() + timedelta(days=2), owner_id=ok_a.id))
+    stranger_group, _ = group_crud.create_with_validation(test_db, obj_in=GroupCreate(name="Ajeno", owner_id=ok_b.id))
+    response = client.post(f"/api/v1/events/{other_event.id}/interaction/invite/batch", json={"group_id": stranger_group.id})
+    assert response.status_code == 403
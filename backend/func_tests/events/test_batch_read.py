@@ -0,0 +1,57 @@
+"""
+Functional tests for batch mark-as-read (POST /interactions/mark-read, POST /events/cancellations/view)
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from crud import event as event_crud, event_interaction as interaction_crud
+from models import EventCancellation, EventCancellationRecipient, EventCancellationView, EventInteraction
+from schemas import EventCreate, EventInteractionCreate
+
+
+def test_mark_interactions_read_in_batch(client, test_db, make_users):
+    """
+    Marca como leídas varias interacciones del usuario (por ids o por fecha) sin tocar las de otros
+    """
+    owner, me, other = make_users(3)
+    events = [event_crud.create(test_db, obj_in=EventCreate(name=f"Evento {i}", start_date=datetime.now() + timedelta(days=i + 1), owner_id=owner.id)) for i in range(3)]
+    mine = [interaction_crud.create(test_db, obj_in=EventInteractionCreate(user_id=me.id, event_id=e.id, interaction_type="invited", status="pending", invited_by_user_id=owner.id)) for e in events]
+    theirs = interaction_crud.create(test_db, obj_in=EventInteractionCreate(user_id=other.id, event_id=events[0].id, interaction_type="invited", status="pending", invited_by_user_id=owner.id))
+
+    client._auth_context["user_id"] = me.id
+    response = client.post("/api/v1/interactions/mark-read", json={"ids": [mine[0].id, theirs.id]})
+    assert response.status_code == 200
+    assert response.json() == {"updated_count": 1}
+
+    response = client.post("/api/v1/interactions/mark-read", json={"before": (datetime.now(timezone.utc) + timedelta(minutes=1)).isoformat()})
+    assert response.json() == {"updated_count": 2}
+
+    test_db.expire_all()
+    read = {i.id: i.read_at is not None for i in test_db.query(EventInteraction).all()}
+    assert read == {mine[0].id: True, mine[1].id: True, mine[2].id: True, theirs.id: False}
+
+    assert client.post("/api/v1/interactions/mark-read", json={}).status_code == 400
+
+
+def test_mark_cancellations_viewed_in_batch(client, test_db, make_users):
+    """
+    Marca varias cancelaciones como vistas con un único INSERT idempotente
+    """
+    owner, me = make_users(2)
+    cancellations = [EventCancellation(event_id=1000 + i, event_name=f"Cancelado {i}", cancelled_by_user_id=owner.id) for i in range(3)]
+    test_db.add_all(cancellations)
+    test_db.commit()
+    # The third cancellation is not in my inbox
+    test_db.add_all([EventCancellationRecipient(cancellation_id=c.id, user_id=me.id) for c in cancellations[:2]])
+    test_db.add(EventCancellationView(cancellation_id=cancellations[0].id, user_id=me.id))
+    test_db.commit()
+
+    client._auth_context["user_id"] = me.id
+    response = client.post("/api/v1/events/cancellations/view", json={"ids": [c.id for c in cancellations] + [999999]})
+    assert response.status_code == 200
+    assert response.json() == {"updated_count": 1}
+
+    # Everything is viewed now: marking all again inserts nothing
+    response = client.post("/api/v1/events/cancellations/view", json={"before": (datetime.now(timezone.utc) + timedelta(minutes=1)).isoformat()})
+    assert response.json() == {"updated_count": 0}
+    assert test_db.query(EventCancellationView).filter(EventCancellationView.user_id == me.id).count() == 2
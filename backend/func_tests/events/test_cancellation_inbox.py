@@ -0,0 +1,43 @@
+"""
+Functional tests for the per-user cancellation inbox (DELETE /events/{id}, GET /events/cancellations)
+"""
+
+from datetime import datetime, timedelta
+
+from crud import event as event_crud, event_interaction as interaction_crud
+from models import EventCancellationRecipient
+from schemas import EventCreate, EventInteractionCreate
+
+
+def test_delete_fans_out_cancellation_to_interacting_users(client, test_db, make_users):
+    """
+    Cancelar un evento solo notifica a los usuarios que tenían interacción con él
+    """
+    owner, guest_a, guest_b, outsider = make_users(4)
+    db_event = event_crud.create(test_db, obj_in=EventCreate(name="Cena", start_date=datetime.now() + timedelta(days=1), owner_id=owner.id))
+    lonely_event = event_crud.create(test_db, obj_in=EventCreate(name="Sin invitados", start_date=datetime.now() + timedelta(days=2), owner_id=owner.id))
+    for guest in (guest_a, guest_b):
+        interaction_crud.create(test_db, obj_in=EventInteractionCreate(user_id=guest.id, event_id=db_event.id, interaction_type="invited", status="pending", invited_by_user_id=owner.id))
+
+    client._auth_context["user_id"] = owner.id
+    body = {"cancelled_by_user_id": owner.id, "cancellation_message": "Se suspende"}
+    assert client.request("DELETE", f"/api/v1/events/{db_event.id}", json=body).status_code == 200
+    assert client.request("DELETE", f"/api/v1/events/{lonely_event.id}", json=body).status_code == 200
+
+    assert sorted(r.user_id for r in test_db.query(EventCancellationRecipient).all()) == sorted([guest_a.id, guest_b.id])
+
+    client._auth_context["user_id"] = guest_a.id
+    response = client.get("/api/v1/events/cancellations")
+    assert response.status_code == 200
+    assert [(c["event_name"], c["message"]) for c in response.json()] == [("Cena", "Se suspende")]
+
+    cancellation_id = response.json()[0]["id"]
+    assert client.post(f"/api/v1/events/cancellations/{cancellation_id}/view").status_code == 200
+    assert client.get("/api/v1/events/cancellations").json() == []
+
+    # Still pending for the other guest; never shown to unrelated users or the canceller
+    client._auth_context["user_id"] = guest_b.id
+    assert len(client.get("/api/v1/events/cancellations").json()) == 1
+    for user_id in (outsider.id, owner.id):
+        client._auth_context["user_id"] = user_id
+        assert client.get("/api/v1/events/cancellations").json() == []
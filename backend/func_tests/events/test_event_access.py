@@ -0,0 +1,108 @@
+"""
+Functional tests for the event_access relation (GET /events, GET /events/{id})
+
+Access rows are maintained by hooks on events, interactions, calendar
+memberships and calendar subscriptions, and must match a full rebuild.
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from crud import event as event_crud, event_access as access_crud, event_interaction as interaction_crud
+from models import Calendar, CalendarSubscription, EventAccess
+from schemas import EventCreate, EventInteractionCreate
+
+
+def _access_rows(db):
+    return sorted((row.user_id, row.event_id, row.via) for row in db.query(EventAccess).all())
+
+
+def test_event_access_follows_calendar_subscriptions(client, test_db, make_users):
+    """
+    Las suscripciones a calendarios dan acceso a sus eventos y lo quitan al borrarse
+    """
+    owner, viewer, stranger = make_users(3)
+    calendar = Calendar(owner_id=owner.id, name="Festivos", is_public=True)
+    test_db.add(calendar)
+    test_db.commit()
+
+    in_calendar = event_crud.create(test_db, obj_in=EventCreate(name="Festivo", start_date=datetime.now() + timedelta(days=1), owner_id=owner.id, calendar_id=calendar.id))
+    invited = event_crud.create(test_db, obj_in=EventCreate(name="Cena", start_date=datetime.now() + timedelta(days=2), owner_id=owner.id))
+    hidden = event_crud.create(test_db, obj_in=EventCreate(name="Privado", start_date=datetime.now() + timedelta(days=3), owner_id=owner.id))
+    interaction_crud.create(test_db, obj_in=EventInteractionCreate(user_id=viewer.id, event_id=invited.id, interaction_type="invited", status="accepted", invited_by_user_id=owner.id))
+
+    subscription = CalendarSubscription(calendar_id=calendar.id, user_id=viewer.id, status="active")
+    test_db.add(subscription)
+    test_db.commit()
+
+    client._auth_context["user_id"] = viewer.id
+    response = client.get("/api/v1/events", params={"order_by": "id"})
+    assert response.status_code == 200
+    assert [e["id"] for e in response.json()] == [in_calendar.id, invited.id]
+    assert client.get(f"/api/v1/events/{in_calendar.id}").status_code == 200
+    assert client.get(f"/api/v1/events/{hidden.id}").status_code == 403
+    assert access_crud.filter_accessible(test_db, user_id=viewer.id, event_ids=[in_calendar.id, invited.id, hidden.id]) == {in_calendar.id, invited.id}
+
+    # Incremental rows match a full rebuild
+    incremental = _access_rows(test_db)
+    access_crud.rebuild(test_db)
+    test_db.commit()
+    assert _access_rows(test_db) == incremental
+
+    # Pausing the subscription revokes access (the owner keeps theirs)
+    subscription.status = "paused"
+    test_db.commit()
+    assert not access_crud.has_access(test_db, user_id=viewer.id, event_id=in_calendar.id)
+    assert access_crud.has_access(test_db, user_id=owner.id, event_id=in_calendar.id)
+
+    client._auth_context["user_id"] = stranger.id
+    assert client.get("/api/v1/events").json() == []
+
+
+def test_event_listing_keeps_accepted_invitations_only(client, test_db, make_users):
+    """
+    GET /events lista invitaciones aceptadas y suscripciones; las pendientes, rechazadas y los joins dan acceso pero no se listan
+    """
+    owner, viewer = make_users(2)
+    events = {}
+    for i, (interaction_type, status) in enumerate([("invited", "accepted"), ("invited", "pending"), ("invited", "rejected"), ("subscribed", "accepted"), ("joined", "pending")]):
+        db_event = event_crud.create(test_db, obj_in=EventCreate(name=f"Evento {i}", start_date=datetime.now() + timedelta(days=i + 1), owner_id=owner.id))
+        interaction_crud.create(test_db, obj_in=EventInteractionCreate(user_id=viewer.id, event_id=db_event.id, interaction_type=interaction_type, status=status, invited_by_user_id=owner.id if interaction_type == "invited" else None))
+        events[(interaction_type, status)] = db_event.id
+    own = event_crud.create(test_db, obj_in=EventCreate(name="Mío", start_date=datetime.now() + timedelta(days=10), owner_id=viewer.id))
+
+    client._auth_context["user_id"] = viewer.id
+    listed = [e["id"] for e in client.get("/api/v1/events", params={"order_by": "id"}).json()]
+    assert listed == [events[("invited", "accepted")], events[("subscribed", "accepted")], own.id]
+
+    # Not listed, still reachable
+    assert client.get(f"/api/v1/events/{events[('invited', 'pending')]}").status_code == 200
+
+
+def test_overlapping_refreshes_dont_conflict(test_db, make_users, monkeypatch):
+    """
+    Dos refrescos con ámbitos solapados (evento nuevo en un calendario y alta de un miembro) no fallan por clave primaria
+    """
+    import crud.crud_event_access as access_module
+
+    owner, member = make_users(2)
+    calendar = Calendar(owner_id=owner.id, name="Club", is_public=False)
+    test_db.add(calendar)
+    test_db.commit()
+    test_db.add(CalendarSubscription(calendar_id=calendar.id, user_id=member.id, status="active"))
+    db_event = event_crud.create(test_db, obj_in=EventCreate(name="Partido", start_date=datetime.now() + timedelta(days=1), owner_id=owner.id, calendar_id=calendar.id))
+    member_id, event_id = member.id, db_event.id
+
+    access_source = access_module._access_source
+
+    def access_source_after_concurrent_refresh(**scope):
+        # The (user, calendar) refresh of another transaction inserted the row after our DELETE
+        test_db.execute(insert(EventAccess).values(user_id=member_id, event_id=event_id, via="subscribed_calendar"))
+        return access_source(**scope)
+
+    monkeypatch.setattr(access_module, "_access_source", access_source_after_concurrent_refresh)
+    access_module.refresh_access(test_db, event_id=event_id)
+    test_db.commit()
+
+    assert (member_id, event_id, "subscribed_calendar") in _access_rows(test_db)
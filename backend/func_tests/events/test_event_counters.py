@@ -0,0 +1,111 @@
+"""
+Functional tests for denormalized counters (event_counters / user_counters)
+
+Triggers only exist on PostgreSQL; here counters are built by the
+reconciliation job and the stats endpoints must read them.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from crud import event as event_crud, event_counter, event_interaction as interaction_crud, user as user_crud
+from crud.crud_counters import reconcile_counters
+from models import EventCounter, UserCounter
+from schemas import EventCreate, EventInteractionCreate, UserCreate
+
+
+@pytest.fixture
+def public_event(test_db):
+    """Public owner with one event, one subscriber and one pending invitation"""
+    owner = user_crud.create(test_db, obj_in=UserCreate(display_name="Club", auth_provider="test", auth_id="club", is_public=True, instagram_username="club"))
+    fan = user_crud.create(test_db, obj_in=UserCreate(display_name="Fan", phone="+34600000010", auth_provider="test", auth_id="fan", is_public=False))
+    event = event_crud.create(test_db, obj_in=EventCreate(name="Concierto", start_date=datetime.now() + timedelta(days=3), owner_id=owner.id))
+    interaction_crud.create(test_db, obj_in=EventInteractionCreate(user_id=fan.id, event_id=event.id, interaction_type="subscribed", status="accepted"))
+    test_db.commit()
+    return owner, fan, event
+
+
+def test_reconcile_builds_and_repairs_counters(test_db, public_event):
+    """
+    La reconciliación crea los contadores y repara las desviaciones
+    """
+    owner, fan, event = public_event
+
+    reconcile_counters(test_db)
+    counter = test_db.query(EventCounter).filter(EventCounter.event_id == event.id).one()
+    assert counter.subscribed_count == 1
+    assert test_db.query(UserCounter).filter(UserCounter.user_id == owner.id).one().subscribers_count == 1
+
+    # Drift (e.g. a write that bypassed the triggers)
+    counter.subscribed_count = 7
+    test_db.commit()
+    assert event_counter.reconcile(test_db) == 1
+    test_db.commit()
+    test_db.refresh(counter)
+    assert counter.subscribed_count == 1
+
+
+def test_stats_read_from_counters(client, test_db, public_event):
+    """
+    Las estadísticas se leen de los contadores cuando existen
+    """
+    owner, fan, event = public_event
+    reconcile_counters(test_db)
+
+    counter = test_db.query(UserCounter).filter(UserCounter.user_id == owner.id).one()
+    counter.subscribers_count = 42
+    test_db.commit()
+
+    response = client.get(f"/api/v1/users/{owner.id}/stats")
+    assert response.status_code == 200
+    assert response.json()["total_subscribers"] == 42
+    assert response.json()["events_stats"][0]["total_joined"] == 0
+
+
+def test_subscriptions_with_stats_single_query(client, test_db, public_event):
+    """
+    Suscripciones con estadísticas en una sola consulta, sin duplicar al owner
+    """
+    from sqlalchemy import event as sa_event
+
+    import database
+
+    owner, fan, event = public_event
+    second = event_crud.create(test_db, obj_in=EventCreate(name="Gira", start_date=datetime.now() + timedelta(days=5), owner_id=owner.id))
+    interaction_crud.create(test_db, obj_in=EventInteractionCreate(user_id=fan.id, event_id=second.id, interaction_type="subscribed", status="accepted"))
+    test_db.commit()
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    sa_event.listen(database.engine, "before_cursor_execute", listener)
+    try:
+        response = client.get(f"/api/v1/users/{fan.id}/subscriptions")
+    finally:
+        sa_event.remove(database.engine, "before_cursor_execute", listener)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [(u["id"], u["total_events_count"], u["new_events_count"], u["subscribers_count"]) for u in data] == [(owner.id, 2, 2, 1)]
+    assert len(statements) <= 2  # user exists + subscriptions
+
+
+def test_public_stats_paginated_and_invalidated(client, test_db, public_event):
+    """
+    Las estadísticas del usuario público se paginan y la caché se invalida al escribir
+    """
+    owner, fan, event = public_event
+    second = event_crud.create(test_db, obj_in=EventCreate(name="Gira", start_date=datetime.now() + timedelta(days=5), owner_id=owner.id))
+    test_db.commit()
+
+    data = client.get(f"/api/v1/users/{owner.id}/stats", params={"limit": 1}).json()
+    assert data["total_events"] == 2
+    assert [e["event_id"] for e in data["events_stats"]] == [event.id]
+
+    data = client.get(f"/api/v1/users/{owner.id}/stats", params={"limit": 1, "offset": 1}).json()
+    assert [(e["event_id"], e["total_joined"]) for e in data["events_stats"]] == [(second.id, 0)]
+
+    # A new interaction bumps the owner's version: no stale cached result
+    interaction_crud.create(test_db, obj_in=EventInteractionCreate(user_id=fan.id, event_id=second.id, interaction_type="joined", status="accepted"))
+    test_db.commit()
+    data = client.get(f"/api/v1/users/{owner.id}/stats", params={"limit": 1, "offset": 1}).json()
+    assert data["events_stats"][0]["total_joined"] == 1
@@ -555,3 +555,195 @@ def test_get_event_attendees_excludes_rejected(client, test_db, test_users):
     assert owner.id in attendee_ids
     assert invitee2.id not in attendee_ids, "Should NOT see user who rejected invitation"
     assert len(data["attendees"]) == 1, "Should only see owner"
+
+
+def test_get_event_detail_batched_queries(client, test_db, test_users):
+    """
+    El detalle se construye con un número fijo de consultas, independiente del número de invitados
+    """
+    from sqlalchemy import event as sa_event
+    from database import engine
+
+    owner, invitee1, invitee2 = test_users
+
+    event = event_crud.create(test_db, obj_in=EventCreate(name="Big Event", start_date=datetime.now() + timedelta(days=1), owner_id=owner.id))
+    for invitee in (invitee1, invitee2):
+        interaction_crud.create(test_db, obj_in=EventInteractionCreate(user_id=invitee.id, event_id=event.id, interaction_type="invited", status="accepted", invited_by_user_id=owner.id))
+
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    for user_id in (owner.id, invitee1.id):
+        client._auth_context["user_id"] = user_id
+        statements.clear()
+        sa_event.listen(engine, "before_cursor_execute", count_statement)
+        try:
+            response = client.get(f"/api/v1/events/{event.id}")
+        finally:
+            sa_event.remove(engine, "before_cursor_execute", count_statement)
+
+        assert response.status_code == 200
+        assert len(statements) <= 4
+
+
+def test_get_event_detail_public_owner_queries(client, test_db, test_users):
+    """
+    Con propietario público (eventos próximos) y sin fila de contadores, el detalle sigue usando como mucho 4 consultas
+    """
+    from sqlalchemy import event as sa_event
+    from database import engine
+
+    _, invitee1, invitee2 = test_users
+    public_owner = user_crud.create(test_db, obj_in=UserCreate(display_name="Sala", auth_provider="instagram", auth_id="sala_detalle", instagram_username="sala_detalle", is_public=True))
+    event = event_crud.create(test_db, obj_in=EventCreate(name="Concierto", start_date=datetime.now() + timedelta(days=1), owner_id=public_owner.id))
+    interaction_crud.create(test_db, obj_in=EventInteractionCreate(user_id=invitee1.id, event_id=event.id, interaction_type="invited", status="accepted", invited_by_user_id=public_owner.id))
+    interaction_crud.create(test_db, obj_in=EventInteractionCreate(user_id=invitee2.id, event_id=event.id, interaction_type="invited", status="pending", invited_by_user_id=public_owner.id))
+
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    client._auth_context["user_id"] = public_owner.id
+    sa_event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        response = client.get(f"/api/v1/events/{event.id}")
+    finally:
+        sa_event.remove(engine, "before_cursor_execute", count_statement)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [e["id"] for e in data["owner_upcoming_events"]] == [event.id]
+    assert data["invitation_stats"] == {"total_invited": 2, "accepted": 1, "pending": 1, "rejected": 0}
+    assert len(statements) <= 4
+
+
+def test_event_interactions_cursor_pagination(client, test_event_with_invitations):
+    """
+    Las interacciones se paginan por cursor, filtran por estado y el detalle incluye contadores
+    """
+    event, owner, invitee1, invitee2, interaction1, interaction2 = test_event_with_invitations
+    client._auth_context["user_id"] = owner.id
+
+    response = client.get(f"/api/v1/events/{event.id}/interactions-enriched", params={"limit": 1})
+    assert response.status_code == 200
+    assert [i["id"] for i in response.json()] == [interaction1.id]
+    assert response.json()[0]["user_name"] == invitee1.display_name
+    assert response.headers["X-Total-Count"] == "2"
+
+    response = client.get(f"/api/v1/events/{event.id}/interactions-enriched", params={"limit": 1, "cursor": response.headers["X-Next-Cursor"]})
+    assert [i["id"] for i in response.json()] == [interaction2.id]
+    assert "X-Next-Cursor" not in response.headers
+
+    response = client.get(f"/api/v1/events/{event.id}/interactions", params={"status": "accepted"})
+    assert [i["id"] for i in response.json()] == [interaction2.id]
+
+    data = client.get(f"/api/v1/events/{event.id}").json()
+    assert data["interactions_count"] == 2
+    assert data["interactions_next_cursor"] is None
+    assert data["attendees_count"] == 1
+
+    response = client.get(f"/api/v1/events/{event.id}/attendees")
+    assert [a["id"] for a in response.json()] == [invitee2.id]
+
+
+def test_invitation_stats_batch(client, test_db, test_event_with_invitations):
+    """
+    Estadísticas de invitaciones de varios eventos en una llamada, solo para eventos propios
+    """
+    event, owner, invitee1, invitee2, interaction1, interaction2 = test_event_with_invitations
+    other_event = event_crud.create(test_db, obj_in=EventCreate(name="Other", start_date=datetime.now() + timedelta(days=2), owner_id=invitee1.id))
+    test_db.commit()
+
+    client._auth_context["user_id"] = owner.id
+    response = client.get("/api/v1/events/invitation-stats", params={"event_ids": [event.id, other_event.id]})
+    assert response.status_code == 200
+    assert response.json() == [{"event_id": event.id, "total_invited": 2, "accepted": 1, "pending": 1, "rejected": 0}]
+
+
+def test_available_invitees_ranked_by_affinity(client, test_db, test_users):
+    """
+    Los invitables se ordenan por afinidad (contactos primero) y se paginan
+    """
+    from models import UserContactLink
+
+    owner, user2, user3 = test_users
+    stranger = user_crud.create(test_db, obj_in=UserCreate(display_name="Stranger", phone="+1234567893", auth_provider="test", auth_id="stranger", is_public=False))
+    event = event_crud.create(test_db, obj_in=EventCreate(name="Cena", start_date=datetime.now() + timedelta(days=1), owner_id=owner.id))
+    test_db.add(UserContactLink(registered_user_id=user3.id, owner_id=owner.id))
+    test_db.commit()
+
+    client._auth_context["user_id"] = owner.id
+    response = client.get(f"/api/v1/events/{event.id}/available-invitees")
+    assert response.status_code == 200
+    assert [u["id"] for u in response.json()] == [user3.id, user2.id, stranger.id]
+
+    response = client.get(f"/api/v1/events/{event.id}/available-invitees", params={"limit": 1, "offset": 1})
+    assert [u["id"] for u in response.json()] == [user2.id]
+
+    response = client.get(f"/api/v1/events/{event.id}/available-invitees", params={"search": "strang"})
+    assert [u["instagram_username"] for u in response.json()] == [None]
+
+
+def test_available_invitees_sql_ranking_without_graph(client, test_db, test_users, monkeypatch):
+    """
+    Sin grafo social construido, la afinidad se calcula en SQL (contactos, grupos y coasistencia) con la misma paginación
+    """
+    from crud import group as group_crud, group_membership as membership_crud
+    from models import UserContactLink
+    from schemas import GroupCreate, GroupMembershipCreate
+    from social_graph import social_graph
+
+    owner, user2, user3 = test_users
+    stranger, attendee = [user_crud.create(test_db, obj_in=UserCreate(display_name=name, phone=f"+123456790{i}", auth_provider="test", auth_id=name.lower(), is_public=False)) for i, name in enumerate(["Stranger", "Attendee"])]
+    event = event_crud.create(test_db, obj_in=EventCreate(name="Cena", start_date=datetime.now() + timedelta(days=1), owner_id=owner.id))
+    past = event_crud.create(test_db, obj_in=EventCreate(name="Concierto", start_date=datetime.now() - timedelta(days=7), owner_id=stranger.id))
+    for guest in (owner, attendee):
+        interaction_crud.create(test_db, obj_in=EventInteractionCreate(user_id=guest.id, event_id=past.id, interaction_type="invited", status="accepted", invited_by_user_id=stranger.id))
+    db_group, _ = group_crud.create_with_validation(test_db, obj_in=GroupCreate(name="Amigos", owner_id=owner.id))
+    for member in (user2, user3):
+        membership_crud.create(test_db, obj_in=GroupMembershipCreate(group_id=db_group.id, user_id=member.id, role="member"))
+    # user3: contact + group, user2: group, attendee: past event together
+    test_db.add(UserContactLink(registered_user_id=user3.id, owner_id=owner.id))
+    test_db.commit()
+
+    monkeypatch.setattr(social_graph, "ready", False)
+    calls = []
+    sql_affinity = event_crud._invitee_affinity
+    monkeypatch.setattr(event_crud, "_invitee_affinity", lambda **kwargs: calls.append(kwargs) or sql_affinity(**kwargs))
+
+    client._auth_context["user_id"] = owner.id
+    response = client.get(f"/api/v1/events/{event.id}/available-invitees")
+    assert response.status_code == 200
+    assert [u["id"] for u in response.json()] == [user3.id, user2.id, attendee.id, stranger.id]
+    assert calls == [{"inviter_id": owner.id}]
+
+    # A page that spans the ranked neighbours and the rest
+    response = client.get(f"/api/v1/events/{event.id}/available-invitees", params={"limit": 2, "offset": 2})
+    assert [u["id"] for u in response.json()] == [attendee.id, stranger.id]
+
+
+def test_available_invitees_exclude_blocks_with_inviter(client, test_db, test_users, monkeypatch):
+    """
+    Los usuarios con bloqueos con quien invita no aparecen, ni entre los vecinos ni en el resto, con o sin grafo
+    """
+    from models import UserBlock, UserContactLink
+    from social_graph import social_graph
+
+    owner, inviter, contact = test_users
+    stranger, blocker = [user_crud.create(test_db, obj_in=UserCreate(display_name=name, phone=f"+123456791{i}", auth_provider="test", auth_id=f"{name.lower()}_inviter", is_public=False)) for i, name in enumerate(["Stranger", "Blocker"])]
+    event = event_crud.create(test_db, obj_in=EventCreate(name="Cena", start_date=datetime.now() + timedelta(days=1), owner_id=owner.id))
+    interaction_crud.create(test_db, obj_in=EventInteractionCreate(user_id=inviter.id, event_id=event.id, interaction_type="joined", status="accepted"))
+    # contact is a neighbour of the inviter (ranked), blocker is not (rest)
+    test_db.add(UserContactLink(registered_user_id=contact.id, owner_id=inviter.id))
+    test_db.add_all([UserBlock(blocker_user_id=contact.id, blocked_user_id=inviter.id), UserBlock(blocker_user_id=inviter.id, blocked_user_id=blocker.id)])
+    test_db.commit()
+
+    client._auth_context["user_id"] = inviter.id
+    for ready in (True, False):
+        monkeypatch.setattr(social_graph, "ready", ready)
+        response = client.get(f"/api/v1/events/{event.id}/available-invitees")
+        assert response.status_code == 200
+        assert [u["id"] for u in response.json()] == [stranger.id]
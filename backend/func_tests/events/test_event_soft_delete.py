@@ -0,0 +1,75 @@
+"""
+Functional tests for soft-deleted events and the background purge (DELETE /events/{id})
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from crud import event as event_crud, event_interaction as interaction_crud
+from crud.crud_user import public_stats_versions
+from models import Event, EventInteraction, RecurringEventConfig
+from schemas import EventCreate, EventInteractionCreate
+from social_graph import social_graph
+
+
+def _raw_count(db, column):
+    """Row count including soft-deleted events"""
+    return db.execute(select(func.count(column)), execution_options={"include_deleted": True}).scalar()
+
+
+def test_deleted_series_is_hidden_then_purged(client, test_db, make_users):
+    """
+    Borrar una serie la oculta al momento (base e instancias) y el purgador la elimina después
+    """
+    owner, guest = make_users(2)
+    base = event_crud.create(test_db, obj_in=EventCreate(name="Clase", start_date=datetime.now() + timedelta(days=1), owner_id=owner.id, event_type="recurring"))
+    config = RecurringEventConfig(event_id=base.id, recurrence_type="weekly", schedule=[{"day": 0, "time": "18:00"}])
+    test_db.add(config)
+    test_db.commit()
+    instances = [event_crud.create(test_db, obj_in=EventCreate(name=f"Clase {i}", start_date=datetime.now() + timedelta(days=7 * i), owner_id=owner.id, parent_recurring_event_id=config.id)) for i in range(1, 3)]
+    kept = event_crud.create(test_db, obj_in=EventCreate(name="Otro", start_date=datetime.now() + timedelta(days=3), owner_id=owner.id))
+    for db_event in (base, instances[0], kept):
+        interaction_crud.create(test_db, obj_in=EventInteractionCreate(user_id=guest.id, event_id=db_event.id, interaction_type="invited", status="accepted", invited_by_user_id=owner.id))
+
+    client._auth_context["user_id"] = owner.id
+    response = client.delete(f"/api/v1/events/{base.id}")
+    assert response.status_code == 200
+    assert response.json()["deleted_count"] == 3
+
+    # Hidden at once, still in the database
+    assert client.get(f"/api/v1/events/{instances[0].id}").status_code == 404
+    client._auth_context["user_id"] = guest.id
+    assert [e["id"] for e in client.get("/api/v1/events").json()] == [kept.id]
+    assert [i["event_id"] for i in client.get(f"/api/v1/interactions?user_id={guest.id}").json()] == [kept.id]
+    assert _raw_count(test_db, Event.id) == 4
+
+    assert event_crud.purge_deleted(test_db, batch_size=1) == 3
+    assert _raw_count(test_db, Event.id) == 1
+    assert _raw_count(test_db, EventInteraction.id) == 1
+    assert event_crud.purge_deleted(test_db) == 0
+
+
+def test_soft_delete_updates_stats_and_graph(client, test_db, make_users, monkeypatch):
+    """
+    Borrar un evento invalida las estadísticas públicas del dueño y quita las aristas de coasistencia del grafo
+    """
+    monkeypatch.setattr(social_graph, "_layers", social_graph._layers)
+    monkeypatch.setattr(social_graph, "ready", social_graph.ready)
+    owner, guest_a, guest_b = make_users(3)
+    db_event = event_crud.create(test_db, obj_in=EventCreate(name="Cena", start_date=datetime.now() + timedelta(days=1), owner_id=owner.id))
+    for guest in (guest_a, guest_b):
+        interaction_crud.create(test_db, obj_in=EventInteractionCreate(user_id=guest.id, event_id=db_event.id, interaction_type="invited", status="accepted", invited_by_user_id=owner.id))
+    social_graph.build(test_db)
+    assert guest_b.id in social_graph.neighbours(guest_a.id)
+    version = public_stats_versions.get(owner.id)
+
+    client._auth_context["user_id"] = owner.id
+    assert client.delete(f"/api/v1/events/{db_event.id}").status_code == 200
+
+    assert public_stats_versions.get(owner.id) > version
+    assert guest_b.id not in social_graph.neighbours(guest_a.id)
+
+    # A rebuild before the purge doesn't bring the edges back
+    social_graph.build(test_db)
+    assert guest_b.id not in social_graph.neighbours(guest_a.id)
@@ -0,0 +1,53 @@
+"""
+Functional tests for the batched permission resolver (permissions.py)
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import event as sa_event
+
+from crud import event as event_crud, event_interaction as interaction_crud
+from dependencies import is_event_owner_or_admin
+from permissions import get_permission_resolver
+from schemas import EventCreate, EventInteractionCreate
+
+
+def test_resolver_batches_and_memoizes(client, test_db, make_users):
+    """
+    Resuelve muchos pares (usuario, evento) con una consulta y los memoiza hasta el commit
+    """
+    owner, admin, member, stranger = make_users(4)
+    events = [event_crud.create(test_db, obj_in=EventCreate(name=f"Evento {i}", start_date=datetime.now() + timedelta(days=i + 1), owner_id=owner.id)) for i in range(3)]
+    interaction_crud.create(test_db, obj_in=EventInteractionCreate(user_id=admin.id, event_id=events[0].id, interaction_type="joined", status="accepted", role="admin"))
+    interaction_crud.create(test_db, obj_in=EventInteractionCreate(user_id=member.id, event_id=events[0].id, interaction_type="joined", status="accepted", role="member"))
+    test_db.commit()
+
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    users = [owner, admin, member, stranger]
+    pairs = [(u.id, e.id) for u in users for e in events] + [(owner.id, 999999)]
+    engine = test_db.get_bind()
+    sa_event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        resolver = get_permission_resolver(test_db)
+        resolved = resolver.can_manage_many("event", pairs)
+        assert len(statements) == 1
+
+        # Memoized: the single checks used by dependencies don't query again
+        assert is_event_owner_or_admin(events[0].id, admin.id, test_db)
+        assert not is_event_owner_or_admin(events[0].id, member.id, test_db)
+        assert len(statements) == 1
+    finally:
+        sa_event.remove(engine, "before_cursor_execute", count_statement)
+
+    assert resolved[(owner.id, 999999)] is None
+    assert [e.id for e in events if resolved[(owner.id, e.id)]] == [e.id for e in events]
+    assert [e.id for e in events if resolved[(admin.id, e.id)]] == [events[0].id]
+    assert not any(resolved[(u.id, e.id)] for u in (member, stranger) for e in events)
+
+    # The memo is dropped after commit
+    test_db.commit()
+    assert get_permission_resolver(test_db) is not resolver
@@ -0,0 +1,71 @@
+"""
+Functional tests for group listing (GET /groups)
+
+The list must be built with a fixed number of queries, independent of the
+number of groups and members on the page.
+"""
+
+import pytest
+from sqlalchemy import event as sa_event
+
+from crud import group as group_crud, group_membership as membership_crud
+from database import engine
+from schemas import GroupCreate, GroupMembershipCreate
+
+
+@pytest.fixture
+def groups_with_members(test_db, make_users):
+    """Create a user that belongs to several groups with several members each"""
+    users = make_users(6)
+    me = users[0]
+
+    groups = []
+    for i in range(5):
+        owner = users[i % 2]
+        db_group, _ = group_crud.create_with_validation(test_db, obj_in=GroupCreate(name=f"Group {i}", owner_id=owner.id))
+        for member in users[2:]:
+            membership_crud.create(test_db, obj_in=GroupMembershipCreate(group_id=db_group.id, user_id=member.id, role="member"))
+        if owner.id != me.id:
+            membership_crud.create(test_db, obj_in=GroupMembershipCreate(group_id=db_group.id, user_id=me.id, role="admin"))
+        groups.append(db_group)
+
+    return me, users, groups
+
+
+def test_list_groups_fixed_query_count(client, groups_with_members):
+    """
+    GET /groups no hace consultas por grupo ni por miembro
+    """
+    me, users, groups = groups_with_members
+    client._auth_context["user_id"] = me.id
+
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    sa_event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        response = client.get("/api/v1/groups")
+    finally:
+        sa_event.remove(engine, "before_cursor_execute", count_statement)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [g["id"] for g in data] == [g.id for g in groups]
+    expected = {g.id: 6 if g.owner_id != me.id else 5 for g in groups}
+    assert {g["id"]: len(g["members"]) + len(g["admins"]) for g in data} == expected
+    assert len(statements) <= 4
+
+
+def test_list_groups_filter_order_and_paginate(client, groups_with_members):
+    """
+    El filtro por owner, la ordenación y la paginación se aplican en SQL
+    """
+    me, users, groups = groups_with_members
+    client._auth_context["user_id"] = me.id
+
+    response = client.get("/api/v1/groups", params={"owner_id": users[1].id, "order_dir": "desc", "limit": 1, "offset": 1})
+    assert response.status_code == 200
+    owned_by_other = [g.id for g in groups if g.owner_id == users[1].id]
+    assert [g["id"] for g in response.json()] == sorted(owned_by_other, reverse=True)[1:2]
@@ -0,0 +1,65 @@
+"""
+Functional tests for account deletion as a tracked background job (DELETE /users/{id}, GET /jobs/{id})
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from crud import event as event_crud, event_access as access_crud, event_interaction as interaction_crud, user_block as block_crud
+from crud.crud_user_block import blocked_sets_cache
+from models import Calendar, CalendarMembership, CalendarSubscription, Event, EventInteraction, Group, GroupMembership, User, UserBlock, UserContact
+from schemas import EventCreate, EventInteractionCreate
+
+
+def test_delete_account_runs_as_tracked_job(client, test_db, make_users):
+    """
+    Borrar la cuenta devuelve 202 con un job y elimina eventos, interacciones y contactos por lotes
+    """
+    leaving, friend, subscriber = make_users(3)
+    own_calendar = Calendar(owner_id=leaving.id, name="Calendario del que se va", is_public=True)
+    own_group = Group(owner_id=leaving.id, name="Grupo del que se va")
+    test_db.add_all([own_calendar, own_group])
+    test_db.commit()
+    own_event = event_crud.create(test_db, obj_in=EventCreate(name="Mío", start_date=datetime.now() + timedelta(days=1), owner_id=leaving.id))
+    friend_event = event_crud.create(test_db, obj_in=EventCreate(name="Del amigo", start_date=datetime.now() + timedelta(days=2), owner_id=friend.id, calendar_id=own_calendar.id))
+    interaction_crud.create(test_db, obj_in=EventInteractionCreate(user_id=friend.id, event_id=own_event.id, interaction_type="invited", status="pending", invited_by_user_id=leaving.id))
+    interaction_crud.create(test_db, obj_in=EventInteractionCreate(user_id=leaving.id, event_id=friend_event.id, interaction_type="invited", status="accepted", invited_by_user_id=friend.id))
+    test_db.add_all([UserContact(owner_id=leaving.id, contact_name=f"Contacto {i}", phone_number=f"+3460000{i:04d}") for i in range(3)])
+    test_db.add(UserBlock(blocker_user_id=friend.id, blocked_user_id=leaving.id))
+    test_db.add(CalendarMembership(calendar_id=own_calendar.id, user_id=friend.id, role="admin", status="accepted"))
+    test_db.add(CalendarSubscription(calendar_id=own_calendar.id, user_id=subscriber.id, status="active"))
+    test_db.add(GroupMembership(group_id=own_group.id, user_id=friend.id, role="member"))
+    test_db.commit()
+    assert access_crud.has_access(test_db, user_id=subscriber.id, event_id=friend_event.id)
+    assert block_crud.blocked_set(test_db, user_id=friend.id) == {leaving.id}
+    leaving_id, friend_id, friend_event_id = leaving.id, friend.id, friend_event.id
+
+    client._auth_context["user_id"] = friend.id
+    assert client.delete(f"/api/v1/users/{leaving.id}").status_code == 403
+
+    client._auth_context["user_id"] = leaving.id
+    response = client.delete(f"/api/v1/users/{leaving.id}")
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    # The job ran after the response (TestClient waits for background tasks)
+    job = client.get(f"/api/v1/jobs/{job_id}").json()
+    assert (job["kind"], job["status"], job["stage"], job["error"]) == ("delete_account", "done", "account", None)
+    assert job["result"] == {"events": 1, "interactions": 1, "contacts": 3, "calendars": 1}
+
+    test_db.expire_all()
+    assert test_db.query(User.id).filter(User.id == leaving_id).first() is None
+    assert test_db.execute(select(Event.id), execution_options={"include_deleted": True}).scalars().all() == [friend_event_id]
+    assert test_db.execute(select(func.count(EventInteraction.id)), execution_options={"include_deleted": True}).scalar() == 0
+    assert test_db.query(UserContact).count() == 0
+    assert blocked_sets_cache.get(friend_id) is None
+
+    # Rows removed by ON DELETE CASCADE, and the calendar's events detached without leaking access
+    for model in (UserBlock, Calendar, CalendarMembership, CalendarSubscription, Group, GroupMembership):
+        assert test_db.query(model).count() == 0, model.__name__
+    assert test_db.get(Event, friend_event_id).calendar_id is None
+    assert not access_crud.has_access(test_db, user_id=subscriber.id, event_id=friend_event_id)
+    assert access_crud.has_access(test_db, user_id=friend_id, event_id=friend_event_id)
+
+    assert client.get("/api/v1/jobs/unknown").status_code == 404
@@ -0,0 +1,88 @@
+"""
+Functional tests for the cached block sets (user_block.blocked_set)
+
+Creating or deleting a block must be visible to the next permission check.
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from crud import event as event_crud, user_block as user_block_crud
+from models import UserBlock
+from schemas import EventCreate
+
+
+def test_block_changes_invalidate_cached_sets(client, test_db, make_users):
+    """
+    Bloquear y desbloquear invalida la caché de bloqueos de ambos usuarios
+    """
+    owner, invitee, other = make_users(3)
+    first = event_crud.create(test_db, obj_in=EventCreate(name="Primero", start_date=datetime.now() + timedelta(days=1), owner_id=owner.id))
+    second = event_crud.create(test_db, obj_in=EventCreate(name="Segundo", start_date=datetime.now() + timedelta(days=2), owner_id=owner.id))
+
+    # Warm the cache
+    assert user_block_crud.blocked_set(test_db, user_id=invitee.id) == frozenset()
+    assert user_block_crud.filter_blocked(test_db, user_id=owner.id, candidate_ids=[other.id, invitee.id]) == [other.id, invitee.id]
+
+    response = client.post("/api/v1/user_blocks", json={"blocker_user_id": invitee.id, "blocked_user_id": owner.id})
+    assert response.status_code == 201
+    block_id = response.json()["id"]
+
+    assert user_block_crud.is_blocked(test_db, user_a_id=owner.id, user_b_id=invitee.id)
+    assert user_block_crud.filter_blocked(test_db, user_id=owner.id, candidate_ids=[other.id, invitee.id]) == [other.id]
+
+    client._auth_context["user_id"] = owner.id
+    response = client.post(f"/api/v1/events/{first.id}/interaction/invite", json={"invited_user_id": invitee.id})
+    assert response.status_code == 403
+
+    client._auth_context["user_id"] = invitee.id
+    assert client.delete(f"/api/v1/user_blocks/{block_id}").status_code == 200
+
+    client._auth_context["user_id"] = owner.id
+    response = client.post(f"/api/v1/events/{second.id}/interaction/invite", json={"invited_user_id": invitee.id})
+    assert response.status_code == 201
+
+
+def test_block_from_another_worker_is_enforced(client, test_db, make_users):
+    """
+    Un bloqueo escrito por otro proceso (sin pasar por los hooks de este) se aplica en la siguiente comprobación
+    """
+    owner, invitee = make_users(2)
+    assert not user_block_crud.is_blocked(test_db, user_a_id=owner.id, user_b_id=invitee.id)
+
+    # Core INSERT: no mapper hooks, like a write committed by another worker
+    test_db.execute(insert(UserBlock).values(blocker_user_id=invitee.id, blocked_user_id=owner.id))
+    test_db.commit()
+
+    assert user_block_crud.is_blocked(test_db, user_a_id=owner.id, user_b_id=invitee.id)
+
+
+def test_repeated_checks_read_block_version_once(client, test_db, make_users):
+    """
+    Las comprobaciones repetidas en una misma transacción leen la versión de bloqueos una sola vez
+    """
+    from sqlalchemy import event as sa_event
+
+    owner, invitee, other = make_users(3)
+    test_db.add(UserBlock(blocker_user_id=invitee.id, blocked_user_id=owner.id))
+    test_db.commit()
+    owner_id, invitee_id, other_id = owner.id, invitee.id, other.id
+    user_block_crud.blocked_set(test_db, user_id=owner_id)
+    test_db.commit()
+
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = test_db.get_bind()
+    sa_event.listen(engine, "before_cursor_execute", count_statement)
+    try:
+        for _ in range(3):
+            assert user_block_crud.is_blocked(test_db, user_a_id=owner_id, user_b_id=invitee_id)
+            assert not user_block_crud.is_blocked(test_db, user_a_id=owner_id, user_b_id=other_id)
+    finally:
+        sa_event.remove(engine, "before_cursor_execute", count_statement)
+
+    assert len(statements) == 1
@@ -0,0 +1,39 @@
+"""
+Functional tests for "friends attending" in the feed (GET /users/{id}/events)
+"""
+
+from datetime import datetime, timedelta
+
+from crud import event as event_crud, event_interaction as interaction_crud
+from models import UserContactLink
+from schemas import EventCreate, EventInteractionCreate
+
+
+def test_feed_includes_friends_attending(client, test_db, make_users):
+    """
+    Cada evento del feed incluye cuántos contactos del usuario asisten y una vista previa
+    """
+    users = make_users(7)
+    me, owner, stranger, *friends = users
+
+    with_friends = event_crud.create(test_db, obj_in=EventCreate(name="Con amigos", start_date=datetime.now() + timedelta(days=1), owner_id=owner.id))
+    without_friends = event_crud.create(test_db, obj_in=EventCreate(name="Sin amigos", start_date=datetime.now() + timedelta(days=2), owner_id=owner.id))
+
+    for ev in (with_friends, without_friends):
+        interaction_crud.create(test_db, obj_in=EventInteractionCreate(user_id=me.id, event_id=ev.id, interaction_type="invited", status="pending", invited_by_user_id=owner.id))
+        interaction_crud.create(test_db, obj_in=EventInteractionCreate(user_id=stranger.id, event_id=ev.id, interaction_type="invited", status="accepted", invited_by_user_id=owner.id))
+    for friend in friends:
+        interaction_crud.create(test_db, obj_in=EventInteractionCreate(user_id=friend.id, event_id=with_friends.id, interaction_type="invited", status="accepted", invited_by_user_id=owner.id))
+        test_db.add(UserContactLink(registered_user_id=friend.id, owner_id=me.id))
+    test_db.commit()
+
+    client._auth_context["user_id"] = me.id
+    response = client.get(f"/api/v1/users/{me.id}/events")
+    assert response.status_code == 200
+    by_id = {e["id"]: e for e in response.json()}
+
+    assert by_id[with_friends.id]["friends_attending_count"] == 4
+    assert len(by_id[with_friends.id]["friends_attending"]) == 3
+    assert {f["id"] for f in by_id[with_friends.id]["friends_attending"]} <= {f.id for f in friends}
+    assert by_id[without_friends.id]["friends_attending_count"] == 0
+    assert by_id[without_friends.id]["friends_attending"] == []
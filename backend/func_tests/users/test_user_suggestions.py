@@ -0,0 +1,85 @@
+"""
+Functional tests for people suggestions (GET /users/me/suggestions)
+
+Suggestions are served from the in-memory social graph.
+"""
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+import social_graph as social_graph_module
+from crud import group as group_crud, group_membership as membership_crud, user as user_crud
+from models import GroupMembership, UserBlock, UserContactLink
+from schemas import GroupCreate, GroupMembershipCreate, UserCreate
+from social_graph import social_graph
+
+
+@pytest.fixture
+def graph(test_db, monkeypatch):
+    """Restore the process-wide graph after the test"""
+    monkeypatch.setattr(social_graph, "_layers", social_graph._layers)
+    monkeypatch.setattr(social_graph, "ready", social_graph.ready)
+    return social_graph
+
+
+def test_suggestions_from_shared_groups(client, test_db, make_users, graph):
+    """
+    Sugiere miembros de grupos compartidos, excluyendo contactos, bloqueados y usuarios públicos
+    """
+    users = make_users(5)
+    public_user = user_crud.create(test_db, obj_in=UserCreate(display_name="Public", auth_provider="instagram", auth_id="public_suggest", instagram_username="public_suggest", is_public=True))
+    me, two_groups, contact, blocked, stranger = users
+
+    for name in ("A", "B"):
+        db_group, _ = group_crud.create_with_validation(test_db, obj_in=GroupCreate(name=name, owner_id=me.id))
+        for member in (two_groups, contact, blocked, public_user):
+            membership_crud.create(test_db, obj_in=GroupMembershipCreate(group_id=db_group.id, user_id=member.id, role="member"))
+        if name == "A":
+            [one_group] = make_users(1)
+            membership_crud.create(test_db, obj_in=GroupMembershipCreate(group_id=db_group.id, user_id=one_group.id, role="member"))
+
+    test_db.add(UserContactLink(registered_user_id=contact.id, owner_id=me.id))
+    test_db.commit()
+    graph.build(test_db)
+
+    # Blocks are read from user_block, not from the graph snapshot
+    test_db.add(UserBlock(blocker_user_id=blocked.id, blocked_user_id=me.id))
+    test_db.commit()
+
+    client._auth_context["user_id"] = me.id
+    response = client.get("/api/v1/users/me/suggestions")
+    assert response.status_code == 200
+    data = response.json()
+
+    assert [s["id"] for s in data] == [two_groups.id, one_group.id]
+    assert data[0]["score"] > data[1]["score"]
+    assert stranger.id not in [s["id"] for s in data]
+
+
+def test_rebuild_keeps_changes_committed_while_building(client, test_db, make_users, graph, monkeypatch):
+    """
+    Un cambio confirmado mientras se reconstruye el grafo no se pierde al sustituir la instantánea
+    """
+    me, friend = make_users(2)
+    db_group, _ = group_crud.create_with_validation(test_db, obj_in=GroupCreate(name="Amigos", owner_id=me.id))
+    graph.build(test_db)
+
+    load_rows = social_graph_module._load_rows
+    other_worker = sessionmaker(bind=test_db.get_bind())()
+
+    def load_rows_with_concurrent_write(db, layer, user_ids=None):
+        rows = load_rows(db, layer, user_ids)
+        if layer == "group" and user_ids is None:
+            # Committed after the group layer was read, before the swap
+            other_worker.add(GroupMembership(group_id=db_group.id, user_id=friend.id, role="member"))
+            other_worker.commit()
+        return rows
+
+    monkeypatch.setattr(social_graph_module, "_load_rows", load_rows_with_concurrent_write)
+    try:
+        graph.build(test_db)
+    finally:
+        other_worker.close()
+
+    assert graph.neighbours(me.id) == {friend.id: 2.0}
+    assert graph.neighbours(friend.id) == {me.id: 2.0}
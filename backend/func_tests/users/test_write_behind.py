@@ -0,0 +1,87 @@
+"""
+Functional tests for the write-behind buffer (write_behind.py)
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from auth import get_current_user_id
+from crud import event as event_crud, event_interaction as interaction_crud
+from models import EventInteraction, User
+from schemas import EventCreate, EventInteractionCreate
+from write_behind import write_behind
+
+
+@pytest.fixture
+def no_periodic_flush(monkeypatch):
+    """Keep the periodic flush job from running during the test (must come before client)"""
+    monkeypatch.setattr("main.WRITE_BEHIND_FLUSH_INTERVAL_MS", 3_600_000)
+
+
+def test_mark_read_is_buffered_until_flush(no_periodic_flush, client, test_db, make_users):
+    """
+    Marcar como leída responde con read_at al momento pero la escritura se aplaza hasta el flush
+    """
+    owner, invitee = make_users(2)
+    db_event = event_crud.create(test_db, obj_in=EventCreate(name="Cena", start_date=datetime.now() + timedelta(days=1), owner_id=owner.id))
+    interaction = interaction_crud.create(test_db, obj_in=EventInteractionCreate(user_id=invitee.id, event_id=db_event.id, interaction_type="invited", status="pending", invited_by_user_id=owner.id))
+
+    client._auth_context["user_id"] = invitee.id
+    response = client.post(f"/api/v1/interactions/{interaction.id}/mark-read")
+    assert response.status_code == 200
+    assert response.json()["read_at"] is not None
+    assert response.json()["is_new"] is False
+
+    test_db.expire_all()
+    assert test_db.get(EventInteraction, interaction.id).read_at is None
+
+    # Marking again coalesces into the same pending row
+    client.post(f"/api/v1/interactions/{interaction.id}/mark-read")
+    assert write_behind.pending_count() == 1
+
+    assert write_behind.flush(test_db) == 1
+    test_db.expire_all()
+    assert test_db.get(EventInteraction, interaction.id).read_at is not None
+    assert write_behind.pending_count() == 0
+
+
+def test_flush_keeps_latest_timestamp(no_periodic_flush, client, test_db, make_users):
+    """
+    last_login solo avanza: un valor antiguo pendiente no pisa uno más reciente
+    """
+    users = make_users(3)
+    now = datetime.now(timezone.utc)
+    users[0].last_login = now
+    test_db.commit()
+
+    write_behind.record("user_last_login", users[0].id, now - timedelta(hours=1))
+    write_behind.record("user_last_login", users[1].id, now - timedelta(hours=2))
+    write_behind.record("user_last_login", users[1].id, now - timedelta(hours=1))
+    write_behind.record("user_last_login", users[2].id, now)
+    assert write_behind.flush(test_db) == 3
+
+    test_db.expire_all()
+    last_login = {u.id: u.last_login.replace(tzinfo=timezone.utc) if u.last_login else None for u in test_db.query(User).all()}
+    assert last_login == {users[0].id: now, users[1].id: now - timedelta(hours=1), users[2].id: now}
+
+
+def test_last_login_moves_only_on_sign_in(no_periodic_flush, client, test_db, make_users):
+    """
+    last_login refleja el inicio de sesión del token (amr), no cada petición autenticada
+    """
+    [db_user] = make_users(1, auth_id="6f1c2d9e-0000-4000-8000-000000000001")
+    signed_in = datetime(2025, 3, 1, 10, 0, tzinfo=timezone.utc)
+    payload = {"sub": db_user.auth_id, "amr": [{"method": "otp", "timestamp": int(signed_in.timestamp())}], "iat": int(signed_in.timestamp()) + 3600}
+
+    assert asyncio.run(get_current_user_id(payload)) == db_user.id
+    assert write_behind.pending_count() == 1
+    write_behind.flush(test_db)
+    test_db.expire_all()
+    assert test_db.get(User, db_user.id).last_login.replace(tzinfo=timezone.utc) == signed_in
+
+    # Later requests (and refreshed tokens) of the same sign-in don't write
+    payload["iat"] += 3600
+    asyncio.run(get_current_user_id(payload))
+    assert write_behind.pending_count() == 0
@@ -168,6 +168,174 @@ def create_calendar_subscription_triggers():
         raise
 
 
+def create_counter_triggers():
+    """
+    Create triggers that maintain the denormalized counters:
+    - event_counters (joined/subscribed/invited per status) on event_interactions
+    - user_counters.subscribers_count (unique subscribers) on event_interactions
+    - user_counters.total_events_count on events
+
+    Each trigger applies the delta of the changed row (old contribution out,
+    new contribution in). Drift is repaired by crud_counters.reconcile_counters.
+    """
+    logger.info("⚙️  Creating counter triggers...")
+
+    try:
+        with engine.connect() as conn:
+            # TRIGGER: event_counters + user_counters.subscribers_count on event_interactions
+            conn.execute(
+                text(
+                    """
+                CREATE OR REPLACE FUNCTION update_event_counters()
+                RETURNS TRIGGER AS $$
+                DECLARE
+                    old_owner_id INTEGER;
+                    new_owner_id INTEGER;
+                BEGIN
+                    IF TG_OP = 'UPDATE' THEN
+                        -- Nothing counted changed (e.g. read_at / note updates)
+                        IF OLD.event_id = NEW.event_id AND OLD.user_id = NEW.user_id
+                           AND OLD.interaction_type IS NOT DISTINCT FROM NEW.interaction_type
+                           AND OLD.status IS NOT DISTINCT FROM NEW.status THEN
+                            RETURN NEW;
+                        END IF;
+                    END IF;
+
+                    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                        -- Remove the contribution of the old row
+                        UPDATE event_counters
+                        SET joined_count = GREATEST(joined_count - CASE WHEN OLD.interaction_type = 'joined' THEN 1 ELSE 0 END, 0),
+                            subscribed_count = GREATEST(subscribed_count - CASE WHEN OLD.interaction_type = 'subscribed' THEN 1 ELSE 0 END, 0),
+                            invited_count = GREATEST(invited_count - CASE WHEN OLD.interaction_type = 'invited' THEN 1 ELSE 0 END, 0),
+                            invited_accepted_count = GREATEST(invited_accepted_count - CASE WHEN OLD.interaction_type = 'invited' AND OLD.status = 'accepted' THEN 1 ELSE 0 END, 0),
+                            invited_pending_count = GREATEST(invited_pending_count - CASE WHEN OLD.interaction_type = 'invited' AND OLD.status = 'pending' THEN 1 ELSE 0 END, 0),
+                            invited_rejected_count = GREATEST(invited_rejected_count - CASE WHEN OLD.interaction_type = 'invited' AND OLD.status = 'rejected' THEN 1 ELSE 0 END, 0),
+                            updated_at = NOW()
+                        WHERE event_id = OLD.event_id;
+
+                        -- Last subscription of this user to any event of the owner
+                        IF OLD.interaction_type = 'subscribed' THEN
+                            SELECT owner_id INTO old_owner_id FROM events WHERE id = OLD.event_id;
+                            IF old_owner_id IS NOT NULL AND NOT EXISTS (
+                                SELECT 1 FROM event_interactions ei JOIN events e ON e.id = ei.event_id
+                                WHERE e.owner_id = old_owner_id AND ei.user_id = OLD.user_id AND ei.interaction_type = 'subscribed'
+                            ) THEN
+                                UPDATE user_counters
+                                SET subscribers_count = GREATEST(subscribers_count - 1, 0), updated_at = NOW()
+                                WHERE user_id = old_owner_id;
+                            END IF;
+                        END IF;
+                    END IF;
+
+                    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                        -- Add the contribution of the new row
+                        INSERT INTO event_counters (event_id, joined_count, subscribed_count, invited_count, invited_accepted_count, invited_pending_count, invited_rejected_count, updated_at)
+                        VALUES (
+                            NEW.event_id,
+                            CASE WHEN NEW.interaction_type = 'joined' THEN 1 ELSE 0 END,
+                            CASE WHEN NEW.interaction_type = 'subscribed' THEN 1 ELSE 0 END,
+                            CASE WHEN NEW.interaction_type = 'invited' THEN 1 ELSE 0 END,
+                            CASE WHEN NEW.interaction_type = 'invited' AND NEW.status = 'accepted' THEN 1 ELSE 0 END,
+                            CASE WHEN NEW.interaction_type = 'invited' AND NEW.status = 'pending' THEN 1 ELSE 0 END,
+                            CASE WHEN NEW.interaction_type = 'invited' AND NEW.status = 'rejected' THEN 1 ELSE 0 END,
+                            NOW()
+                        )
+                        ON CONFLICT (event_id) DO UPDATE
+                        SET joined_count = event_counters.joined_count + EXCLUDED.joined_count,
+                            subscribed_count = event_counters.subscribed_count + EXCLUDED.subscribed_count,
+                            invited_count = event_counters.invited_count + EXCLUDED.invited_count,
+                            invited_accepted_count = event_counters.invited_accepted_count + EXCLUDED.invited_accepted_count,
+                            invited_pending_count = event_counters.invited_pending_count + EXCLUDED.invited_pending_count,
+                            invited_rejected_count = event_counters.invited_rejected_count + EXCLUDED.invited_rejected_count,
+                            updated_at = NOW();
+
+                        -- First subscription of this user to any event of the owner
+                        IF NEW.interaction_type = 'subscribed' THEN
+                            SELECT owner_id INTO new_owner_id FROM events WHERE id = NEW.event_id;
+                            IF new_owner_id IS NOT NULL
+                               AND NOT (TG_OP = 'UPDATE' AND OLD.interaction_type = 'subscribed' AND OLD.user_id = NEW.user_id AND old_owner_id = new_owner_id)
+                               AND NOT EXISTS (
+                                   SELECT 1 FROM event_interactions ei JOIN events e ON e.id = ei.event_id
+                                   WHERE e.owner_id = new_owner_id AND ei.user_id = NEW.user_id AND ei.interaction_type = 'subscribed' AND ei.id <> NEW.id
+                               ) THEN
+                                INSERT INTO user_counters (user_id, total_events_count, subscribers_count, updated_at)
+                                VALUES (new_owner_id, 0, 1, NOW())
+                                ON CONFLICT (user_id) DO UPDATE
+                                SET subscribers_count = user_counters.subscribers_count + 1, updated_at = NOW();
+                            END IF;
+                        END IF;
+                        RETURN NEW;
+                    END IF;
+
+                    RETURN OLD;
+                END;
+                $$ LANGUAGE plpgsql;
+
+                DROP TRIGGER IF EXISTS event_interaction_counters_trigger ON event_interactions;
+                CREATE TRIGGER event_interaction_counters_trigger
+                AFTER INSERT OR DELETE OR UPDATE OF event_id, user_id, interaction_type, status ON event_interactions
+                FOR EACH ROW
+                EXECUTE FUNCTION update_event_counters();
+            """
+                )
+            )
+            logger.info("  ✓ Created event_interaction_counters_trigger")
+
+            # TRIGGER: user_counters.total_events_count on events
+            conn.execute(
+                text(
+                    """
+                CREATE OR REPLACE FUNCTION update_user_event_counters()
+                RETURNS TRIGGER AS $$
+                BEGIN
+                    IF TG_OP = 'UPDATE' AND OLD.owner_id = NEW.owner_id THEN
+                        RETURN NEW;
+                    END IF;
+
+                    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                        UPDATE user_counters
+                        SET total_events_count = GREATEST(total_events_count - 1, 0), updated_at = NOW()
+                        WHERE user_id = OLD.owner_id;
+                    END IF;
+
+                    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                        INSERT INTO user_counters (user_id, total_events_count, subscribers_count, updated_at)
+                        VALUES (NEW.owner_id, 1, 0, NOW())
+                        ON CONFLICT (user_id) DO UPDATE
+                        SET total_events_count = user_counters.total_events_count + 1, updated_at = NOW();
+
+                        -- New events start with an exact (empty) counter row
+                        IF TG_OP = 'INSERT' THEN
+                            INSERT INTO event_counters (event_id, joined_count, subscribed_count, invited_count, invited_accepted_count, invited_pending_count, invited_rejected_count, updated_at)
+                            VALUES (NEW.id, 0, 0, 0, 0, 0, 0, NOW())
+                            ON CONFLICT (event_id) DO NOTHING;
+                        END IF;
+                        RETURN NEW;
+                    END IF;
+
+                    RETURN OLD;
+                END;
+                $$ LANGUAGE plpgsql;
+
+                DROP TRIGGER IF EXISTS event_owner_counters_trigger ON events;
+                CREATE TRIGGER event_owner_counters_trigger
+                AFTER INSERT OR DELETE OR UPDATE OF owner_id ON events
+                FOR EACH ROW
+                EXECUTE FUNCTION update_user_event_counters();
+            """
+                )
+            )
+            logger.info("  ✓ Created event_owner_counters_trigger")
+
+            conn.commit()
+
+        logger.info("✅ Counter triggers created successfully")
+
+    except Exception as e:
+        logger.error(f"❌ Error creating counter triggers: {e}")
+        raise
+
+
 def grant_supabase_permissions():
     """
     Grant necessary permissions to postgres user on Supabase-managed schemas.
@@ -1718,16 +1886,16 @@ def create_database_views():
     try:
         with engine.connect() as conn:
             # Create user_subscriptions_with_stats view
-            # This view provides subscription statistics calculated on-the-fly:
+            # One row per (subscriber, followed public user) with statistics:
             # 1. new_events_count: Events created in last 7 days
-            # 2. total_events_count: Total events owned by user
-            # 3. subscribers_count: Unique subscribers to user's events
+            # 2. total_events_count: Total events owned by user (user_counters if present)
+            # 3. subscribers_count: Unique subscribers to user's events (user_counters if present)
             conn.execute(
                 text(
                     """
                 CREATE OR REPLACE VIEW user_subscriptions_with_stats AS
-                SELECT DISTINCT
-                    ei.user_id AS subscriber_id,
+                SELECT
+                    s.subscriber_id,
                     u.id AS subscribed_to_id,
                     u.display_name,
                     u.phone,
@@ -1740,14 +1908,32 @@ def create_database_views():
                     u.last_login AS last_seen,
                     u.created_at,
                     u.updated_at,
-                    0 AS new_events_count,
-                    0 AS total_events_count,
-                    0 AS subscribers_count
-                FROM event_interactions ei
-                JOIN events e ON e.id = ei.event_id
-                JOIN users u ON u.id = e.owner_id
-                WHERE ei.interaction_type = 'subscribed'
-                AND u.is_public = TRUE
+                    COALESCE(ev.new_events_count, 0) AS new_events_count,
+                    COALESCE(uc.total_events_count, ev.total_events_count, 0) AS total_events_count,
+                    COALESCE(uc.subscribers_count, sc.subscribers_count, 0) AS subscribers_count
+                FROM (
+                    SELECT DISTINCT ei.user_id AS subscriber_id, e.owner_id
+                    FROM event_interactions ei
+                    JOIN events e ON e.id = ei.event_id
+                    WHERE ei.interaction_type = 'subscribed'
+                ) s
+                JOIN users u ON u.id = s.owner_id
+                LEFT JOIN user_counters uc ON uc.user_id = u.id
+                LEFT JOIN LATERAL (
+                    SELECT
+                        COUNT(*) AS total_events_count,
+                        COUNT(*) FILTER (WHERE e.created_at >= NOW() - INTERVAL '7 days') AS new_events_count
+                    FROM events e
+                    WHERE e.owner_id = u.id
+                ) ev ON TRUE
+                LEFT JOIN LATERAL (
+                    -- Only counted when the owner has no counter row
+                    SELECT COUNT(DISTINCT ei.user_id) AS subscribers_count
+                    FROM event_interactions ei
+                    JOIN events e ON e.id = ei.event_id
+                    WHERE e.owner_id = u.id AND ei.interaction_type = 'subscribed' AND uc.user_id IS NULL
+                ) sc ON TRUE
+                WHERE u.is_public = TRUE
             """
                 )
             )
@@ -20,12 +20,15 @@ from init_db import (
     drop_all_tables,
     create_all_tables,
     create_calendar_subscription_triggers,
+    create_counter_triggers,
     grant_supabase_permissions,
     create_database_views,
     setup_realtime,
     setup_realtime_tenant,
     create_supabase_auth_users
 )
+from crud import contact_link, event_access
+from crud.crud_counters import reconcile_counters
 from database import SessionLocal
 from init_db_2_data import (
     users_private,
@@ -66,6 +69,8 @@ def insert_sample_data_v2():
         logger.info("📇 Creating user contacts...")
         contacts_data = contacts.create_contacts(db, private_users_data, public_users_data)
         logger.info(f"  ✓ Created {len(contacts_data)} contacts")
+        contact_link.rebuild(db)
+        logger.info("  ✓ Built reverse contact index")
 
         # 3. Create groups
         logger.info("👥 Creating groups...")
@@ -168,6 +173,18 @@ def init_database():
         # 7. Create calendar subscription triggers
         create_calendar_subscription_triggers()
 
+        # 7b. Create counter triggers and compute counters for the seeded data
+        create_counter_triggers()
+        db = SessionLocal()
+        try:
+            reconcile_counters(db)
+
+            # 7c. Rebuild event access (covers rows written before the hooks were imported)
+            event_access.rebuild(db)
+            db.commit()
+        finally:
+            db.close()
+
         # 8. Create Supabase auth users
         create_supabase_auth_users()
 
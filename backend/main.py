@@ -4,6 +4,7 @@ Agenda Phoenix API
 Modular FastAPI application using routers for organized endpoint management.
 """
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from datetime import datetime
@@ -12,10 +13,16 @@ import uvicorn
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 
+from background_jobs import register_periodic_job, start_background_jobs, stop_background_jobs
+from crud.crud_counters import COUNTER_RECONCILE_INTERVAL_SECONDS, reconcile_counters
+from crud.crud_event import EVENT_PURGE_INTERVAL_SECONDS, purge_deleted_events
+from database import SessionLocal, engine
 from init_db_2 import init_database
+from social_graph import SOCIAL_GRAPH_REBUILD_INTERVAL_SECONDS, social_graph
+from write_behind import WRITE_BEHIND_FLUSH_INTERVAL_MS, flush_write_behind, write_behind
 
 # Import all routers
-from routers import calendar_memberships, calendars, event_bans, events, group_memberships, groups, interactions, recurring_configs, user_blocks, user_contacts, users
+from routers import calendar_memberships, calendars, event_bans, events, group_memberships, groups, interactions, jobs, recurring_configs, user_blocks, user_contacts, users
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -42,9 +49,31 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"❌ Failed to initialize database: {e}")
 
+    # In-memory social graph (invite suggestions), rebuilt periodically
+    db = SessionLocal()
+    try:
+        social_graph.build(db)
+    except Exception as e:
+        logger.error(f"❌ Failed to build social graph: {e}")
+    finally:
+        db.close()
+    register_periodic_job("rebuild_social_graph", SOCIAL_GRAPH_REBUILD_INTERVAL_SECONDS, social_graph.build)
+
+    # Counters are maintained by PostgreSQL triggers; elsewhere readers use live queries
+    if engine.dialect.name == "postgresql":
+        register_periodic_job("reconcile_counters", COUNTER_RECONCILE_INTERVAL_SECONDS, reconcile_counters)
+    # Soft-deleted events are removed (with their interactions) in the background
+    register_periodic_job("purge_deleted_events", EVENT_PURGE_INTERVAL_SECONDS, purge_deleted_events)
+
+    # Buffered timestamp updates (read_at, last_login, last_synced_at)
+    register_periodic_job("flush_write_behind", WRITE_BEHIND_FLUSH_INTERVAL_MS / 1000, flush_write_behind)
+    start_background_jobs()
+
     yield  # Application is running
 
     # Shutdown
+    await stop_background_jobs()
+    await asyncio.to_thread(write_behind.flush_with_new_session)
     logger.info("👋 FastAPI application shutting down...")
 
 
@@ -74,6 +103,7 @@ app.include_router(recurring_configs.router)
 app.include_router(event_bans.router)
 app.include_router(user_blocks.router)
 app.include_router(user_contacts.router)
+app.include_router(jobs.router)
 
 
 # Root endpoint
@@ -98,6 +128,7 @@ async def root():
             "recurring_configs": "/recurring_configs",
             "event_bans": "/event_bans",
             "user_blocks": "/user_blocks",
+            "jobs": "/jobs",
         },
         "docs": "/docs",
         "health": "/health",
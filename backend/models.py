@@ -1,9 +1,10 @@
 from datetime import datetime, timedelta, timezone
 
 from sqlalchemy import JSON, TIMESTAMP, Boolean, Column, ForeignKey, Index, Integer, String, Text, UniqueConstraint, func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 
 from database import Base
+from phone_utils import normalize_phone
 
 
 class UserContact(Base):
@@ -30,6 +31,7 @@ class UserContact(Base):
     # Contact info (del dispositivo)
     contact_name = Column(String(255), nullable=False)  # Nombre que el owner le puso en su teléfono
     phone_number = Column(String(50), nullable=False, index=True)  # Número de teléfono (NO unique)
+    phone_e164 = Column(String(20), nullable=True, index=True)  # Número normalizado (clave de matching con users.phone_e164)
 
     # Registered user (si el contacto está registrado en la app)
     registered_user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
@@ -45,12 +47,18 @@ class UserContact(Base):
         Index("idx_user_contacts_registered", "registered_user_id"),
         Index("idx_user_contacts_owner", "owner_id"),
         Index("idx_user_contacts_phone", "phone_number"),
+        Index("idx_user_contacts_unlinked_phone_e164", "phone_e164", postgresql_where=registered_user_id.is_(None)),  # Enlazado al registrarse
     )
 
     # Relationships
     owner = relationship("User", foreign_keys=[owner_id], back_populates="my_contacts")
     registered_user = relationship("User", foreign_keys=[registered_user_id], back_populates="contact_entries")
 
+    @validates("phone_number")
+    def _set_phone_e164(self, key, value):
+        self.phone_e164 = normalize_phone(value)
+        return value
+
     def __repr__(self):
         return f"<UserContact(id={self.id}, owner_id={self.owner_id}, contact_name='{self.contact_name}', phone='{self.phone_number}')>"
 
@@ -67,6 +75,75 @@ class UserContact(Base):
         }
 
 
+class UserContactSyncChunk(Base):
+    """
+    UserContactSyncChunk model - Digest de cada bloque de la agenda sincronizado.
+
+    El cliente divide la agenda en bloques estables (p.ej. por inicial) y envía
+    un digest por bloque. Si el digest no ha cambiado desde el último sync,
+    el servidor no vuelve a procesar los contactos de ese bloque.
+    """
+
+    __tablename__ = "user_contact_sync_chunks"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    chunk_key = Column(String(100), nullable=False)  # Identificador estable del bloque (definido por el cliente)
+    digest = Column(String(128), nullable=False)  # Hash del contenido del bloque
+    contact_count = Column(Integer, nullable=False, default=0)
+    last_synced_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (UniqueConstraint("owner_id", "chunk_key", name="uq_owner_sync_chunk"),)
+
+    def __repr__(self):
+        return f"<UserContactSyncChunk(owner_id={self.owner_id}, chunk_key='{self.chunk_key}', digest='{self.digest}')>"
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "owner_id": self.owner_id,
+            "chunk_key": self.chunk_key,
+            "digest": self.digest,
+            "contact_count": self.contact_count,
+            "last_synced_at": self.last_synced_at.isoformat() if self.last_synced_at else None,
+        }
+
+
+class UserContactLink(Base):
+    """
+    UserContactLink model - Índice inverso de contactos ("quién tiene mi número").
+
+    Una fila por (usuario registrado, owner que lo tiene en su agenda), derivada
+    de user_contacts. Se actualiza en bloque al registrarse un usuario y al
+    sincronizar contactos. is_mutual indica que ambos se tienen en la agenda.
+    """
+
+    __tablename__ = "user_contact_links"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    registered_user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)  # Usuario cuyo número aparece en la agenda
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)  # Dueño de la agenda
+    is_mutual = Column(Boolean, nullable=False, default=False)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("registered_user_id", "owner_id", name="uq_contact_link"),
+        Index("idx_contact_links_mutual", "registered_user_id", "is_mutual"),
+    )
+
+    def __repr__(self):
+        return f"<UserContactLink(registered_user_id={self.registered_user_id}, owner_id={self.owner_id}, is_mutual={self.is_mutual})>"
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "registered_user_id": self.registered_user_id,
+            "owner_id": self.owner_id,
+            "is_mutual": self.is_mutual,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
+
 class User(Base):
     """
     User model - Usuarios que han completado el registro en la app.
@@ -87,6 +164,7 @@ class User(Base):
     # Profile
     display_name = Column(String(200), nullable=False)  # Nombre que ve todo el mundo (REQUIRED)
     phone = Column(String(20), nullable=True, unique=True, index=True)  # Solo para phone users
+    phone_e164 = Column(String(20), nullable=True, index=True)  # Teléfono normalizado E.164
     instagram_username = Column(String(100), nullable=True, unique=True, index=True)  # Solo para instagram users
     profile_picture_url = Column(String(500), nullable=True)
 
@@ -99,17 +177,22 @@ class User(Base):
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
-    # Relationships
-    my_contacts = relationship("UserContact", foreign_keys="UserContact.owner_id", back_populates="owner", cascade="all, delete-orphan")
-    contact_entries = relationship("UserContact", foreign_keys="UserContact.registered_user_id", back_populates="registered_user")
-    calendars = relationship("Calendar", back_populates="user", cascade="all, delete-orphan")
-    calendar_memberships = relationship("CalendarMembership", foreign_keys="CalendarMembership.user_id", back_populates="user", cascade="all, delete-orphan")
-    owned_groups = relationship("Group", back_populates="owner", cascade="all, delete-orphan")
-    group_memberships = relationship("GroupMembership", back_populates="user", cascade="all, delete-orphan")
-    events = relationship("Event", foreign_keys="Event.owner_id", back_populates="owner", cascade="all, delete-orphan")
-    interactions = relationship("EventInteraction", foreign_keys="EventInteraction.user_id", back_populates="user", cascade="all, delete-orphan")
-    blocked_users = relationship("UserBlock", foreign_keys="UserBlock.blocker_user_id", back_populates="blocker", cascade="all, delete-orphan")
-    blocked_by_users = relationship("UserBlock", foreign_keys="UserBlock.blocked_user_id", back_populates="blocked", cascade="all, delete-orphan")
+    # Relationships (passive_deletes: dependent rows go through ON DELETE CASCADE / SET NULL)
+    my_contacts = relationship("UserContact", foreign_keys="UserContact.owner_id", back_populates="owner", cascade="all, delete-orphan", passive_deletes=True)
+    contact_entries = relationship("UserContact", foreign_keys="UserContact.registered_user_id", back_populates="registered_user", passive_deletes=True)
+    calendars = relationship("Calendar", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    calendar_memberships = relationship("CalendarMembership", foreign_keys="CalendarMembership.user_id", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    owned_groups = relationship("Group", back_populates="owner", cascade="all, delete-orphan", passive_deletes=True)
+    group_memberships = relationship("GroupMembership", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    events = relationship("Event", foreign_keys="Event.owner_id", back_populates="owner", cascade="all, delete-orphan", passive_deletes=True)
+    interactions = relationship("EventInteraction", foreign_keys="EventInteraction.user_id", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    blocked_users = relationship("UserBlock", foreign_keys="UserBlock.blocker_user_id", back_populates="blocker", cascade="all, delete-orphan", passive_deletes=True)
+    blocked_by_users = relationship("UserBlock", foreign_keys="UserBlock.blocked_user_id", back_populates="blocked", cascade="all, delete-orphan", passive_deletes=True)
+
+    @validates("phone")
+    def _set_phone_e164(self, key, value):
+        self.phone_e164 = normalize_phone(value)
+        return value
 
     def __repr__(self):
         return f"<User(id={self.id}, display_name='{self.display_name}', auth_provider='{self.auth_provider}')>"
@@ -146,7 +229,7 @@ class Calendar(Base):
     __tablename__ = "calendars"
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)  # Owner principal del calendar
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)  # Owner principal del calendar
     name = Column(String(255), nullable=False)
     start_date = Column(TIMESTAMP(timezone=True), nullable=True)  # Optional: for temporal calendars
     end_date = Column(TIMESTAMP(timezone=True), nullable=True)  # Optional: for temporal calendars
@@ -164,8 +247,8 @@ class Calendar(Base):
 
     # Relationships
     user = relationship("User", back_populates="calendars")
-    events = relationship("Event", foreign_keys="Event.calendar_id", back_populates="calendar")
-    memberships = relationship("CalendarMembership", back_populates="calendar", cascade="all, delete-orphan")
+    events = relationship("Event", foreign_keys="Event.calendar_id", back_populates="calendar", passive_deletes=True)
+    memberships = relationship("CalendarMembership", back_populates="calendar", cascade="all, delete-orphan", passive_deletes=True)
 
     def __repr__(self):
         return f"<Calendar(id={self.id}, name='{self.name}', owner_id={self.owner_id})>"
@@ -197,11 +280,11 @@ class CalendarMembership(Base):
     __tablename__ = "calendar_memberships"
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    calendar_id = Column(Integer, ForeignKey("calendars.id"), nullable=False, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    calendar_id = Column(Integer, ForeignKey("calendars.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     role = Column(String(50), nullable=False, default="member")  # 'owner', 'admin', 'member'
     status = Column(String(50), nullable=False, default="pending")  # 'pending', 'accepted', 'rejected'
-    invited_by_user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
+    invited_by_user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
@@ -245,8 +328,8 @@ class CalendarSubscription(Base):
     __tablename__ = "calendar_subscriptions"
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    calendar_id = Column(Integer, ForeignKey("calendars.id"), nullable=False, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    calendar_id = Column(Integer, ForeignKey("calendars.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     status = Column(String(50), nullable=False, default="active")  # 'active', 'paused'
     subscribed_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
@@ -287,13 +370,13 @@ class Group(Base):
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     name = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
-    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
     # Relationships
     owner = relationship("User", back_populates="owned_groups")
-    memberships = relationship("GroupMembership", back_populates="group", cascade="all, delete-orphan")
+    memberships = relationship("GroupMembership", back_populates="group", cascade="all, delete-orphan", order_by="GroupMembership.id", passive_deletes=True)
 
     def __repr__(self):
         return f"<Group(id={self.id}, name='{self.name}', owner_id={self.owner_id})>"
@@ -317,8 +400,8 @@ class GroupMembership(Base):
     __tablename__ = "group_memberships"
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    group_id = Column(Integer, ForeignKey("groups.id"), nullable=False, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    group_id = Column(Integer, ForeignKey("groups.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     role = Column(String, nullable=True)  # "admin" or "member" (null = member)
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
@@ -355,19 +438,27 @@ class Event(Base):
     description = Column(Text, nullable=True)
     start_date = Column(TIMESTAMP(timezone=True), nullable=False)
     event_type = Column(String(50), nullable=False, default="regular")  # 'regular' or 'recurring'
-    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
-    calendar_id = Column(Integer, ForeignKey("calendars.id"), nullable=True, index=True)
-    parent_recurring_event_id = Column(Integer, ForeignKey("recurring_event_configs.id", use_alter=True, name="fk_event_parent_recurring"), nullable=True, index=True)  # Evento recurrente padre
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    calendar_id = Column(Integer, ForeignKey("calendars.id", ondelete="SET NULL"), nullable=True, index=True)
+    parent_recurring_event_id = Column(Integer, ForeignKey("recurring_event_configs.id", use_alter=True, name="fk_event_parent_recurring", ondelete="SET NULL"), nullable=True, index=True)  # Evento recurrente padre
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    deleted_at = Column(TIMESTAMP(timezone=True), nullable=True)  # Borrado lógico: oculto ya, lo elimina el job de purga
+    external_uid = Column(String(255), nullable=True)  # UID del VEVENT si se importó de un fichero ICS
+
+    __table_args__ = (
+        Index("idx_events_deleted_at", "deleted_at", postgresql_where=deleted_at.isnot(None)),  # Solo los borrados (los que busca el purgador)
+        UniqueConstraint("calendar_id", "external_uid", name="uq_event_calendar_external_uid"),  # Reimportar un ICS no duplica eventos
+    )
 
     # Relationships
     owner = relationship("User", foreign_keys=[owner_id], back_populates="events")
     calendar = relationship("Calendar", foreign_keys=[calendar_id], back_populates="events")
     parent_recurring_event = relationship("RecurringEventConfig", foreign_keys=[parent_recurring_event_id])
-    interactions = relationship("EventInteraction", back_populates="event", cascade="all, delete-orphan")
-    recurring_config = relationship("RecurringEventConfig", foreign_keys="RecurringEventConfig.event_id", back_populates="event", uselist=False, cascade="all, delete-orphan")
-    bans = relationship("EventBan", back_populates="event", cascade="all, delete-orphan")
+    # passive_deletes: children are removed by ON DELETE CASCADE, not loaded by the ORM
+    interactions = relationship("EventInteraction", back_populates="event", cascade="all, delete-orphan", passive_deletes=True)
+    recurring_config = relationship("RecurringEventConfig", foreign_keys="RecurringEventConfig.event_id", back_populates="event", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
+    bans = relationship("EventBan", back_populates="event", cascade="all, delete-orphan", passive_deletes=True)
 
     def __repr__(self):
         return f"<Event(id={self.id}, name='{self.name}', owner_id={self.owner_id})>"
@@ -395,13 +486,13 @@ class EventInteraction(Base):
     __tablename__ = "event_interactions"
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    event_id = Column(Integer, ForeignKey("events.id"), nullable=False, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     interaction_type = Column(String(50), nullable=False)  # 'invited', 'requested', 'joined', 'subscribed'
     status = Column(String(50), nullable=True)  # 'pending', 'accepted', 'rejected', 'rejected_invitation_accepted_event'
     role = Column(String(50), nullable=True)  # 'owner', 'admin', null (member)
-    invited_by_user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
-    invited_via_group_id = Column(Integer, ForeignKey("groups.id"), nullable=True, index=True)
+    invited_by_user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
+    invited_via_group_id = Column(Integer, ForeignKey("groups.id", ondelete="SET NULL"), nullable=True, index=True)
     personal_note = Column(Text, nullable=True)  # Personal reminder note ("bring skates to skating class")
     cancellation_note = Column(Text, nullable=True)  # Cancellation/rejection note ("canceling the event because it's too late")
     is_attending = Column(Boolean, default=False, nullable=True)  # Whether user is attending despite rejecting invitation (for public events)
@@ -494,7 +585,7 @@ class RecurringEventConfig(Base):
     __tablename__ = "recurring_event_configs"
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    event_id = Column(Integer, ForeignKey("events.id"), nullable=False, unique=True, index=True)
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), nullable=False, unique=True, index=True)
     recurrence_type = Column(String(20), nullable=False, default="weekly")  # 'daily', 'weekly', 'monthly', 'yearly'
     schedule = Column(JSON, nullable=True)  # Type-specific configuration (format varies by recurrence_type)
     recurrence_end_date = Column(TIMESTAMP(timezone=True), nullable=True)  # NULL = perpetual/infinite recurrence
@@ -527,9 +618,9 @@ class EventBan(Base):
     __tablename__ = "event_bans"
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    event_id = Column(Integer, ForeignKey("events.id"), nullable=False, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
-    banned_by = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    banned_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)  # NULL si quien baneó borró su cuenta
     reason = Column(Text, nullable=True)
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
@@ -565,8 +656,8 @@ class UserBlock(Base):
     __tablename__ = "user_blocks"
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    blocker_user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
-    blocked_user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    blocker_user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    blocked_user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
@@ -601,7 +692,7 @@ class EventCancellation(Base):
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     event_id = Column(Integer, nullable=False, index=True)  # Not FK because event might be deleted
     event_name = Column(String(255), nullable=False)  # Store name for reference
-    cancelled_by_user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    cancelled_by_user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)  # NULL si borró su cuenta
     message = Column(Text, nullable=True)  # Optional cancellation message
     cancelled_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
 
@@ -631,8 +722,8 @@ class EventCancellationView(Base):
     __tablename__ = "event_cancellation_views"
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    cancellation_id = Column(Integer, ForeignKey("event_cancellations.id"), nullable=False, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    cancellation_id = Column(Integer, ForeignKey("event_cancellations.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     viewed_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
 
     # Unique constraint: one view per user per cancellation
@@ -652,3 +743,148 @@ class EventCancellationView(Base):
             "user_id": self.user_id,
             "viewed_at": self.viewed_at.isoformat() if self.viewed_at else None,
         }
+
+
+class EventCancellationRecipient(Base):
+    """
+    EventCancellationRecipient model - Bandeja de cancelaciones por usuario.
+
+    Al borrar un evento con mensaje de cancelación se inserta (INSERT ... SELECT
+    desde event_interactions) una fila por cada usuario que tenía interacción
+    con el evento, salvo quien lo cancela. Las cancelaciones pendientes de un
+    usuario se leen con un scan indexado por user_id.
+    """
+
+    __tablename__ = "event_cancellation_recipients"
+
+    cancellation_id = Column(Integer, ForeignKey("event_cancellations.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+
+    __table_args__ = (Index("idx_event_cancellation_recipients_user", "user_id", "cancellation_id"),)
+
+    def __repr__(self):
+        return f"<EventCancellationRecipient(cancellation_id={self.cancellation_id}, user_id={self.user_id})>"
+
+    def to_dict(self):
+        return {"cancellation_id": self.cancellation_id, "user_id": self.user_id}
+
+
+class EventCounter(Base):
+    """
+    EventCounter model - Contadores desnormalizados por evento.
+
+    Mantenidos por el trigger update_event_counters (PostgreSQL) sobre
+    event_interactions y reparados periódicamente por el job de reconciliación.
+    Si un evento no tiene fila, las estadísticas se calculan en vivo.
+    """
+
+    __tablename__ = "event_counters"
+
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), primary_key=True)
+    joined_count = Column(Integer, nullable=False, default=0)  # interaction_type='joined'
+    subscribed_count = Column(Integer, nullable=False, default=0)  # interaction_type='subscribed'
+    invited_count = Column(Integer, nullable=False, default=0)  # interaction_type='invited'
+    invited_accepted_count = Column(Integer, nullable=False, default=0)
+    invited_pending_count = Column(Integer, nullable=False, default=0)
+    invited_rejected_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<EventCounter(event_id={self.event_id}, joined={self.joined_count}, invited={self.invited_count})>"
+
+    def to_dict(self):
+        return {
+            "event_id": self.event_id,
+            "joined_count": self.joined_count,
+            "subscribed_count": self.subscribed_count,
+            "invited_count": self.invited_count,
+            "invited_accepted_count": self.invited_accepted_count,
+            "invited_pending_count": self.invited_pending_count,
+            "invited_rejected_count": self.invited_rejected_count,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+
+class UserCounter(Base):
+    """
+    UserCounter model - Contadores desnormalizados por usuario (owner de eventos).
+
+    total_events_count lo mantiene el trigger update_user_event_counters sobre
+    events; subscribers_count (suscriptores únicos a cualquier evento del
+    usuario) lo mantiene update_event_counters sobre event_interactions.
+    """
+
+    __tablename__ = "user_counters"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    total_events_count = Column(Integer, nullable=False, default=0)
+    subscribers_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<UserCounter(user_id={self.user_id}, events={self.total_events_count}, subscribers={self.subscribers_count})>"
+
+    def to_dict(self):
+        return {
+            "user_id": self.user_id,
+            "total_events_count": self.total_events_count,
+            "subscribers_count": self.subscribers_count,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+
+class EventAccess(Base):
+    """
+    EventAccess model - Relación única "qué eventos puede ver cada usuario".
+
+    Una fila por (usuario, evento, vía de acceso). Vías:
+    - owned: owner del evento
+    - joined / subscribed / invited: EventInteraction del usuario (cualquier estado)
+    - calendar: miembro owner/admin aceptado del calendario del evento
+    - subscribed_calendar: suscripción activa al calendario del evento
+
+    Se mantiene incrementalmente con hooks de SQLAlchemy (crud_event_access)
+    y se puede reconstruir entera con event_access.rebuild().
+    """
+
+    __tablename__ = "event_access"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), primary_key=True)
+    via = Column(String(30), primary_key=True)
+
+    __table_args__ = (Index("idx_event_access_event", "event_id"),)
+
+    def __repr__(self):
+        return f"<EventAccess(user_id={self.user_id}, event_id={self.event_id}, via={self.via})>"
+
+    def to_dict(self):
+        return {"user_id": self.user_id, "event_id": self.event_id, "via": self.via}
+
+
+class BackgroundJob(Base):
+    """
+    BackgroundJob model - Estado y progreso de una tarea larga lanzada desde la API
+    (p.ej. borrado de cuenta).
+
+    El id es un UUID aleatorio: quien lanza la tarea consulta el progreso con él
+    aunque su cuenta ya no exista. requested_by no es FK por el mismo motivo.
+    """
+
+    __tablename__ = "background_jobs"
+
+    id = Column(String(32), primary_key=True)
+    kind = Column(String(50), nullable=False)  # 'delete_account', ...
+    requested_by = Column(Integer, nullable=True, index=True)
+    status = Column(String(20), nullable=False, default="pending")  # 'pending', 'running', 'done', 'failed'
+    stage = Column(String(50), nullable=True)  # Paso en curso (lo define cada tarea)
+    progress = Column(Integer, nullable=False, default=0)  # Filas procesadas en el paso en curso
+    total = Column(Integer, nullable=True)  # Filas del paso en curso (si se conocen)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    finished_at = Column(TIMESTAMP(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<BackgroundJob(id={self.id}, kind={self.kind}, status={self.status})>"
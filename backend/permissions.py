@@ -0,0 +1,151 @@
+"""
+Permission resolver
+
+Answers "is user U owner or admin of resource R" for events, calendars and
+groups, and loads the flags (is_public, is_admin) of users. Each question is
+resolved for many (user, resource) pairs with a single joined query per
+resource type, and results are memoized on the session (``db.info``) for the
+rest of the request. The memo is dropped after commit/rollback so a change
+of roles is seen by the next transaction.
+
+The check_* / is_* helpers in dependencies.py are thin wrappers around it;
+bulk endpoints should call the *_many methods directly.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, select
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import Session
+
+from models import Calendar, CalendarMembership, Event, EventInteraction, Group, GroupMembership, User
+
+_RESOLVER_KEY = "permission_resolver"
+
+
+@dataclass(frozen=True)
+class ResourceSpec:
+    """How to find the owner and the admins of a resource type"""
+
+    model: type
+    membership_model: type
+    membership_fk: str
+    admin_conditions: Tuple[Tuple[str, str], ...]
+
+
+RESOURCES: Dict[str, ResourceSpec] = {
+    # Event admin: interaction_type='joined', role='admin', status='accepted'
+    "event": ResourceSpec(Event, EventInteraction, "event_id", (("interaction_type", "joined"), ("role", "admin"), ("status", "accepted"))),
+    # Calendar admin: role='admin', status='accepted'
+    "calendar": ResourceSpec(Calendar, CalendarMembership, "calendar_id", (("role", "admin"), ("status", "accepted"))),
+    # Group admin: role='admin'
+    "group": ResourceSpec(Group, GroupMembership, "group_id", (("role", "admin"),)),
+}
+
+
+@dataclass(frozen=True)
+class UserFlags:
+    id: int
+    is_public: bool
+    is_admin: bool
+
+
+class PermissionResolver:
+    """Batched, memoized owner/admin checks (one instance per session)"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._manage: Dict[Tuple[str, int, int], Optional[bool]] = {}
+        self._users: Dict[int, Optional[UserFlags]] = {}
+
+    def can_manage_many(self, kind: str, pairs: Iterable[Tuple[int, int]]) -> Dict[Tuple[int, int], Optional[bool]]:
+        """
+        Resolve owner/admin permission for many (user_id, resource_id) pairs.
+
+        Pairs not memoized yet are loaded with one query: the resources
+        LEFT JOIN their admin memberships of the requested users.
+
+        Args:
+            kind: "event", "calendar" or "group"
+            pairs: (user_id, resource_id) tuples
+
+        Returns:
+            Dict mapping each pair to True (owner/admin), False (no permission)
+            or None (resource not found)
+        """
+        pairs = list(dict.fromkeys(pairs))
+        missing = [(user_id, resource_id) for user_id, resource_id in pairs if (kind, resource_id, user_id) not in self._manage]
+        if missing:
+            self._load(kind, missing)
+        return {(user_id, resource_id): self._manage[(kind, resource_id, user_id)] for user_id, resource_id in pairs}
+
+    def can_manage(self, kind: str, resource_id: int, user_id: int) -> Optional[bool]:
+        """Single-pair version of can_manage_many (None if the resource doesn't exist)"""
+        return self.can_manage_many(kind, [(user_id, resource_id)])[(user_id, resource_id)]
+
+    def manageable_ids(self, kind: str, resource_ids: Iterable[int], user_id: int) -> List[int]:
+        """Resource IDs (in input order) that user_id owns or administers"""
+        resolved = self.can_manage_many(kind, [(user_id, resource_id) for resource_id in resource_ids])
+        return [resource_id for (_, resource_id), allowed in resolved.items() if allowed]
+
+    def user_flags_many(self, user_ids: Iterable[int]) -> Dict[int, Optional[UserFlags]]:
+        """
+        Load is_public/is_admin of many users (one query for the ones not memoized).
+
+        Returns:
+            Dict mapping user_id to UserFlags (None if the user doesn't exist)
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        missing = [user_id for user_id in user_ids if user_id not in self._users]
+        if missing:
+            rows = self.db.execute(select(User.id, User.is_public, User.is_admin).where(User.id.in_(missing))).all()
+            found = {row.id: UserFlags(id=row.id, is_public=bool(row.is_public), is_admin=bool(row.is_admin)) for row in rows}
+            for user_id in missing:
+                self._users[user_id] = found.get(user_id)
+        return {user_id: self._users[user_id] for user_id in user_ids}
+
+    def user_flags(self, user_id: int) -> Optional[UserFlags]:
+        """Single-user version of user_flags_many"""
+        return self.user_flags_many([user_id])[user_id]
+
+    def _load(self, kind: str, pairs: List[Tuple[int, int]]) -> None:
+        spec = RESOURCES[kind]
+        membership = spec.membership_model
+        resource_ids = {resource_id for _, resource_id in pairs}
+        user_ids = {user_id for user_id, _ in pairs}
+
+        admin_join = and_(
+            getattr(membership, spec.membership_fk) == spec.model.id,
+            membership.user_id.in_(user_ids),
+            *(getattr(membership, column) == value for column, value in spec.admin_conditions),
+        )
+        rows = self.db.execute(select(spec.model.id, spec.model.owner_id, membership.user_id).outerjoin(membership, admin_join).where(spec.model.id.in_(resource_ids))).all()
+
+        owners: Dict[int, int] = {}
+        admins = set()
+        for resource_id, owner_id, admin_id in rows:
+            owners[resource_id] = owner_id
+            if admin_id is not None:
+                admins.add((resource_id, admin_id))
+
+        for user_id, resource_id in pairs:
+            if resource_id not in owners:
+                allowed = None
+            else:
+                allowed = owners[resource_id] == user_id or (resource_id, user_id) in admins
+            self._manage[(kind, resource_id, user_id)] = allowed
+
+
+def get_permission_resolver(db: Session) -> PermissionResolver:
+    """Resolver memoized on the session (one per request)"""
+    resolver = db.info.get(_RESOLVER_KEY)
+    if resolver is None:
+        resolver = db.info[_RESOLVER_KEY] = PermissionResolver(db)
+    return resolver
+
+
+@sa_event.listens_for(Session, "after_commit")
+@sa_event.listens_for(Session, "after_rollback")
+def _drop_resolver(session):
+    session.info.pop(_RESOLVER_KEY, None)
@@ -0,0 +1,154 @@
+"""
+Phone number normalization to E.164
+
+Contacts arrive from the device in whatever format the owner typed them
+("600 11 22 33", "0034 600112233", "+34-600-112-233"). Matching them against
+registered users requires a canonical key, stored in the indexed
+``phone_e164`` columns of ``users`` and ``user_contacts``.
+
+Numbers without an international prefix are interpreted in the country of
+the address book owner (taken from the owner's own phone), falling back to
+DEFAULT_PHONE_COUNTRY_CODE.
+"""
+
+import os
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple
+
+DEFAULT_COUNTRY_CODE = os.getenv("DEFAULT_PHONE_COUNTRY_CODE", "34")
+
+# E.164 allows at most 15 digits (country code included)
+MAX_E164_DIGITS = 15
+MIN_E164_DIGITS = 8
+
+# ITU country calling codes (prefix-free, so the first match is the only match)
+COUNTRY_CODES = frozenset(
+    "1 7 20 27 30 31 32 33 34 36 39 40 41 43 44 45 46 47 48 49 51 52 53 54 55 56 57 58 60 61 62 63 64 65 66 81 82 84 86 90 91 92 93 94 95 98 "
+    "211 212 213 216 218 220 221 222 223 224 225 226 227 228 229 230 231 232 233 234 235 236 237 238 239 240 241 242 243 244 245 246 248 249 "
+    "250 251 252 253 254 255 256 257 258 260 261 262 263 264 265 266 267 268 269 290 291 297 298 299 350 351 352 353 354 355 356 357 358 359 "
+    "370 371 372 373 374 375 376 377 378 380 381 382 383 385 386 387 389 420 421 423 500 501 502 503 504 505 506 507 508 509 590 591 592 593 "
+    "594 595 596 597 598 599 670 672 673 674 675 676 677 678 679 680 681 682 683 685 686 687 688 689 690 691 692 850 852 853 855 856 880 886 "
+    "960 961 962 963 964 965 966 967 968 970 971 972 973 974 975 976 977 992 993 994 995 996 998".split()
+)
+
+# National trunk prefix dropped when dialing internationally (e.g. UK "020..." -> "+4420...")
+TRUNK_PREFIXES = {
+    "7": "8",
+    "20": "0",
+    "27": "0",
+    "31": "0",
+    "32": "0",
+    "33": "0",
+    "36": "06",
+    "41": "0",
+    "43": "0",
+    "44": "0",
+    "46": "0",
+    "48": "0",
+    "49": "0",
+    "51": "0",
+    "54": "0",
+    "55": "0",
+    "61": "0",
+    "62": "0",
+    "63": "0",
+    "64": "0",
+    "66": "0",
+    "81": "0",
+    "82": "0",
+    "84": "0",
+    "86": "0",
+    "90": "0",
+    "91": "0",
+    "92": "0",
+    "353": "0",
+    "358": "0",
+    "380": "0",
+}
+
+_NON_DIGITS = re.compile(r"\D")
+
+
+@lru_cache(maxsize=512)
+def _country_rules(country_code: str) -> Tuple[str, str]:
+    """
+    Normalization rules for one country prefix (cached).
+
+    Returns:
+        Tuple of (E.164 prefix, national trunk prefix)
+    """
+    return f"+{country_code}", TRUNK_PREFIXES.get(country_code, "")
+
+
+def country_code_of(e164: Optional[str]) -> Optional[str]:
+    """
+    Extract the country calling code of an E.164 number.
+
+    Args:
+        e164: Number in E.164 format (e.g. "+34600112233")
+
+    Returns:
+        Country code without "+" (e.g. "34") or None if unknown
+    """
+    if not e164 or not e164.startswith("+"):
+        return None
+    digits = e164[1:]
+    for length in (1, 2, 3):
+        if digits[:length] in COUNTRY_CODES:
+            return digits[:length]
+    return None
+
+
+def normalize_phone(raw: Optional[str], default_country_code: Optional[str] = None) -> Optional[str]:
+    """
+    Normalize a phone number to E.164.
+
+    Args:
+        raw: Phone number as typed on the device
+        default_country_code: Country used for numbers without international prefix
+
+    Returns:
+        E.164 string (e.g. "+34600112233") or None if it can't be normalized
+    """
+    if not raw:
+        return None
+
+    raw = raw.strip()
+    digits = _NON_DIGITS.sub("", raw)
+    if not digits:
+        return None
+
+    if raw.startswith("+"):
+        result = digits
+    elif digits.startswith("00"):
+        result = digits[2:]
+    else:
+        country_code = default_country_code or DEFAULT_COUNTRY_CODE
+        prefix, trunk = _country_rules(country_code)
+        if country_code == "1" and len(digits) == 11 and digits.startswith("1"):
+            result = digits
+        else:
+            if trunk and digits.startswith(trunk):
+                digits = digits[len(trunk) :]
+            result = prefix[1:] + digits
+
+    if not MIN_E164_DIGITS <= len(result) <= MAX_E164_DIGITS:
+        return None
+    return f"+{result}"
+
+
+def normalize_phones(raws: Iterable[str], default_country_code: Optional[str] = None) -> Dict[str, Optional[str]]:
+    """
+    Normalize a batch of phone numbers.
+
+    Duplicated inputs are normalized once.
+
+    Args:
+        raws: Phone numbers as typed on the device
+        default_country_code: Country used for numbers without international prefix
+
+    Returns:
+        Dict mapping each raw number to its E.164 form (or None)
+    """
+    return {raw: normalize_phone(raw, default_country_code) for raw in set(raws)}
@@ -4,15 +4,19 @@ Calendars Router
 Handles all calendar-related endpoints.
 """
 
+import os
+import tempfile
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 
 from auth import get_current_user_id
-from crud import calendar, calendar_membership, event
+from background_jobs import create_tracked_job, run_tracked_job
+from crud import calendar, calendar_membership
 from crud.crud_calendar_subscription import calendar_subscription
 from dependencies import check_calendar_permission, get_db
+from ics_import import MAX_ICS_IMPORT_BYTES, import_ics_file
 from schemas import (
     CalendarBase,
     CalendarCreate,
@@ -144,23 +148,52 @@ async def delete_calendar(calendar_id: int, delete_events: bool = False, current
     if not db_calendar:
         raise HTTPException(status_code=404, detail="Calendar not found")
 
-    # Handle associated events based on delete_events parameter
-    calendar_events = event.get_by_calendar(db, calendar_id=calendar_id)
+    # Every event of the calendar is deleted or detached in the same transaction
+    counts = calendar.delete_with_events(db, calendar_id=calendar_id, delete_events=delete_events)
 
-    if delete_events:
-        # Delete all events in the calendar
-        for calendar_event in calendar_events:
-            event.delete(db, id=calendar_event.id)
-    else:
-        # Remove calendar association (set calendar_id to NULL)
-        for calendar_event in calendar_events:
-            event.update(db, db_obj=calendar_event, obj_in={"calendar_id": None})
+    events_msg = f" and {counts['events_deleted']} events" if delete_events else ""
+    return {"message": f"Calendar deleted successfully{events_msg}", "id": calendar_id, **counts}
 
-    # Delete the calendar
-    calendar.delete(db, id=calendar_id)
 
-    events_msg = f" and {len(calendar_events)} events" if delete_events else ""
-    return {"message": f"Calendar deleted successfully{events_msg}", "id": calendar_id}
+@router.post("/{calendar_id}/import", status_code=202)
+async def import_calendar_ics(calendar_id: int, request: Request, background_tasks: BackgroundTasks, current_user_id: int = Depends(get_current_user_id), db: Session = Depends(get_db)):
+    """
+    Import an ICS (iCalendar) file into a calendar.
+
+    Requires JWT authentication - provide token in Authorization header.
+    Only the calendar owner or calendar admins can import events.
+
+    The request body is the raw .ics file (Content-Type: text/calendar). It is
+    streamed to a temporary file and imported by a background job; poll
+    GET /api/v1/jobs/{job_id} for progress and the result. Events whose UID
+    was already imported into the calendar are skipped.
+    """
+    # Check permissions (owner or admin)
+    check_calendar_permission(calendar_id, current_user_id, db)
+
+    db_calendar = calendar.get(db, id=calendar_id)
+    if not db_calendar:
+        raise HTTPException(status_code=404, detail="Calendar not found")
+
+    size = 0
+    with tempfile.NamedTemporaryFile(prefix="ics_import_", suffix=".ics", delete=False) as upload:
+        try:
+            async for chunk in request.stream():
+                size += len(chunk)
+                if size > MAX_ICS_IMPORT_BYTES:
+                    raise HTTPException(status_code=413, detail=f"ICS file too large (max {MAX_ICS_IMPORT_BYTES} bytes)")
+                upload.write(chunk)
+        except BaseException:
+            upload.close()
+            os.remove(upload.name)
+            raise
+    if size == 0:
+        os.remove(upload.name)
+        raise HTTPException(status_code=400, detail="Empty ICS file")
+
+    job = create_tracked_job(db, kind="import_ics", requested_by=current_user_id)
+    background_tasks.add_task(run_tracked_job, job.id, lambda job_db, reporter: import_ics_file(job_db, reporter, path=upload.name, calendar_id=calendar_id, owner_id=current_user_id))
+    return {"message": "ICS import started", "calendar_id": calendar_id, "job_id": job.id}
 
 
 @router.get("/{calendar_id}/memberships", response_model=List[CalendarMembershipResponse])
@@ -7,19 +7,31 @@ Handles all event-related endpoints.
 import logging
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import and_, or_
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session, noload
 
 from auth import get_current_user_id, get_current_user_id_optional
-from crud import calendar_membership, event, event_cancellation, event_interaction, user
+from crud import event, event_access, event_cancellation, event_interaction, group, group_membership, user
 from dependencies import check_event_permission, check_users_not_blocked, get_db, handle_recurring_event_rejection_cascade
-from models import EventInteraction, User, UserBlock
-from schemas import AvailableInviteeResponse, EventCancellationResponse, EventCreate, EventDeleteRequest, EventInteractionCreate, EventInteractionEnrichedResponse, EventInteractionResponse, EventInteractionUpdate, EventResponse, EventUpdate
+from models import User
+from permissions import get_permission_resolver
+from schemas import AvailableInviteeResponse, BatchReadRequest, BatchReadResponse, EventAttendeeResponse, EventBatchInviteRequest, EventBatchInviteResponse, EventCancellationResponse, EventCreate, EventDeleteRequest, EventInteractionCreate, EventInteractionEnrichedResponse, EventInteractionResponse, EventInteractionUpdate, EventInvitationStats, EventResponse, EventUpdate
 
 router = APIRouter(prefix="/api/v1/events", tags=["events"])
 logger = logging.getLogger(__name__)
 
+# Maximum number of events per GET /events/invitation-stats request
+MAX_STATS_BATCH = 200
+
+# Maximum number of users per POST /events/{id}/interaction/invite/batch request
+MAX_INVITE_BATCH = 500
+
+# Maximum number of IDs per POST /events/cancellations/view request
+MAX_READ_BATCH = 1000
+
+# Interactions/attendees embedded in GET /events/{id}; the rest is paginated via the list endpoints
+DETAIL_PAGE_SIZE = 50
+
 
 @router.get("", response_model=List[EventResponse])
 async def get_events(owner_id: Optional[int] = None, calendar_id: Optional[int] = None, current_user_id: Optional[int] = Depends(get_current_user_id_optional), limit: int = 50, offset: int = 0, order_by: Optional[str] = "start_date", order_dir: str = "asc", db: Session = Depends(get_db)):
@@ -27,11 +39,11 @@ async def get_events(owner_id: Optional[int] = None, calendar_id: Optional[int]
 
     Authentication is optional - provide JWT token in Authorization header for authenticated access.
 
-    If authenticated, returns events the user has access to:
+    If authenticated, returns events listed for the user (event_access):
     - Events the user created (owner)
-    - Events the user was invited to (with accepted invitations)
-    - Events the user subscribed to
+    - Events the user subscribed to or accepted an invitation to
     - Events in calendars where user is owner/admin with accepted status
+    - Events in calendars the user is subscribed to
 
     If not authenticated, returns empty list (use public event discovery endpoints instead).
 
@@ -42,14 +54,8 @@ async def get_events(owner_id: Optional[int] = None, calendar_id: Optional[int]
 
     # If user is authenticated, filter by accessible events
     if current_user_id is not None:
-        # Get all event IDs accessible to this user
-        accessible_event_ids = event.get_user_accessible_event_ids(db, user_id=current_user_id)
-
-        if not accessible_event_ids:
-            return []
-
-        # Build query for accessible events
-        query = db.query(event.model).options(noload(event.model.interactions)).filter(event.model.id.in_(accessible_event_ids))
+        # Semi-join on event_access (no ID list is loaded)
+        query = db.query(event.model).options(noload(event.model.interactions)).filter(event_access.listed_filter(user_id=current_user_id))
 
         # Apply optional filters
         if owner_id is not None:
@@ -77,6 +83,53 @@ async def get_events(owner_id: Optional[int] = None, calendar_id: Optional[int]
     return []
 
 
+@router.get("/invitation-stats", response_model=List[EventInvitationStats])
+async def get_events_invitation_stats(event_ids: List[int] = Query(...), current_user_id: int = Depends(get_current_user_id), db: Session = Depends(get_db)):
+    """
+    Get invitation statistics for several events at once.
+
+    Requires JWT authentication - provide token in Authorization header.
+    Pass event IDs as repeated query params (?event_ids=1&event_ids=2, at most
+    MAX_STATS_BATCH). Only events the current user owns or administers are
+    returned; other IDs are silently skipped.
+    """
+    event_ids = list(dict.fromkeys(event_ids))
+    if len(event_ids) > MAX_STATS_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_STATS_BATCH} event IDs per request")
+
+    allowed_ids = get_permission_resolver(db).manageable_ids("event", event_ids, current_user_id)
+    stats = event_interaction.get_invitation_stats_batch(db, event_ids=allowed_ids)
+    return [{"event_id": event_id, **stats[event_id]} for event_id in allowed_ids]
+
+
+def _set_page_headers(response: Response, next_cursor: Optional[int], total: Optional[int]) -> None:
+    """Expose cursor pagination metadata on list endpoints (bodies stay plain lists)"""
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+    if total is not None:
+        response.headers["X-Total-Count"] = str(total)
+
+
+def _inviter_summary(inviter: Optional[User]) -> Optional[dict]:
+    """Inviter object embedded in interaction payloads"""
+    if not inviter:
+        return None
+    return {"id": inviter.id, "display_name": inviter.display_name, "instagram_username": inviter.instagram_username}
+
+
+@router.get("/cancellations", response_model=List[EventCancellationResponse])
+async def get_event_cancellations(current_user_id: int = Depends(get_current_user_id), db: Session = Depends(get_db)):
+    """
+    Get all event cancellations that the authenticated user hasn't viewed yet.
+
+    Requires JWT authentication - provide token in Authorization header.
+
+    Returns cancellations for events where the user had an interaction
+    and hasn't viewed the cancellation message yet.
+    """
+    return event_cancellation.get_unviewed_by_user(db, user_id=current_user_id)
+
+
 @router.get("/{event_id}", response_model=EventResponse)
 async def get_event(event_id: int, current_user_id: Optional[int] = Depends(get_current_user_id_optional), db: Session = Depends(get_db)):
     """
@@ -84,37 +137,46 @@ async def get_event(event_id: int, current_user_id: Optional[int] = Depends(get_
 
     Authentication is optional - provide JWT token in Authorization header for authenticated access.
 
-    Access control: Only users with one of these relationships can view the event:
+    Access control: Only users with one of these relationships can view the event (event_access):
     - Event owner
-    - Has EventInteraction (invited or subscribed)
+    - Has EventInteraction (invited, subscribed or joined)
     - Member of calendar containing the event (owner/admin with accepted status)
+    - Subscribed to the calendar containing the event
 
     For events owned by public users, includes:
     - Subscription status (is_subscribed_to_owner)
     - Ability to subscribe (can_subscribe_to_owner)
     - Next 10 upcoming events from the public owner (owner_upcoming_events)
+
+    The response is assembled from at most four batched queries:
+    event + owner + current user's membership/interactions + invitation
+    stats, upcoming owner events (public owners only), the first page of
+    interactions with users and inviters (owner/admin/participants only)
+    and the first page of attendees.
+
+    Interactions and attendees carry at most DETAIL_PAGE_SIZE items; use
+    interactions_count/attendees_count and the *_next_cursor fields with
+    GET /events/{id}/interactions-enriched and GET /events/{id}/attendees
+    to fetch the rest.
     """
-    db_event = event.get(db, id=event_id)
-    if not db_event:
+    context = event.get_detail_context(db, event_id=event_id, user_id=current_user_id)
+    if not context:
         raise HTTPException(status_code=404, detail="Event not found")
 
+    db_event = context["event"]
+    owner = context["owner"]
+    membership = context["membership"]
+    user_interactions = context["interactions"]
+
     # Validate access if current_user_id provided
     if current_user_id is not None:
-        # Check access using CRUD method
-        has_access = event.check_user_access(db, event_id=event_id, user_id=current_user_id)
-        if not has_access:
+        if not context["has_access"]:
             raise HTTPException(status_code=403, detail="You do not have permission to view this event")
 
-    # Get owner information
-    owner = user.get(db, id=db_event.owner_id)
     if not owner:
         raise HTTPException(status_code=404, detail="Event owner not found")
 
-    # Get owner info
-    owner_name = owner.display_name
-    owner_profile_picture_url = owner.profile_picture_url
-
-    logger.info(f"[GET /events/{event_id}] OWNER INFO: user_id={owner.id}, is_public={owner.is_public}, owner_name={owner_name}")
+    logger.info(f"[GET /events/{event_id}] OWNER INFO: user_id={owner.id}, is_public={owner.is_public}, owner_name={owner.display_name}")
 
     # Build response dict from event
     response_data = {
@@ -128,188 +190,82 @@ async def get_event(event_id: int, current_user_id: Optional[int] = Depends(get_
         "parent_recurring_event_id": db_event.parent_recurring_event_id,
         "created_at": db_event.created_at,
         "updated_at": db_event.updated_at,
-        "owner_name": owner_name,
-        "owner_profile_picture": owner_profile_picture_url,
+        "owner_name": owner.display_name,
+        "owner_profile_picture": owner.profile_picture_url,
         "is_owner_public": owner.is_public,
     }
 
-    # If owner is public and current_user_id is provided, add subscription info
-    if owner.is_public and current_user_id is not None:
-        # Check if user is subscribed to owner (any event from this owner)
-        # A subscription is an interaction of type "subscribed" to any event owned by the public user
-        subscriptions = db.query(EventInteraction).join(event.model, EventInteraction.event_id == event.model.id).filter(event.model.owner_id == owner.id, EventInteraction.user_id == current_user_id, EventInteraction.interaction_type == "subscribed").first()
-        is_subscribed = subscriptions is not None
+    if current_user_id is None:
+        return EventResponse(**response_data)
 
-        # Check if there's a block between users
-        is_blocked = db.query(UserBlock).filter(((UserBlock.blocker_user_id == current_user_id) & (UserBlock.blocked_user_id == owner.id)) | ((UserBlock.blocker_user_id == owner.id) & (UserBlock.blocked_user_id == current_user_id))).first() is not None
+    # If owner is public, add subscription info
+    if owner.is_public:
+        is_subscribed = context["is_subscribed_to_owner"]
 
         # User can subscribe if not already subscribed and not blocked
-        can_subscribe = not is_subscribed and not is_blocked
-
-        # Get upcoming events from public owner
         upcoming_events = event.get_upcoming_events_by_owner(db, owner_id=owner.id, limit=10)
-        upcoming_events_data = [
+
+        response_data["is_subscribed_to_owner"] = is_subscribed
+        response_data["can_subscribe_to_owner"] = not is_subscribed and not context["is_blocked_with_owner"]
+        response_data["owner_upcoming_events"] = [{"id": e.id, "name": e.name, "start_date": e.start_date, "event_type": e.event_type} for e in upcoming_events]
+
+    # Owner, calendar admin or accepted participant (subscribed/joined) can invite and see all invitations
+    is_owner = db_event.owner_id == current_user_id
+    is_admin = membership is not None and membership.role == "admin" and membership.status == "accepted"
+    first_interaction, first_inviter = user_interactions[0] if user_interactions else (None, None)
+    can_invite = is_owner or is_admin or (first_interaction is not None and first_interaction.interaction_type in ["subscribed", "joined"] and first_interaction.status == "accepted")
+
+    if can_invite:
+        interactions_enriched, next_cursor, total = event_interaction.get_enriched_page_by_event(db, event_id=event_id, limit=DETAIL_PAGE_SIZE, with_total=True)
+        response_data["invitation_stats"] = context["invitation_stats"]
+        response_data["interactions_count"] = total
+        response_data["interactions_next_cursor"] = next_cursor
+
+        response_data["interactions"] = [
             {
-                "id": e.id,
-                "name": e.name,
-                "start_date": e.start_date,
-                "event_type": e.event_type,
+                "id": interaction.id,
+                "user_id": interaction.user_id,
+                "event_id": interaction.event_id,
+                "interaction_type": interaction.interaction_type,
+                "status": interaction.status,
+                "role": interaction.role,
+                "invited_by_user_id": interaction.invited_by_user_id,
+                "personal_note": interaction.personal_note,
+                "read_at": interaction.read_at.isoformat() if interaction.read_at else None,
+                "created_at": interaction.created_at.isoformat(),
+                "updated_at": interaction.updated_at.isoformat(),
+                "user": {
+                    "id": interaction_user.id,
+                    "display_name": interaction_user.display_name,
+                    "instagram_username": interaction_user.instagram_username,
+                    "profile_picture_url": interaction_user.profile_picture_url,
+                    "phone_number": interaction_user.phone,
+                },
+                "inviter": _inviter_summary(inviter),
             }
-            for e in upcoming_events
+            for interaction, interaction_user, inviter in interactions_enriched
+            if interaction_user
         ]
 
-        response_data["is_subscribed_to_owner"] = is_subscribed
-        response_data["can_subscribe_to_owner"] = can_subscribe
-        response_data["owner_upcoming_events"] = upcoming_events_data
+    # Otherwise, add the user's own interaction only
+    elif first_interaction:
+        response_data["interactions"] = [
+            {
+                "id": first_interaction.id,
+                "user_id": first_interaction.user_id,
+                "event_id": first_interaction.event_id,
+                "interaction_type": first_interaction.interaction_type,
+                "status": first_interaction.status,
+                "role": first_interaction.role,
+                "invited_by_user_id": first_interaction.invited_by_user_id,
+                "personal_note": first_interaction.personal_note,
+                "is_attending": first_interaction.is_attending,
+                "read_at": first_interaction.read_at.isoformat() if first_interaction.read_at else None,
+                "inviter": _inviter_summary(first_inviter),
+            }
+        ]
 
-    # If current_user_id is provided and user is owner or admin, add invitation stats
-    print(f"🔍 DEBUG BACKEND PRE-CHECK: current_user_id = {current_user_id}, type = {type(current_user_id)}")
-    print(f"🔍 DEBUG BACKEND PRE-CHECK: current_user_id is not None = {current_user_id is not None}")
-    if current_user_id is not None:
-        is_owner = db_event.owner_id == current_user_id
-        is_admin = False
-        print(f"🔍 DEBUG BACKEND: GET /events/{event_id}")
-        print(f"🔍 DEBUG BACKEND: current_user_id = {current_user_id}")
-        print(f"🔍 DEBUG BACKEND: db_event.owner_id = {db_event.owner_id}")
-        print(f"🔍 DEBUG BACKEND: is_owner = {is_owner}")
-
-        # Check if user is admin of the calendar containing this event
-        if db_event.calendar_id:
-            membership = calendar_membership.get_membership(db, calendar_id=db_event.calendar_id, user_id=current_user_id)
-            if membership and membership.role in ["admin"] and membership.status == "accepted":
-                is_admin = True
-
-        print(f"🔍 DEBUG BACKEND: is_admin = {is_admin}")
-
-        # Check if user is an accepted participant who can invite others
-        user_interaction_for_permission = db.query(EventInteraction).filter(EventInteraction.event_id == event_id, EventInteraction.user_id == current_user_id).first()
-
-        can_invite = False
-        if is_owner or is_admin:
-            can_invite = True
-        elif user_interaction_for_permission:
-            # Accepted participant (subscribed/joined) can invite and see all invitations
-            if user_interaction_for_permission.interaction_type in ["subscribed", "joined"] and user_interaction_for_permission.status == "accepted":
-                can_invite = True
-
-        print(f"🔍 DEBUG BACKEND: can_invite = {can_invite}")
-        print(f"🔍 DEBUG BACKEND: Will enter owner/admin/participant block = {can_invite}")
-
-        # If user is owner, admin, or accepted participant, get invitation stats
-        if can_invite:
-            print(f"🔍 DEBUG BACKEND: Entering OWNER/ADMIN/PARTICIPANT block (can_invite={can_invite})")
-            stats = event_interaction.get_invitation_stats(db, event_id=event_id)
-            response_data["invitation_stats"] = stats
-
-            # Get all interactions with enriched user data
-            interactions_data = []
-            interactions_enriched = event_interaction.get_enriched_by_event(db, event_id=event_id)
-
-            for interaction, interaction_user in interactions_enriched:
-                if not interaction_user:
-                    continue
-
-                # Use new fields with fallback to legacy
-                user_display_name = interaction_user.display_name
-                user_instagram_username = interaction_user.instagram_username
-                user_profile_picture_url = interaction_user.profile_picture_url
-                user_phone = interaction_user.phone
-
-                # Get inviter if exists
-                inviter = None
-                inviter_display_name = None
-                inviter_instagram_username = None
-                if interaction.invited_by_user_id:
-                    inviter = user.get(db, id=interaction.invited_by_user_id)
-                    if inviter:
-                        inviter_display_name = inviter.display_name
-                        inviter_instagram_username = inviter.instagram_username
-
-                interactions_data.append(
-                    {
-                        "id": interaction.id,
-                        "user_id": interaction.user_id,
-                        "event_id": interaction.event_id,
-                        "interaction_type": interaction.interaction_type,
-                        "status": interaction.status,
-                        "role": interaction.role,
-                        "invited_by_user_id": interaction.invited_by_user_id,
-                        "personal_note": interaction.personal_note,
-                        "read_at": interaction.read_at.isoformat() if interaction.read_at else None,
-                        "created_at": interaction.created_at.isoformat(),
-                        "updated_at": interaction.updated_at.isoformat(),
-                        "user": {
-                            "id": interaction_user.id,
-                            "display_name": user_display_name,
-                            "instagram_username": user_instagram_username,
-                            "profile_picture_url": user_profile_picture_url,
-                            "phone_number": user_phone,
-                        },
-                        "inviter": (
-                            {
-                                "id": inviter.id,
-                                "display_name": inviter_display_name,
-                                "instagram_username": inviter_instagram_username,
-                            }
-                            if inviter
-                            else None
-                        ),
-                    }
-                )
-
-            response_data["interactions"] = interactions_data
-
-        # If user is not owner/admin but is authenticated, add their own interaction
-        elif current_user_id is not None:
-            print(f"🔍 DEBUG BACKEND: Entering REGULAR USER block")
-            print(f"🔍 DEBUG BACKEND: current_user_id = {current_user_id}, event_id = {event_id}")
-            # Get current user's interaction only
-            user_interaction = db.query(EventInteraction).filter(EventInteraction.event_id == event_id, EventInteraction.user_id == current_user_id).first()
-
-            print(f"🔍 DEBUG BACKEND: user_interaction found = {user_interaction is not None}")
-            if user_interaction:
-                print(f"🔍 DEBUG BACKEND: interaction.id = {user_interaction.id}")
-                print(f"🔍 DEBUG BACKEND: interaction.interaction_type = {user_interaction.interaction_type}")
-                print(f"🔍 DEBUG BACKEND: interaction.status = {user_interaction.status}")
-                print(f"🔍 DEBUG BACKEND: interaction.invited_by_user_id = {user_interaction.invited_by_user_id}")
-            else:
-                print(f"🔍 DEBUG BACKEND: No interaction found for user {current_user_id} and event {event_id}")
-
-            if user_interaction:
-                inviter = None
-                inviter_display_name = None
-                inviter_instagram_username = None
-                if user_interaction.invited_by_user_id:
-                    inviter = user.get(db, id=user_interaction.invited_by_user_id)
-                    if inviter:
-                        inviter_display_name = inviter.display_name
-                        inviter_instagram_username = inviter.instagram_username
-
-                response_data["interactions"] = [
-                    {
-                        "id": user_interaction.id,
-                        "user_id": user_interaction.user_id,
-                        "event_id": user_interaction.event_id,
-                        "interaction_type": user_interaction.interaction_type,
-                        "status": user_interaction.status,
-                        "role": user_interaction.role,
-                        "invited_by_user_id": user_interaction.invited_by_user_id,
-                        "personal_note": user_interaction.personal_note,
-                        "is_attending": user_interaction.is_attending,
-                        "read_at": user_interaction.read_at.isoformat() if user_interaction.read_at else None,
-                        "inviter": (
-                            {
-                                "id": inviter.id,
-                                "display_name": inviter_display_name,
-                                "instagram_username": inviter_instagram_username,
-                            }
-                            if inviter
-                            else None
-                        ),
-                    }
-                ]
-
-    # Get accepted users (attendees) - available for all authenticated users
+    # Get accepted users (attendees)
     # Include users who accepted OR rejected but are attending (for public events)
     # Exclude public users (they don't attend their own events)
     #
@@ -317,105 +273,51 @@ async def get_event(event_id: int, current_user_id: Optional[int] = Depends(get_
     # - The inviter
     # - Other users invited by the same inviter who accepted
     # Otherwise, show all attendees
-    if current_user_id is not None:
-        # Check if current user has an accepted invitation
-        current_user_invitation = (
-            db.query(EventInteraction)
-            .filter(
-                EventInteraction.event_id == event_id,
-                EventInteraction.user_id == current_user_id,
-                EventInteraction.interaction_type == "invited",
-                EventInteraction.status == "accepted"
-            )
-            .first()
-        )
+    accepted_invitation = next((interaction for interaction, _ in user_interactions if interaction.interaction_type == "invited" and interaction.status == "accepted"), None)
+    inviter_id = accepted_invitation.invited_by_user_id if accepted_invitation else None
 
-        # If user was invited and accepted, filter attendees by invitation relationship
-        if current_user_invitation and current_user_invitation.invited_by_user_id:
-            inviter_id = current_user_invitation.invited_by_user_id
-
-            # Get attendees who are:
-            # 1. The inviter themselves, OR
-            # 2. Other users invited by the same inviter who accepted
-            accepted_interactions = (
-                db.query(EventInteraction)
-                .join(User, EventInteraction.user_id == User.id)
-                .filter(
-                    EventInteraction.event_id == event_id,
-                    or_(
-                        # The inviter (any interaction type, accepted status)
-                        and_(
-                            EventInteraction.user_id == inviter_id,
-                            EventInteraction.status == "accepted"
-                        ),
-                        # Other users invited by same inviter who accepted
-                        and_(
-                            EventInteraction.invited_by_user_id == inviter_id,
-                            EventInteraction.interaction_type == "invited",
-                            EventInteraction.status == "accepted",
-                            EventInteraction.user_id != current_user_id  # Exclude current user
-                        )
-                    ),
-                    User.is_public == False  # Exclude public users
-                )
-                .all()
-            )
-        else:
-            # User was NOT invited (or is subscribed/joined), show all attendees
-            accepted_interactions = (
-                db.query(EventInteraction)
-                .join(User, EventInteraction.user_id == User.id)
-                .filter(
-                    EventInteraction.event_id == event_id,
-                    or_(
-                        EventInteraction.status == "accepted",
-                        and_(EventInteraction.status == "rejected", EventInteraction.is_attending == True)
-                    ),
-                    User.is_public == False,  # Exclude public users
-                    EventInteraction.user_id != current_user_id  # Exclude current user
-                )
-                .all()
-            )
-
-        attendees = []
-        for interaction in accepted_interactions:
-            user_obj = user.get(db, id=interaction.user_id)
-            if user_obj:
-                attendees.append(
-                    {
-                        "id": user_obj.id,
-                        "display_name": user_obj.display_name,
-                        "profile_picture_url": user_obj.profile_picture_url,
-                        "phone": user_obj.phone,
-                    }
-                )
-
-        response_data["attendees"] = attendees
+    attendees, next_cursor, total = event_interaction.get_attendees(db, event_id=event_id, current_user_id=current_user_id, inviter_id=inviter_id, limit=DETAIL_PAGE_SIZE, with_total=True)
+    response_data["attendees"] = [{"id": a.id, "display_name": a.display_name, "profile_picture_url": a.profile_picture_url, "phone": a.phone} for a in attendees]
+    response_data["attendees_count"] = total
+    response_data["attendees_next_cursor"] = next_cursor
 
     return EventResponse(**response_data)
 
 
 @router.get("/{event_id}/interactions", response_model=List[EventInteractionResponse])
-async def get_event_interactions(event_id: int, db: Session = Depends(get_db)):
-    """Get all interactions for a specific event"""
+async def get_event_interactions(event_id: int, response: Response, interaction_type: Optional[str] = None, status: Optional[str] = None, cursor: Optional[int] = None, limit: int = 100, db: Session = Depends(get_db)):
+    """Get interactions for a specific event, cursor-paginated.
+
+    Optional filters by interaction_type and status. Pass the X-Next-Cursor
+    response header as `cursor` to get the next page; X-Total-Count is
+    returned on the first page."""
+    limit = max(1, min(200, limit))
+
     if not event.exists_event(db, event_id=event_id):
         raise HTTPException(status_code=404, detail="Event not found")
 
-    return event_interaction.get_by_event(db, event_id=event_id)
+    interactions, next_cursor, total = event_interaction.get_page_by_event(db, event_id=event_id, interaction_type=interaction_type, status=status, cursor=cursor, limit=limit, with_total=True)
+    _set_page_headers(response, next_cursor, total)
+    return interactions
 
 
 @router.get("/{event_id}/interactions-enriched", response_model=List[EventInteractionEnrichedResponse])
-async def get_event_interactions_enriched(event_id: int, db: Session = Depends(get_db)):
-    """Get all interactions for a specific event with enriched user information"""
+async def get_event_interactions_enriched(event_id: int, response: Response, interaction_type: Optional[str] = None, status: Optional[str] = None, cursor: Optional[int] = None, limit: int = 100, db: Session = Depends(get_db)):
+    """Get interactions for a specific event with enriched user information, cursor-paginated.
+
+    Same filters and pagination headers as GET /events/{id}/interactions."""
+    limit = max(1, min(200, limit))
+
     if not event.exists_event(db, event_id=event_id):
         raise HTTPException(status_code=404, detail="Event not found")
 
     # Use CRUD to get enriched interactions (single JOIN query)
-    results = event_interaction.get_enriched_by_event(db, event_id=event_id)
+    results, next_cursor, total = event_interaction.get_enriched_page_by_event(db, event_id=event_id, interaction_type=interaction_type, status=status, cursor=cursor, limit=limit, with_total=True)
+    _set_page_headers(response, next_cursor, total)
 
     # Build enriched responses
     enriched = []
-    for interaction, user in results:
+    for interaction, user, _ in results:
         if not user:
             continue
 
@@ -424,7 +326,7 @@ async def get_event_interactions_enriched(event_id: int, db: Session = Depends(g
                 "id": interaction.id,
                 "event_id": interaction.event_id,
                 "user_id": interaction.user_id,
-                "user_display_name": user.display_name,
+                "user_name": user.display_name,
                 "user_instagram_username": user.instagram_username,
                 "interaction_type": interaction.interaction_type,
                 "status": interaction.status,
@@ -443,25 +345,51 @@ async def get_event_interactions_enriched(event_id: int, db: Session = Depends(g
     return enriched
 
 
-@router.get("/{event_id}/available-invitees", response_model=List[AvailableInviteeResponse])
-async def get_available_invitees(event_id: int, db: Session = Depends(get_db)):
-    """Get list of users available to be invited to an event (excludes owner, already invited users, blocked users, and public users)"""
-    db_event = event.get(db, id=event_id)
-    if not db_event:
+@router.get("/{event_id}/attendees", response_model=List[EventAttendeeResponse])
+async def get_event_attendees(event_id: int, response: Response, cursor: Optional[int] = None, limit: int = 100, current_user_id: int = Depends(get_current_user_id), db: Session = Depends(get_db)):
+    """
+    Get attendees of an event, cursor-paginated.
+
+    Requires JWT authentication - provide token in Authorization header.
+    Same attendee rules as GET /events/{id} (related attendees only when the
+    current user accepted an invitation). Pass the X-Next-Cursor response
+    header as `cursor` to get the next page; X-Total-Count is returned on the
+    first page.
+    """
+    limit = max(1, min(200, limit))
+
+    if not event.exists_event(db, event_id=event_id):
         raise HTTPException(status_code=404, detail="Event not found")
+    if not event.check_user_access(db, event_id=event_id, user_id=current_user_id):
+        raise HTTPException(status_code=403, detail="You do not have permission to view this event")
+
+    own_interactions = event_interaction.get_by_event_ids_and_user(db, event_ids=[event_id], user_id=current_user_id)
+    accepted_invitation = next((i for i in own_interactions if i.interaction_type == "invited" and i.status == "accepted"), None)
+    inviter_id = accepted_invitation.invited_by_user_id if accepted_invitation else None
+
+    attendees, next_cursor, total = event_interaction.get_attendees(db, event_id=event_id, current_user_id=current_user_id, inviter_id=inviter_id, cursor=cursor, limit=limit, with_total=True)
+    _set_page_headers(response, next_cursor, total)
+    return [{"id": a.id, "display_name": a.display_name, "profile_picture_url": a.profile_picture_url, "phone": a.phone} for a in attendees]
+
+
+@router.get("/{event_id}/available-invitees", response_model=List[AvailableInviteeResponse])
+async def get_available_invitees(event_id: int, search: Optional[str] = None, limit: int = 50, offset: int = 0, current_user_id: Optional[int] = Depends(get_current_user_id_optional), db: Session = Depends(get_db)):
+    """Get a page of users available to be invited to an event (excludes owner, already invited users, blocked users, and public users).
+
+    Candidates are ranked by affinity with the inviting user (the authenticated
+    user, or the event owner): contacts, shared groups and past co-attendance
+    first, then everyone else. Optional case-insensitive search by display name
+    or Instagram username."""
+    # Validate and limit pagination
+    limit = max(1, min(200, limit))
+    offset = max(0, offset)
 
-    # Use CRUD to get available invitees
-    results = event.get_available_invitees(db, event_id=event_id)
+    if not event.exists_event(db, event_id=event_id):
+        raise HTTPException(status_code=404, detail="Event not found")
 
-    # Build available invitees list
-    available = []
-    for user_obj in results:
-        available.append({
-            "id": user_obj.id,
-            "display_name": user_obj.display_name
-        })
+    results = event.get_available_invitees(db, event_id=event_id, inviter_id=current_user_id, search=search, skip=offset, limit=limit)
 
-    return available
+    return [{"id": user_obj.id, "display_name": user_obj.display_name, "instagram_username": user_obj.instagram_username} for user_obj in results]
 
 
 @router.post("", response_model=EventResponse, status_code=201)
@@ -614,6 +542,30 @@ async def delete_current_user_interaction(event_id: int, current_user_id: int =
     return {"message": "Interaction deleted successfully", "id": db_interaction.id}
 
 
+def _check_can_invite(db: Session, db_event, current_user_id: int) -> None:
+    """
+    Raise 403 unless the current user can invite others to the event:
+    event owner, event admin or accepted participant (subscribed/joined).
+    """
+    if db_event.owner_id == current_user_id:
+        return
+
+    # Check if inviter is an admin or accepted participant of this event
+    inviter_interaction = event_interaction.get_interaction(db, event_id=db_event.id, user_id=current_user_id)
+
+    has_permission = False
+    if inviter_interaction:
+        # Inviter is admin with accepted status
+        if inviter_interaction.role == "admin" and inviter_interaction.status == "accepted":
+            has_permission = True
+        # Inviter is a subscribed or joined participant with accepted status
+        elif inviter_interaction.interaction_type in ["subscribed", "joined"] and inviter_interaction.status == "accepted":
+            has_permission = True
+
+    if not has_permission:
+        raise HTTPException(status_code=403, detail="User does not have permission to invite others to this event. Must be event owner, admin, or accepted participant.")
+
+
 @router.post("/{event_id}/interaction/invite", response_model=EventInteractionResponse, status_code=201)
 async def invite_user_to_event(event_id: int, invite_data: dict, current_user_id: int = Depends(get_current_user_id), db: Session = Depends(get_db)):
     """
@@ -657,29 +609,13 @@ async def invite_user_to_event(event_id: int, invite_data: dict, current_user_id
 
     # Check if invited user is banned
     # Check if there's a block between inviter and invitee
-    check_users_not_blocked(current_user_id, invited_user_id, db)
+    check_users_not_blocked(invited_user_id, current_user_id, db)
 
-    # Check if there's a block between event owner and invitee
-    check_users_not_blocked(db_event.owner_id, invited_user_id, db)
+    # Check if there's a block between event owner and invitee (same cached block set)
+    check_users_not_blocked(invited_user_id, db_event.owner_id, db)
 
     # Check if inviter has permission to invite
-    is_owner = db_event.owner_id == current_user_id
-
-    if not is_owner:
-        # Check if inviter is an admin or accepted participant of this event
-        inviter_interaction = event_interaction.get_interaction(db, event_id=event_id, user_id=current_user_id)
-
-        has_permission = False
-        if inviter_interaction:
-            # Inviter is admin with accepted status
-            if inviter_interaction.role == "admin" and inviter_interaction.status == "accepted":
-                has_permission = True
-            # Inviter is a subscribed or joined participant with accepted status
-            elif inviter_interaction.interaction_type in ["subscribed", "joined"] and inviter_interaction.status == "accepted":
-                has_permission = True
-
-        if not has_permission:
-            raise HTTPException(status_code=403, detail="User does not have permission to invite others to this event. Must be event owner, admin, or accepted participant.")
+    _check_can_invite(db, db_event, current_user_id)
 
     # Check if interaction already exists
     existing_interaction = event_interaction.get_interaction(db, event_id=event_id, user_id=invited_user_id)
@@ -694,17 +630,64 @@ async def invite_user_to_event(event_id: int, invite_data: dict, current_user_id
     return db_interaction
 
 
-@router.get("/cancellations", response_model=List[EventCancellationResponse])
-async def get_event_cancellations(current_user_id: int = Depends(get_current_user_id), db: Session = Depends(get_db)):
+@router.post("/{event_id}/interaction/invite/batch", response_model=EventBatchInviteResponse)
+async def invite_users_to_event_batch(event_id: int, invite_data: EventBatchInviteRequest, current_user_id: int = Depends(get_current_user_id), db: Session = Depends(get_db)):
     """
-    Get all event cancellations that the authenticated user hasn't viewed yet.
+    Invite several users (user_ids) and/or all members of a group (group_id) at once.
 
     Requires JWT authentication - provide token in Authorization header.
+    Same inviter rules as POST /events/{id}/interaction/invite. For group_id
+    the current user must be the group creator or a member; invitations
+    record invited_via_group_id. Users that can't be invited don't fail the
+    request: each one gets an outcome in `results` (see
+    CRUDEventInteraction.create_invitations_batch). At most MAX_INVITE_BATCH users.
+    """
+    db_event = event.get(db, id=event_id)
+    if not db_event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    if not invite_data.user_ids and invite_data.group_id is None:
+        raise HTTPException(status_code=400, detail="user_ids or group_id is required")
 
-    Returns cancellations for events where the user had an interaction
-    and hasn't viewed the cancellation message yet.
+    inviter = get_permission_resolver(db).user_flags(current_user_id)
+    if inviter and inviter.is_public:
+        raise HTTPException(status_code=403, detail="Public users cannot invite others to events. Only private users can invite.")
+    _check_can_invite(db, db_event, current_user_id)
+
+    user_ids = list(invite_data.user_ids or [])
+    if invite_data.group_id is not None:
+        db_group = group.get(db, id=invite_data.group_id)
+        if not db_group:
+            raise HTTPException(status_code=404, detail="Group not found")
+        member_ids = [db_group.owner_id] + group_membership.get_member_ids(db, group_id=db_group.id)
+        if current_user_id not in member_ids:
+            raise HTTPException(status_code=403, detail="Only group members can invite a whole group")
+        user_ids += [member_id for member_id in member_ids if member_id != current_user_id]
+
+    user_ids = list(dict.fromkeys(user_ids))
+    if len(user_ids) > MAX_INVITE_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_INVITE_BATCH} users per request")
+
+    results = event_interaction.create_invitations_batch(db, db_event=db_event, user_ids=user_ids, inviter_id=current_user_id, invited_via_group_id=invite_data.group_id)
+    return {"invited_count": sum(1 for _, outcome, _ in results if outcome == "invited"), "results": [{"user_id": user_id, "outcome": outcome, "interaction_id": interaction_id} for user_id, outcome, interaction_id in results]}
+
+
+@router.post("/cancellations/view", response_model=BatchReadResponse)
+async def mark_cancellations_as_viewed(request: BatchReadRequest, current_user_id: int = Depends(get_current_user_id), db: Session = Depends(get_db)):
     """
-    return event_cancellation.get_unviewed_by_user(db, user_id=current_user_id)
+    Mark several event cancellations as viewed by the authenticated user in one statement.
+
+    Requires JWT authentication - provide token in Authorization header.
+    Pass `ids` (at most MAX_READ_BATCH) and/or `before` (mark every
+    cancellation made up to that timestamp). Unknown and already viewed
+    cancellations are skipped; updated_count is the number of new views.
+    """
+    if request.ids is None and request.before is None:
+        raise HTTPException(status_code=400, detail="ids or before is required")
+    if request.ids is not None and len(request.ids) > MAX_READ_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_READ_BATCH} ids per request")
+
+    viewed = event_cancellation.mark_as_viewed_batch(db, user_id=current_user_id, cancellation_ids=request.ids, before=request.before)
+    return {"updated_count": viewed}
 
 
 @router.post("/cancellations/{cancellation_id}/view")
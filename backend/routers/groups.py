@@ -19,17 +19,17 @@ router = APIRouter(prefix="/api/v1/groups", tags=["groups"])
 
 
 def _enrich_group_with_members(db: Session, db_group: Group) -> GroupResponse:
-    """Enrich a group with owner, members, and admins"""
-    from crud.crud_group_membership import group_membership
-
-    # Get all memberships
-    memberships = group_membership.get_by_group(db, group_id=db_group.id)
+    """
+    Enrich a group with owner, members, and admins.
 
+    Uses the loaded memberships relationship (eager loaded by the list and
+    detail queries) instead of querying per group.
+    """
     # Separate members and admins
     members_list = []
     admins_list = []
 
-    for membership in memberships:
+    for membership in db_group.memberships:
         if membership.user:
             if membership.role == "admin":
                 admins_list.append(membership.user)
@@ -49,36 +49,11 @@ async def get_groups(current_user_id: int = Depends(get_current_user_id), owner_
 
     Optionally filter by owner_id to get only groups owned by a specific user.
     """
-    from crud.crud_group_membership import group_membership
-
     # Validate and limit pagination
     limit = max(1, min(200, limit))
     offset = max(0, offset)
 
-    # Get all groups where user is a member (owner, admin, or member)
-    memberships = group_membership.get_by_user(db, user_id=current_user_id)
-    group_ids = [m.group_id for m in memberships]
-
-    # If no memberships, return empty list
-    if not group_ids:
-        return []
-
-    # Get groups by IDs
-    groups = []
-    for group_id in group_ids:
-        db_group = group.get(db, id=group_id)
-        if db_group:
-            # Apply owner filter if specified
-            if owner_id is not None and db_group.owner_id != owner_id:
-                continue
-            groups.append(db_group)
-
-    # Sort groups (simple sort by id for now)
-    if order_by == "id":
-        groups.sort(key=lambda g: g.id, reverse=(order_dir == "desc"))
-
-    # Apply pagination
-    groups = groups[offset : offset + limit]
+    groups = group.get_user_groups(db, user_id=current_user_id, owner_id=owner_id, skip=offset, limit=limit, order_by=order_by, order_dir=order_dir)
 
     # Enrich each group with members and admins
     return [_enrich_group_with_members(db, g) for g in groups]
@@ -87,7 +62,7 @@ async def get_groups(current_user_id: int = Depends(get_current_user_id), owner_
 @router.get("/{group_id}", response_model=GroupResponse)
 async def get_group(group_id: int, db: Session = Depends(get_db)):
     """Get a single group by ID"""
-    db_group = group.get(db, id=group_id)
+    db_group = group.get_with_relations(db, id=group_id)
     if not db_group:
         raise HTTPException(status_code=404, detail="Group not found")
     return _enrich_group_with_members(db, db_group)
@@ -13,10 +13,13 @@ from auth import get_current_user_id
 from crud import event, event_interaction, user
 from dependencies import check_user_not_public, check_users_not_blocked, get_db, handle_recurring_event_rejection_cascade, is_event_owner_or_admin
 from models import EventInteraction
-from schemas import EventInteractionBase, EventInteractionCreate, EventInteractionResponse, EventInteractionUpdate, EventInteractionWithEventResponse
+from schemas import BatchReadRequest, BatchReadResponse, EventInteractionBase, EventInteractionCreate, EventInteractionResponse, EventInteractionUpdate, EventInteractionWithEventResponse
 
 router = APIRouter(prefix="/api/v1/interactions", tags=["interactions"])
 
+# Maximum number of IDs per POST /interactions/mark-read request
+MAX_READ_BATCH = 1000
+
 
 @router.get("", response_model=List[Union[EventInteractionWithEventResponse, EventInteractionResponse]])
 async def get_interactions(
@@ -63,10 +66,10 @@ async def create_interaction(interaction: EventInteractionCreate, db: Session =
     # Check if the user inviting is banned (if applicable)
     if interaction.invited_by_user_id:
         # Check if there's a block between inviter and invitee
-        check_users_not_blocked(interaction.invited_by_user_id, interaction.user_id, db)
+        check_users_not_blocked(interaction.user_id, interaction.invited_by_user_id, db)
 
-    # Check if there's a block between event owner and invitee
-    check_users_not_blocked(db_event.owner_id, interaction.user_id, db)
+    # Check if there's a block between event owner and invitee (same cached block set)
+    check_users_not_blocked(interaction.user_id, db_event.owner_id, db)
 
     # VALIDATION: role='admin' can only be assigned with 'joined' interaction type
     if interaction.role == "admin" and interaction.interaction_type != "joined":
@@ -199,6 +202,24 @@ async def delete_interaction(interaction_id: int, current_user_id: int = Depends
     return {"message": "Interaction deleted successfully", "id": interaction_id}
 
 
+@router.post("/mark-read", response_model=BatchReadResponse)
+async def mark_interactions_as_read(request: BatchReadRequest, current_user_id: int = Depends(get_current_user_id), db: Session = Depends(get_db)):
+    """
+    Mark several of the current user's interactions as read in one statement.
+
+    Requires JWT authentication - provide token in Authorization header.
+    Pass `ids` (at most MAX_READ_BATCH) and/or `before` (mark everything
+    created up to that timestamp). Interactions of other users are ignored.
+    """
+    if request.ids is None and request.before is None:
+        raise HTTPException(status_code=400, detail="ids or before is required")
+    if request.ids is not None and len(request.ids) > MAX_READ_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_READ_BATCH} ids per request")
+
+    updated = event_interaction.mark_as_read_batch(db, user_id=current_user_id, interaction_ids=request.ids, before=request.before)
+    return {"updated_count": updated}
+
+
 @router.post("/{interaction_id}/mark-read", response_model=EventInteractionResponse)
 async def mark_interaction_as_read(interaction_id: int, db: Session = Depends(get_db)):
     """
@@ -0,0 +1,28 @@
+"""
+Jobs Router
+
+Progress of tracked background jobs (account deletion, ...).
+"""
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from dependencies import get_db
+from models import BackgroundJob
+from schemas import BackgroundJobResponse
+
+router = APIRouter(prefix="/api/v1/jobs", tags=["jobs"])
+
+
+@router.get("/{job_id}", response_model=BackgroundJobResponse)
+async def get_job(job_id: str, db: Session = Depends(get_db)):
+    """
+    Get the status and progress of a background job.
+
+    No authentication: the job ID is a random UUID only known to whoever
+    started the job, and it must keep working after an account deletion.
+    """
+    job = db.get(BackgroundJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
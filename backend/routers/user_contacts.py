@@ -4,16 +4,23 @@ User Contacts Router
 Handles phone contacts synchronization and retrieval.
 """
 
+import json
 import logging
+import tempfile
+from datetime import datetime, timezone
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
 from auth import get_current_user_id
-from crud import user, user_contact
+from crud import contact_link, user, user_contact
+from crud.crud_user_contact import SYNC_BATCH_SIZE
 from dependencies import get_db
 from schemas import (
+    ContactUserResponse,
     UserContactBase,
     UserContactResponse,
     UserContactSync,
@@ -24,6 +31,12 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/contacts", tags=["contacts"])
 
+# Registered matches stay in memory up to this size, then spill to disk
+STREAM_RESULTS_MAX_MEMORY = 1024 * 1024
+
+# A single NDJSON contact line can't be longer than this
+STREAM_MAX_LINE_BYTES = 64 * 1024
+
 
 @router.post("/sync", response_model=UserContactSyncResponse)
 async def sync_contacts(
@@ -34,63 +47,97 @@ async def sync_contacts(
     """
     Sync phone contacts from device.
 
-    For each contact:
-    1. Check if phone_number exists in users table
-    2. Create/update UserContact with owner_id=current_user_id
-    3. Link registered_user_id if phone is registered
+    All contacts are upserted in bulk (INSERT ... ON CONFLICT on owner + phone)
+    and linked to registered users in the same pass.
+
+    Delta sync: the client may send `chunks`, each with a stable `chunk_key`
+    and a `digest` of its contents. Chunks whose digest didn't change since
+    the last sync are skipped; changed chunks sent without contacts are
+    returned in `stale_chunks` so the client can upload only those.
     """
+    result = user_contact.sync_contacts(db, owner_id=current_user_id, contacts=request.contacts, chunks=request.chunks)
+
+    return UserContactSyncResponse(**result)
+
+
+@router.post("/sync/stream")
+async def sync_contacts_stream(
+    request: Request,
+    current_user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db),
+):
+    """
+    Sync a large address book uploaded as NDJSON.
+
+    Body: one contact per line, e.g. {"contact_name": "Juan", "phone_number": "+34666"}.
+    The body is parsed incrementally and upserted in fixed-size batches inside
+    a single transaction, so memory doesn't grow with the address book size.
+    A line longer than STREAM_MAX_LINE_BYTES is rejected with 413.
+
+    Response (application/x-ndjson): one {"registered_contact": {...}} line
+    per match, followed by a {"summary": {...}} line. Matches are spooled to
+    a temporary file while the upload is read and streamed back afterwards.
+    """
+    country_code = user_contact.get_owner_country_code(db, owner_id=current_user_id)
+    now = datetime.now(timezone.utc)
+    results = tempfile.SpooledTemporaryFile(max_size=STREAM_RESULTS_MAX_MEMORY, mode="w+b")
     synced_count = 0
     registered_count = 0
-    registered_contacts = []
-
-    for contact_data in request.contacts:
-        # Check if phone is registered
-        registered_user = user.get_by_phone(db, phone=contact_data.phone_number)
-        registered_user_id = registered_user.id if registered_user else None
-
-        # Check if contact already exists for this owner
-        existing_contact = user_contact.get_by_phone(
-            db, owner_id=current_user_id, phone_number=contact_data.phone_number
-        )
-
-        if existing_contact:
-            # Update existing contact
-            existing_contact.contact_name = contact_data.contact_name
-            existing_contact.registered_user_id = registered_user_id
-            db.commit()
-            db.refresh(existing_contact)
-        else:
-            # Create new contact
-            from models import UserContact
-
-            new_contact = UserContact(
-                owner_id=current_user_id,
-                contact_name=contact_data.contact_name,
-                phone_number=contact_data.phone_number,
-                registered_user_id=registered_user_id,
-            )
-            db.add(new_contact)
-            db.commit()
-            db.refresh(new_contact)
-
-        synced_count += 1
-
-        if registered_user_id:
-            registered_count += 1
-            registered_contacts.append(
-                {
-                    "id": registered_user.id,
-                    "display_name": registered_user.display_name,
-                    "phone": registered_user.phone,
-                    "profile_picture_url": registered_user.profile_picture_url,
-                }
-            )
-
-    return UserContactSyncResponse(
-        synced_count=synced_count,
-        registered_count=registered_count,
-        registered_contacts=registered_contacts,
-    )
+    batch = {}
+    line_number = 0
+
+    def flush_batch():
+        nonlocal synced_count, registered_count
+        registered = user_contact.upsert_batch(db, owner_id=current_user_id, name_by_phone=batch, country_code=country_code, synced_at=now)
+        for contact in registered:
+            results.write(json.dumps({"registered_contact": contact}).encode() + b"\n")
+        synced_count += len(batch)
+        registered_count += len(registered)
+        batch.clear()
+
+    def add_line(raw: bytes):
+        nonlocal line_number
+        line_number += 1
+        if not raw.strip():
+            return
+        contact = UserContactBase.model_validate_json(raw)
+        if contact.phone_number in batch:
+            flush_batch()
+        batch[contact.phone_number] = contact.contact_name
+        if len(batch) >= SYNC_BATCH_SIZE:
+            flush_batch()
+
+    try:
+        pending = b""
+        async for chunk in request.stream():
+            pending += chunk
+            *lines, pending = pending.split(b"\n")
+            for raw in lines:
+                add_line(raw)
+            if len(pending) > STREAM_MAX_LINE_BYTES:
+                db.rollback()
+                results.close()
+                raise HTTPException(status_code=413, detail=f"Line {line_number + 1} exceeds {STREAM_MAX_LINE_BYTES} bytes")
+        add_line(pending)
+        flush_batch()
+        contact_link.refresh_for_owner(db, owner_id=current_user_id)
+        db.commit()
+    except ValidationError as e:
+        db.rollback()
+        results.close()
+        raise HTTPException(status_code=400, detail=f"Invalid contact on line {line_number}: {e.errors()[0]['msg']}")
+
+    logger.info(f"Streamed contact sync for user {current_user_id}: {synced_count} synced, {registered_count} registered")
+
+    def iter_results():
+        try:
+            results.seek(0)
+            yield from results
+            yield json.dumps({"summary": {"synced_count": synced_count, "registered_count": registered_count}}).encode() + b"\n"
+        finally:
+            results.close()
+
+    return StreamingResponse(iter_results(), media_type="application/x-ndjson")
 
 
 @router.get("", response_model=List[UserContactResponse])
@@ -144,3 +191,42 @@ async def get_my_contacts(
         result.append(contact_dict)
 
     return result
+
+
+@router.get("/known-by", response_model=List[ContactUserResponse])
+async def get_users_who_know_me(
+    mutual_only: bool = False,
+    limit: int = 100,
+    skip: int = 0,
+    current_user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db),
+):
+    """
+    Get app users that have the current user in their address book.
+
+    Served from the reverse contact index (single indexed lookup).
+
+    Args:
+        mutual_only: If True, only users the current user also has as contact
+        limit: Maximum number of users to return
+        skip: Number of users to skip
+    """
+    limit = max(1, min(200, limit))
+    skip = max(0, skip)
+
+    rows = contact_link.get_known_by(db, user_id=current_user_id, mutual_only=mutual_only, skip=skip, limit=limit)
+    return [ContactUserResponse(id=u.id, display_name=u.display_name, phone=u.phone, profile_picture_url=u.profile_picture_url, is_mutual=is_mutual) for u, is_mutual in rows]
+
+
+@router.get("/mutual", response_model=List[ContactUserResponse])
+async def get_mutual_contacts(
+    limit: int = 100,
+    skip: int = 0,
+    current_user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db),
+):
+    """
+    Get app users that are in the current user's contacts and have the
+    current user in theirs.
+    """
+    return await get_users_who_know_me(mutual_only=True, limit=limit, skip=skip, current_user_id=current_user_id, db=db)
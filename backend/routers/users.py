@@ -8,22 +8,30 @@ import logging
 from datetime import datetime, timedelta
 from typing import List, Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from auth import get_current_user_id, get_current_user_id_optional
-from crud import calendar_membership, event, event_interaction, recurring_config, user, user_block
+from background_jobs import create_tracked_job, run_tracked_job
+from crud import calendar_membership, contact_link, event, event_access, event_interaction, recurring_config, user, user_block, user_contact
 from crud.crud_calendar_subscription import calendar_subscription
 from dependencies import get_db
+from social_graph import social_graph
 import models
 from models import EventInteraction
-from schemas import EventResponse, UserCreate, UserEnrichedResponse, UserPublicStats, UserResponse, UserSubscriptionResponse
+from schemas import EventResponse, UserCreate, UserEnrichedResponse, UserPublicStats, UserResponse, UserSubscriptionResponse, UserSuggestionResponse
 
 logger = logging.getLogger(__name__)
 
 
 router = APIRouter(prefix="/api/v1/users", tags=["users"])
 
+# Number of friends shown per event in the feed
+FRIENDS_PREVIEW_SIZE = 3
+
+# When an event reaches the feed through several sources, the first one wins
+FEED_SOURCE_PRIORITY = {source: rank for rank, source in enumerate(["owned", "joined", "subscribed", "invited", "calendar", "subscribed_calendar"])}
+
 
 @router.get("")
 async def get_users(public: Optional[bool] = None, search: Optional[str] = None, exclude_user_id: Optional[int] = None, limit: int = 50, offset: int = 0, order_by: Optional[str] = "id", order_dir: str = "asc", db: Session = Depends(get_db)):
@@ -65,6 +73,29 @@ async def get_current_user(current_user_id: int = Depends(get_current_user_id),
     return db_user
 
 
+@router.get("/me/suggestions", response_model=List[UserSuggestionResponse])
+async def get_my_suggestions(limit: int = 20, current_user_id: int = Depends(get_current_user_id), db: Session = Depends(get_db)):
+    """
+    People you may know: users sharing groups or events with the current user.
+
+    Requires JWT authentication - provide token in Authorization header.
+    Served from the in-memory social graph; existing contacts, blocked users
+    and public users are excluded. Ordered by affinity score.
+    """
+    limit = max(1, min(100, limit))
+
+    # Over-fetch: some candidates may be public users
+    exclude = social_graph.contacts_of(current_user_id) | user_block.blocked_set(db, user_id=current_user_id)
+    candidates = social_graph.top_neighbours(current_user_id, limit * 2, exclude=exclude)
+    users_by_id = {u.id: u for u in user.get_multi_by_ids(db, [user_id for user_id, _ in candidates]) if not u.is_public}
+
+    return [
+        {"id": user_id, "display_name": users_by_id[user_id].display_name, "instagram_username": users_by_id[user_id].instagram_username, "profile_picture_url": users_by_id[user_id].profile_picture_url, "score": score}
+        for user_id, score in candidates
+        if user_id in users_by_id
+    ][:limit]
+
+
 @router.get("/{user_id}", response_model=Union[UserResponse, UserEnrichedResponse])
 async def get_user(user_id: int, enriched: bool = False, db: Session = Depends(get_db)):
     """Get a single user by ID, optionally enriched with contact info"""
@@ -92,18 +123,23 @@ async def get_user(user_id: int, enriched: bool = False, db: Session = Depends(g
 
 
 @router.get("/{user_id}/stats", response_model=UserPublicStats)
-async def get_user_stats(user_id: int, db: Session = Depends(get_db)):
+async def get_user_stats(user_id: int, limit: int = 50, offset: int = 0, db: Session = Depends(get_db)):
     """
     Get statistics for a public user.
 
     Returns:
     - Total number of subscribers
     - Total number of events created
-    - Stats for each event (event_id, event_name, event_start_date, total_joined)
+    - Stats for each event (event_id, event_name, event_start_date, total_joined),
+      paginated with limit/offset (ordered by event id; use total_events to page)
 
     Only available for public users. Returns 403 for private users.
     """
-    stats = user.get_public_user_stats(db, user_id=user_id)
+    # Validate and limit pagination
+    limit = max(1, min(200, limit))
+    offset = max(0, offset)
+
+    stats = user.get_public_user_stats(db, user_id=user_id, skip=offset, limit=limit)
 
     if not stats:
         # User doesn't exist or is not public
@@ -125,6 +161,11 @@ async def create_user(user_data: UserCreate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="User already exists for this auth provider")
 
     db_user = user.create(db, obj_in=user_data)
+
+    # Link existing address book entries that already have this phone
+    if db_user.phone and not db_user.is_public:
+        user_contact.update_registered_user_for_phone(db, phone_number=db_user.phone, user_id=db_user.id)
+
     return db_user
 
 
@@ -149,13 +190,16 @@ async def update_user(user_id: int, user_data: UserCreate, current_user_id: int
     return updated_user
 
 
-@router.delete("/{user_id}")
-async def delete_user(user_id: int, current_user_id: int = Depends(get_current_user_id), db: Session = Depends(get_db)):
+@router.delete("/{user_id}", status_code=202)
+async def delete_user(user_id: int, background_tasks: BackgroundTasks, current_user_id: int = Depends(get_current_user_id), db: Session = Depends(get_db)):
     """
     Delete a user.
 
     Requires JWT authentication - provide token in Authorization header.
     Only the user themselves can delete their account.
+
+    The account is deleted by a background job (202 Accepted); follow its
+    progress with GET /api/v1/jobs/{job_id}.
     """
     # Check if user exists first
     db_user = user.get(db, id=user_id)
@@ -166,8 +210,9 @@ async def delete_user(user_id: int, current_user_id: int = Depends(get_current_u
     if user_id != current_user_id:
         raise HTTPException(status_code=403, detail="You don't have permission to delete this user. You can only delete your own account.")
 
-    user.delete(db, id=user_id)
-    return {"message": "User deleted successfully", "id": user_id}
+    job = create_tracked_job(db, kind="delete_account", requested_by=current_user_id)
+    background_tasks.add_task(run_tracked_job, job.id, lambda job_db, reporter: user.delete_account(job_db, user_id=user_id, reporter=reporter))
+    return {"message": "User deletion started", "id": user_id, "job_id": job.id}
 
 
 @router.get("/{user_id}/events", response_model=List[EventResponse])
@@ -240,49 +285,11 @@ async def get_user_events(
     # ============================================================
     # 2. COLLECT EVENT IDs WITH SOURCES (priority: owned > joined > subscribed > invited > calendar)
     # ============================================================
+    # Single query on event_access (joins not accepted and rejected invitations are left out)
     event_sources = {}  # event_id -> source_type
-
-    # Own events (highest priority)
-    own_event_ids = event.get_event_ids_by_owner(db, owner_id=user_id)
-    for event_id in own_event_ids:
-        event_sources[event_id] = "owned"
-
-    # Joined events (events where user is admin/member with accepted status)
-    joined_event_ids = event_interaction.get_event_ids_by_user_type_status(db, user_id=user_id, interaction_type="joined", status="accepted")
-    for event_id in joined_event_ids:
-        if event_id not in event_sources:
-            event_sources[event_id] = "joined"
-
-    # Subscribed events
-    subscribed_event_ids = event_interaction.get_event_ids_by_user_type_status(db, user_id=user_id, interaction_type="subscribed")
-    for event_id in subscribed_event_ids:
-        if event_id not in event_sources:
-            event_sources[event_id] = "subscribed"
-
-    # Invited events (exclude rejected statuses - those should not be visible)
-    invited_interactions = event_interaction.get_by_user(db, user_id=user_id, interaction_type="invited")
-    invited_event_ids = [i.event_id for i in invited_interactions if i.status not in ["rejected", "rejected_invitation_accepted_event"]]
-    for event_id in invited_event_ids:
-        if event_id not in event_sources:
-            event_sources[event_id] = "invited"
-
-    # Calendar events (via CalendarMembership - low priority)
-    calendar_ids = calendar_membership.get_calendar_ids_by_user(db, user_id=user_id, status="accepted", roles=["owner", "admin"])
-
-    if calendar_ids:
-        calendar_event_ids = event.get_event_ids_by_calendars(db, calendar_ids=calendar_ids)
-        for event_id in calendar_event_ids:
-            if event_id not in event_sources:
-                event_sources[event_id] = "calendar"
-
-    # Subscribed calendar events (via CalendarSubscription - lowest priority)
-    subscribed_calendar_ids = calendar_subscription.get_calendar_ids_by_user(db, user_id=user_id, status="active")
-
-    if subscribed_calendar_ids:
-        subscribed_calendar_event_ids = event.get_event_ids_by_calendars(db, calendar_ids=subscribed_calendar_ids)
-        for event_id in subscribed_calendar_event_ids:
-            if event_id not in event_sources:
-                event_sources[event_id] = "subscribed_calendar"
+    for event_id, source in event_access.get_feed_sources(db, user_id=user_id):
+        if event_id not in event_sources or FEED_SOURCE_PRIORITY[source] < FEED_SOURCE_PRIORITY[event_sources[event_id]]:
+            event_sources[event_id] = source
 
     if not event_sources:
         return []
@@ -298,12 +305,9 @@ async def get_user_events(
     # ============================================================
     # 3.5. FILTER OUT BLOCKED USERS
     # ============================================================
-    # Get IDs of users that have mutual blocks with the current user
-    blocked_user_ids = user_block.get_blocked_user_ids_bidirectional(db, user_id=user_id)
-
-    # Filter out events owned by blocked users
-    if blocked_user_ids:
-        events = [e for e in events if e.owner_id not in blocked_user_ids]
+    # Filter out events owned by users that have mutual blocks with the user (cached block set)
+    allowed_owner_ids = set(user_block.filter_blocked(db, user_id=user_id, candidate_ids={e.owner_id for e in events}))
+    events = [e for e in events if e.owner_id in allowed_owner_ids]
 
     if not events:
         return []
@@ -360,6 +364,18 @@ async def get_user_events(
                 "profile_picture_url": user_obj.profile_picture_url,
             })
 
+    # Friends attending: intersect each event's attendees with the viewer's contact set
+    # (from the social graph when built, otherwise one indexed query) - no per-event joins.
+    # The viewer is current_user_id if provided (authenticated user), otherwise user_id from URL
+    viewer_id = current_user_id if current_user_id is not None else user_id
+    contact_ids = social_graph.contacts_of(viewer_id) if social_graph.ready else contact_link.get_contact_ids(db, owner_id=viewer_id)
+    friends_map = {}  # event_id -> [user_dict]
+    if contact_ids:
+        for event_id, attendees in attendees_map.items():
+            friends = [a for a in attendees if a["id"] in contact_ids]
+            if friends:
+                friends_map[event_id] = friends
+
     # ============================================================
     # 4. FETCH ALL RECURRING CONFIGS AND INVITATIONS (batch queries)
     # ============================================================
@@ -431,9 +447,7 @@ async def get_user_events(
     visible_event_ids = [e.id for e in visible_events]
     user_interactions = {}
     if visible_event_ids:
-        # Use current_user_id if provided (authenticated user), otherwise use user_id from URL
-        interaction_user_id = current_user_id if current_user_id is not None else user_id
-        interactions = event_interaction.get_by_event_ids_and_user(db, event_ids=visible_event_ids, user_id=interaction_user_id)
+        interactions = event_interaction.get_by_event_ids_and_user(db, event_ids=visible_event_ids, user_id=viewer_id)
         for interaction in interactions:
             user_interactions[interaction.event_id] = {
                 "id": interaction.id,
@@ -510,6 +524,8 @@ async def get_user_events(
             "is_birthday": is_birthday,
             # Attendees
             "attendees": attendees_map.get(ev.id, []),
+            "friends_attending_count": len(friends_map.get(ev.id, [])),
+            "friends_attending": friends_map.get(ev.id, [])[:FRIENDS_PREVIEW_SIZE],
         }
         result.append(event_dict)
 
@@ -677,7 +693,8 @@ async def get_user_subscriptions(user_id: int, db: Session = Depends(get_db)):
     """
     Get all public users that the given user is subscribed to with statistics.
 
-    This endpoint is optimized to avoid N+1 queries by using JOINs and aggregations.
+    Single query: grouped subqueries over the followed users' events,
+    with totals from the user_counters table when available.
     It returns a list of unique public users with:
     - new_events_count: Events created in the last 7 days
     - total_events_count: Total events owned by this user
@@ -686,57 +703,31 @@ async def get_user_subscriptions(user_id: int, db: Session = Depends(get_db)):
     Returns:
     - List of UserSubscriptionResponse objects for each public user
     """
-    from datetime import timedelta
-    from sqlalchemy import func, distinct
-
     # Verify user exists
-    db_user = user.get(db, id=user_id)
-    if not db_user:
+    if not user.exists(db, id=user_id):
         raise HTTPException(status_code=404, detail="User not found")
 
-    # Query to get unique public users from subscribed events
-    subscribed_users = (
-        db.query(models.User)
-        .join(models.Event, models.Event.owner_id == models.User.id)
-        .join(models.EventInteraction, models.EventInteraction.event_id == models.Event.id)
-        .filter(models.EventInteraction.user_id == user_id, models.EventInteraction.interaction_type == "subscribed", models.User.is_public == True)
-        .distinct()
-        .all()
-    )
-
-    # Calculate statistics for each user
-    result = []
-    seven_days_ago = datetime.now() - timedelta(days=7)
-
-    for public_user in subscribed_users:
-        # Count total events
-        total_events = db.query(func.count(models.Event.id)).filter(models.Event.owner_id == public_user.id).scalar()
-
-        # Count new events (created in last 7 days)
-        new_events = db.query(func.count(models.Event.id)).filter(models.Event.owner_id == public_user.id, models.Event.created_at >= seven_days_ago).scalar()
-
-        # Count unique subscribers (distinct users subscribed to any event of this owner)
-        subscribers = db.query(func.count(distinct(models.EventInteraction.user_id))).join(models.Event, models.Event.id == models.EventInteraction.event_id).filter(models.Event.owner_id == public_user.id, models.EventInteraction.interaction_type == "subscribed").scalar()
-
-        # Build response
-        result.append(
-            UserSubscriptionResponse(
-                id=public_user.id,
-                display_name=public_user.display_name,
-                instagram_username=public_user.instagram_username,
-                phone=public_user.phone,
-                profile_picture_url=public_user.profile_picture_url,
-                auth_provider=public_user.auth_provider,
-                auth_id=public_user.auth_id,
-                is_public=public_user.is_public,
-                is_admin=public_user.is_admin,
-                last_login=public_user.last_login,
-                created_at=public_user.created_at,
-                updated_at=public_user.updated_at,
-                new_events_count=new_events or 0,
-                total_events_count=total_events or 0,
-                subscribers_count=subscribers or 0,
-            )
+    rows = user.get_subscriptions_with_stats(db, user_id=user_id, new_since=datetime.now() - timedelta(days=7))
+
+    result = [
+        UserSubscriptionResponse(
+            id=public_user.id,
+            display_name=public_user.display_name,
+            instagram_username=public_user.instagram_username,
+            phone=public_user.phone,
+            profile_picture_url=public_user.profile_picture_url,
+            auth_provider=public_user.auth_provider,
+            auth_id=public_user.auth_id,
+            is_public=public_user.is_public,
+            is_admin=public_user.is_admin,
+            last_login=public_user.last_login,
+            created_at=public_user.created_at,
+            updated_at=public_user.updated_at,
+            new_events_count=new_events,
+            total_events_count=total_events,
+            subscribers_count=subscribers,
         )
+        for public_user, new_events, total_events, subscribers in rows
+    ]
 
     return result
@@ -5,7 +5,7 @@ All request/response models defined here.
 """
 
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, ConfigDict
 
@@ -90,6 +90,16 @@ class UserSubscriptionResponse(UserBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class UserSuggestionResponse(BaseModel):
+    """Suggested user ("people you may know") with affinity score"""
+
+    id: int
+    display_name: Optional[str]
+    instagram_username: Optional[str]
+    profile_picture_url: Optional[str]
+    score: float  # Weighted shared groups and co-attendance
+
+
 class EventStats(BaseModel):
     """Statistics for a single event of a public user"""
 
@@ -157,6 +167,30 @@ class InvitationStats(BaseModel):
     rejected: int  # Number of rejected invitations
 
 
+class EventInvitationStats(InvitationStats):
+    """Invitation statistics of one event (batch endpoint)"""
+
+    event_id: int
+
+
+class EventBatchInviteRequest(BaseModel):
+    """Batch invitation: explicit user IDs and/or every member of a group"""
+
+    user_ids: Optional[List[int]] = None
+    group_id: Optional[int] = None
+
+
+class EventBatchInviteResult(BaseModel):
+    user_id: int
+    outcome: str  # 'invited', 'not_found', 'not_invitable', 'public_user', 'blocked', 'banned', 'already_interacting'
+    interaction_id: Optional[int] = None  # Only when outcome == 'invited'
+
+
+class EventBatchInviteResponse(BaseModel):
+    invited_count: int
+    results: List[EventBatchInviteResult]
+
+
 class EventResponse(EventBase):
     id: int
     owner_id: int
@@ -165,7 +199,7 @@ class EventResponse(EventBase):
     created_at: datetime
     updated_at: datetime
     interaction: Optional[dict] = None  # User's interaction with this event (type, status, role) - only for /users/{id}/events
-    interactions: Optional[List[dict]] = None  # All interactions for this event with enriched user data - only for /events/{id}
+    interactions: Optional[List[dict]] = None  # First page of interactions for this event with enriched user data - only for /events/{id}
     # Owner info
     owner_name: Optional[str] = None  # Full name of event owner
     owner_profile_picture: Optional[str] = None  # Profile picture URL of owner
@@ -179,7 +213,13 @@ class EventResponse(EventBase):
     # Event characteristics
     is_birthday: Optional[bool] = None  # True if this is a birthday event
     # Attendees (users who accepted invitation or are members/admins)
-    attendees: Optional[List[dict]] = None  # List of attendee user objects
+    attendees: Optional[List[dict]] = None  # First page of attendee user objects - only for /events/{id}
+    attendees_count: Optional[int] = None  # Total number of attendees
+    friends_attending_count: Optional[int] = None  # Attendees in the viewer's contacts - only for /users/{id}/events
+    friends_attending: Optional[List[dict]] = None  # First attendees in the viewer's contacts - only for /users/{id}/events
+    attendees_next_cursor: Optional[int] = None  # Cursor for GET /events/{id}/attendees (None if no more pages)
+    interactions_count: Optional[int] = None  # Total number of interactions (owner/admin/participants only)
+    interactions_next_cursor: Optional[int] = None  # Cursor for GET /events/{id}/interactions-enriched (None if no more pages)
     # Invitation stats (only when current user is owner/admin)
     invitation_stats: Optional[InvitationStats] = None  # Statistics about invitations to this event
 
@@ -248,6 +288,15 @@ class EventInteractionEnrichedResponse(EventInteractionBase):
     updated_at: datetime
 
 
+class EventAttendeeResponse(BaseModel):
+    """User attending an event"""
+
+    id: int
+    display_name: Optional[str]
+    profile_picture_url: Optional[str]
+    phone: Optional[str]
+
+
 class AvailableInviteeResponse(BaseModel):
     """User available to be invited to an event"""
 
@@ -498,7 +547,7 @@ class EventBanResponse(EventBanBase):
     id: int
     event_id: int
     user_id: int
-    banned_by: int
+    banned_by: Optional[int]
     created_at: datetime
     updated_at: datetime
 
@@ -555,7 +604,7 @@ class EventCancellationResponse(EventCancellationBase):
     id: int
     event_id: int
     event_name: str
-    cancelled_by_user_id: int
+    cancelled_by_user_id: Optional[int]
     cancelled_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
@@ -575,6 +624,17 @@ class EventCancellationViewResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class BatchReadRequest(BaseModel):
+    """Batch mark-as-read/viewed: explicit IDs and/or everything up to a timestamp (both = AND)"""
+
+    ids: Optional[List[int]] = None
+    before: Optional[datetime] = None
+
+
+class BatchReadResponse(BaseModel):
+    updated_count: int
+
+
 # ========================================
 # User Contact Schemas
 # ========================================
@@ -593,10 +653,25 @@ class UserContactCreate(UserContactBase):
     pass
 
 
+class ContactSyncChunk(BaseModel):
+    """
+    One block of the device address book for delta sync.
+
+    The client sends a stable chunk_key and a digest of the chunk contents.
+    Contacts may be omitted: if the digest changed, the server reports the
+    chunk as stale so the client can resend it with its contacts.
+    """
+
+    chunk_key: str
+    digest: str
+    contacts: Optional[List[UserContactBase]] = None
+
+
 class UserContactSync(BaseModel):
     """Schema for syncing device contacts"""
 
-    contacts: List[UserContactBase]
+    contacts: List[UserContactBase] = []
+    chunks: Optional[List[ContactSyncChunk]] = None
 
 
 class UserContactSyncResponse(BaseModel):
@@ -605,6 +680,32 @@ class UserContactSyncResponse(BaseModel):
     synced_count: int
     registered_count: int
     registered_contacts: List[dict]
+    skipped_chunks: List[str] = []  # Digest unchanged since last sync
+    stale_chunks: List[str] = []  # Digest changed but contacts not sent
+
+
+class UserContactLinkResponse(BaseModel):
+    """Reverse contact index entry"""
+
+    id: int
+    registered_user_id: int
+    owner_id: int
+    is_mutual: bool
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ContactUserResponse(BaseModel):
+    """App user found through the contact index"""
+
+    id: int
+    display_name: str
+    phone: Optional[str] = None
+    profile_picture_url: Optional[str] = None
+    is_mutual: bool = False
+
+    model_config = ConfigDict(from_attributes=True)
 
 
 class UserContactResponse(BaseModel):
@@ -629,3 +730,71 @@ class WebhookUserRegistered(BaseModel):
 
     user_id: int
     phone: str
+
+
+# ============================================================================
+# COUNTER SCHEMAS
+# ============================================================================
+
+
+class EventCounterResponse(BaseModel):
+    """Denormalized counters of an event"""
+
+    event_id: int
+    joined_count: int
+    subscribed_count: int
+    invited_count: int
+    invited_accepted_count: int
+    invited_pending_count: int
+    invited_rejected_count: int
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class UserCounterResponse(BaseModel):
+    """Denormalized counters of a user (as event owner)"""
+
+    user_id: int
+    total_events_count: int
+    subscribers_count: int
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+# ============================================================================
+# ACCESS SCHEMAS
+# ============================================================================
+
+
+class EventAccessResponse(BaseModel):
+    """One way a user can see an event (see models.EventAccess)"""
+
+    user_id: int
+    event_id: int
+    via: str
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+# ============================================================================
+# BACKGROUND JOB SCHEMAS
+# ============================================================================
+
+
+class BackgroundJobResponse(BaseModel):
+    """Status and progress of a background job (see models.BackgroundJob)"""
+
+    id: str
+    kind: str
+    status: str
+    stage: Optional[str] = None
+    progress: int
+    total: Optional[int] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
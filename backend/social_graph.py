@@ -0,0 +1,442 @@
+"""
+In-memory social graph
+
+Compact weighted adjacency between users, used to rank invite suggestions
+and "people you may know" without joining contacts, groups and event
+interactions on every request.
+
+Each relation is a layer stored CSR-style in flat ``array`` buffers (stdlib,
+so no NumPy dependency): sorted user ids, row offsets, neighbour ids and edge
+multiplicities (e.g. number of shared groups). Layers:
+- contact: owner -> registered users in their address book (user_contact_links)
+- group: users sharing a group (members and owner), symmetric
+- event: users who both accepted the same event (invited/joined), symmetric
+
+Groups/events larger than MAX_CLIQUE_SIZE don't create edges (a public event
+with thousands of attendees says nothing about who knows whom). Blocks are not
+part of the graph: callers exclude user_block.blocked_set() (the single source
+of block state) from the results.
+
+Writes are captured by SQLAlchemy hooks during flush, stashed in
+``session.info`` and applied after commit (discarded on rollback) as row
+overrides on top of the CSR arrays, which compact() folds back. The graph is
+built from the database at startup and rebuilt periodically to repair
+anything written through bulk statements.
+"""
+
+import heapq
+import logging
+import os
+import threading
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event as sa_event
+from sqlalchemy import inspect, or_, select
+from sqlalchemy.orm import Session, object_session
+
+from models import Event, Group, GroupMembership, EventInteraction, UserContactLink
+
+logger = logging.getLogger(__name__)
+
+# Weight of one edge of each relation in the neighbour score
+RELATION_WEIGHTS = {"contact": 3.0, "group": 2.0, "event": 1.0}
+
+# Groups/events with more members than this don't create edges
+MAX_CLIQUE_SIZE = 200
+
+# Overridden rows per layer before they are folded back into the CSR arrays
+COMPACT_THRESHOLD = 10_000
+
+# Times the rows changed during a rebuild are reloaded before giving up (the next rebuild fixes the rest)
+MAX_CATCH_UP_ROUNDS = 3
+
+SOCIAL_GRAPH_REBUILD_INTERVAL_SECONDS = int(os.getenv("SOCIAL_GRAPH_REBUILD_INTERVAL_SECONDS", "1800"))
+
+ATTENDING_TYPES = ("invited", "joined")
+
+_PENDING_KEY = "social_graph_pending"
+
+
+class CSRLayer:
+    """Immutable CSR adjacency: row i of ids[i] is neighbours/counts[offsets[i]:offsets[i + 1]]"""
+
+    __slots__ = ("ids", "offsets", "neighbours", "counts")
+
+    def __init__(self, rows: Dict[int, Dict[int, int]]):
+        self.ids = array("q", sorted(user_id for user_id, row in rows.items() if row))
+        self.offsets = array("q", [0])
+        self.neighbours = array("q")
+        self.counts = array("l")
+        for user_id in self.ids:
+            row = rows[user_id]
+            self.neighbours.extend(row.keys())
+            self.counts.extend(row.values())
+            self.offsets.append(len(self.neighbours))
+
+    def row(self, user_id: int) -> Dict[int, int]:
+        i = bisect_left(self.ids, user_id)
+        if i == len(self.ids) or self.ids[i] != user_id:
+            return {}
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return dict(zip(self.neighbours[start:end], self.counts[start:end]))
+
+    def rows(self) -> Iterable[Tuple[int, Dict[int, int]]]:
+        for user_id in self.ids:
+            yield user_id, self.row(user_id)
+
+
+class RelationLayer:
+    """A CSR layer plus rows overridden by incremental updates"""
+
+    def __init__(self, rows: Optional[Dict[int, Dict[int, int]]] = None):
+        self._csr = CSRLayer(rows or {})
+        self._overrides: Dict[int, Dict[int, int]] = {}
+
+    def row(self, user_id: int) -> Dict[int, int]:
+        override = self._overrides.get(user_id)
+        return override if override is not None else self._csr.row(user_id)
+
+    def _writable_row(self, user_id: int) -> Dict[int, int]:
+        if user_id not in self._overrides:
+            self._overrides[user_id] = self._csr.row(user_id)
+        return self._overrides[user_id]
+
+    def adjust(self, a: int, b: int, delta: int) -> None:
+        row = self._writable_row(a)
+        count = row.get(b, 0) + delta
+        if count > 0:
+            row[b] = count
+        else:
+            row.pop(b, None)
+
+    def set_edge(self, a: int, b: int, count: int) -> None:
+        row = self._writable_row(a)
+        if count > 0:
+            row[b] = count
+        else:
+            row.pop(b, None)
+
+    def set_row(self, a: int, row: Dict[int, int]) -> None:
+        self._overrides[a] = dict(row)
+
+    def needs_compaction(self) -> bool:
+        return len(self._overrides) > COMPACT_THRESHOLD
+
+    def compact(self) -> None:
+        rows = dict(self._csr.rows())
+        rows.update(self._overrides)
+        self._csr = CSRLayer(rows)
+        self._overrides = {}
+
+
+class SocialGraph:
+    """Weighted user graph (contacts, shared groups, co-attendance)"""
+
+    def __init__(self):
+        self._layers: Dict[str, RelationLayer] = {name: RelationLayer() for name in RELATION_WEIGHTS}
+        self._lock = threading.RLock()
+        # (layer, user_id) rows changed while a build runs (None when not building)
+        self._dirty: Optional[Set[Tuple[str, int]]] = None
+        self.ready = False
+
+    # ------------------------------------------------------------------ build
+
+    def build(self, db: Session) -> None:
+        """
+        (Re)build the whole graph from the database.
+
+        Changes applied while the snapshot is read may be missing from it, so
+        the rows they touched are recomputed from the database after the swap
+        (absolute rows, so nothing is counted twice).
+
+        Args:
+            db: Database session
+        """
+        with self._lock:
+            self._dirty = set()
+        try:
+            rows = {name: _load_rows(db, name) for name in RELATION_WEIGHTS}
+            layers = {name: RelationLayer(layer_rows) for name, layer_rows in rows.items()}
+            with self._lock:
+                self._layers = layers
+                self.ready = True
+                dirty, self._dirty = self._dirty, set()
+
+            for _ in range(MAX_CATCH_UP_ROUNDS):
+                if not dirty:
+                    break
+                self._reload_rows(db, dirty)
+                with self._lock:
+                    dirty, self._dirty = self._dirty, set()
+            if dirty:
+                logger.warning(f"🕸️  Social graph: {len(dirty)} rows still changing after the rebuild (fixed by the next one)")
+        finally:
+            with self._lock:
+                self._dirty = None
+        logger.info(f"🕸️  Social graph built: {len(rows['contact'])} contact rows, {len(rows['group'])} group rows, {len(rows['event'])} event rows")
+
+    def _reload_rows(self, db: Session, dirty: Set[Tuple[str, int]]) -> None:
+        """Replace some rows with their current value in the database"""
+        by_layer: Dict[str, Set[int]] = defaultdict(set)
+        for name, user_id in dirty:
+            by_layer[name].add(user_id)
+        reloaded = {name: _load_rows(db, name, user_ids) for name, user_ids in by_layer.items()}
+        with self._lock:
+            for name, layer_rows in reloaded.items():
+                for user_id, row in layer_rows.items():
+                    self._layers[name].set_row(user_id, row)
+
+    def clear(self) -> None:
+        """Drop the graph (not ready until the next build)"""
+        with self._lock:
+            self._layers = {name: RelationLayer() for name in RELATION_WEIGHTS}
+            self.ready = False
+
+    # ---------------------------------------------------------------- updates
+
+    def apply(self, changes: List[tuple]) -> None:
+        """
+        Apply captured changes (see the hooks at the bottom of this module).
+
+        Change tuples:
+        - ("adjust", layer, a, b, delta)
+        - ("set_edge", layer, a, b, count)
+        - ("set_row", layer, a, {neighbour: count})
+        """
+        with self._lock:
+            for change in changes:
+                kind = change[0]
+                layer = self._layers[change[1]]
+                getattr(layer, kind)(*change[2:])
+                if self._dirty is not None:
+                    self._dirty.add((change[1], change[2]))
+            for layer in self._layers.values():
+                if layer.needs_compaction():
+                    layer.compact()
+
+    # ---------------------------------------------------------------- queries
+
+    def contacts_of(self, user_id: int) -> Set[int]:
+        """Registered users in a user's address book"""
+        with self._lock:
+            return set(self._layers["contact"].row(user_id))
+
+    def neighbours(self, user_id: int) -> Dict[int, float]:
+        """Weighted neighbours of a user (sum over relations)"""
+        scores: Dict[int, float] = defaultdict(float)
+        with self._lock:
+            for name, layer in self._layers.items():
+                weight = RELATION_WEIGHTS[name]
+                for neighbour, count in layer.row(user_id).items():
+                    scores[neighbour] += weight * count
+        scores.pop(user_id, None)
+        return scores
+
+    def top_neighbours(self, user_id: int, k: int, exclude: Optional[Set[int]] = None) -> List[Tuple[int, float]]:
+        """
+        Top-K weighted neighbours.
+
+        Args:
+            user_id: User ID
+            k: Number of neighbours
+            exclude: User IDs to leave out (e.g. user_block.blocked_set() and contacts)
+
+        Returns:
+            List of (user_id, score) ordered by score desc, then user id
+        """
+        skip = exclude or set()
+        candidates = ((neighbour, score) for neighbour, score in self.neighbours(user_id).items() if neighbour not in skip)
+        return heapq.nsmallest(k, candidates, key=lambda item: (-item[1], item[0]))
+
+
+def _load_rows(db: Session, layer: str, user_ids: Optional[Set[int]] = None) -> Dict[int, Dict[int, int]]:
+    """
+    Read the rows of a layer from the database.
+
+    Args:
+        db: Database session
+        layer: Layer name
+        user_ids: Only the rows of these users (every user gets a row, maybe empty); None for all
+
+    Returns:
+        {user_id: {neighbour: count}}
+    """
+    if layer == "contact":
+        links = select(UserContactLink.owner_id, UserContactLink.registered_user_id)
+        if user_ids is not None:
+            links = links.where(UserContactLink.owner_id.in_(user_ids))
+        rows: Dict[int, Dict[int, int]] = defaultdict(dict)
+        for owner_id, registered_user_id in db.execute(links):
+            rows[owner_id][registered_user_id] = 1
+
+    elif layer == "group":
+        groups = select(Group.id, Group.owner_id)
+        memberships = select(GroupMembership.group_id, GroupMembership.user_id)
+        if user_ids is not None:
+            # Every group the users are in (as members or owners)
+            member_of = select(GroupMembership.group_id).where(GroupMembership.user_id.in_(user_ids))
+            owned = select(Group.id).where(Group.owner_id.in_(user_ids))
+            groups = groups.where(or_(Group.id.in_(member_of), Group.id.in_(owned)))
+            memberships = memberships.where(or_(GroupMembership.group_id.in_(member_of), GroupMembership.group_id.in_(owned)))
+        members: Dict[int, Set[int]] = defaultdict(set)
+        for group_id, owner_id in db.execute(groups):
+            members[group_id].add(owner_id)
+        for group_id, user_id in db.execute(memberships):
+            members[group_id].add(user_id)
+        rows = _clique_rows(members.values())
+
+    else:
+        # Joined with events so soft-deleted events (hidden by the ORM criteria) are left out
+        attending = select(EventInteraction.event_id, EventInteraction.user_id).join(Event, Event.id == EventInteraction.event_id).where(EventInteraction.status == "accepted", EventInteraction.interaction_type.in_(ATTENDING_TYPES))
+        if user_ids is not None:
+            attended = select(EventInteraction.event_id).where(EventInteraction.user_id.in_(user_ids), EventInteraction.status == "accepted", EventInteraction.interaction_type.in_(ATTENDING_TYPES))
+            attending = attending.where(EventInteraction.event_id.in_(attended))
+        attendees: Dict[int, Set[int]] = defaultdict(set)
+        for event_id, user_id in db.execute(attending):
+            attendees[event_id].add(user_id)
+        rows = _clique_rows(attendees.values())
+
+    if user_ids is not None:
+        return {user_id: rows.get(user_id, {}) for user_id in user_ids}
+    return rows
+
+
+def _clique_rows(cliques: Iterable[Set[int]]) -> Dict[int, Dict[int, int]]:
+    """Symmetric co-membership counts for every pair inside each clique (large cliques skipped)"""
+    rows: Dict[int, Dict[int, int]] = defaultdict(dict)
+    for clique in cliques:
+        if len(clique) > MAX_CLIQUE_SIZE:
+            continue
+        for a in clique:
+            row = rows[a]
+            for b in clique:
+                if a != b:
+                    row[b] = row.get(b, 0) + 1
+    return rows
+
+
+# Singleton instance
+social_graph = SocialGraph()
+
+
+# ============================================================================
+# WRITE HOOKS
+# ============================================================================
+
+
+def stash_changes(db: Session, changes: List[tuple]) -> None:
+    """Queue graph changes on a session; applied after commit, dropped on rollback"""
+    if changes:
+        db.info.setdefault(_PENDING_KEY, []).extend(changes)
+
+
+def _stash_for(target, changes: List[tuple]) -> None:
+    db = object_session(target)
+    if db is not None:
+        stash_changes(db, changes)
+
+
+def _symmetric(layer: str, user_id: int, others: Iterable[int], delta: int) -> List[tuple]:
+    changes = []
+    for other in others:
+        if other != user_id:
+            changes.append(("adjust", layer, user_id, other, delta))
+            changes.append(("adjust", layer, other, user_id, delta))
+    return changes
+
+
+def stash_events_removed(db: Session, event_ids) -> None:
+    """
+    Queue dropping the co-attendance edges of events removed with bulk statements (no hooks fire).
+
+    Args:
+        db: Database session (changes are applied after its commit)
+        event_ids: Event IDs, or a SELECT of event IDs
+    """
+    attendees: Dict[int, Set[int]] = defaultdict(set)
+    # Joined with events: events already soft-deleted had their edges removed then
+    attending = select(EventInteraction.event_id, EventInteraction.user_id).join(Event, Event.id == EventInteraction.event_id).where(EventInteraction.event_id.in_(event_ids), EventInteraction.status == "accepted", EventInteraction.interaction_type.in_(ATTENDING_TYPES))
+    for event_id, user_id in db.execute(attending):
+        attendees[event_id].add(user_id)
+    stash_changes(db, [("adjust", "event", a, b, -count) for a, row in _clique_rows(attendees.values()).items() for b, count in row.items()])
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _apply_pending(session):
+    changes = session.info.pop(_PENDING_KEY, None)
+    if changes and social_graph.ready:
+        social_graph.apply(changes)
+
+
+@sa_event.listens_for(Session, "after_rollback")
+def _discard_pending(session):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def _group_membership_changed(connection, target, delta: int) -> None:
+    members = set(connection.scalars(select(GroupMembership.user_id).where(GroupMembership.group_id == target.group_id).limit(MAX_CLIQUE_SIZE + 1)))
+    members.update(connection.scalars(select(Group.owner_id).where(Group.id == target.group_id)))
+    members.discard(target.user_id)
+    if len(members) + 1 > MAX_CLIQUE_SIZE:
+        return
+    _stash_for(target, _symmetric("group", target.user_id, members, delta))
+
+
+@sa_event.listens_for(GroupMembership, "after_insert")
+def _group_membership_inserted(mapper, connection, target):
+    _group_membership_changed(connection, target, 1)
+
+
+@sa_event.listens_for(GroupMembership, "after_delete")
+def _group_membership_deleted(mapper, connection, target):
+    _group_membership_changed(connection, target, -1)
+
+
+def _is_attending(interaction_type: Optional[str], status: Optional[str]) -> bool:
+    return status == "accepted" and interaction_type in ATTENDING_TYPES
+
+
+def _attendance_changed(connection, target, delta: int) -> None:
+    attendees = set(connection.scalars(select(EventInteraction.user_id).where(EventInteraction.event_id == target.event_id, EventInteraction.status == "accepted", EventInteraction.interaction_type.in_(ATTENDING_TYPES)).limit(MAX_CLIQUE_SIZE + 2)))
+    attendees.discard(target.user_id)
+    if len(attendees) + 1 > MAX_CLIQUE_SIZE:
+        return
+    _stash_for(target, _symmetric("event", target.user_id, attendees, delta))
+
+
+@sa_event.listens_for(EventInteraction, "after_insert")
+def _interaction_inserted(mapper, connection, target):
+    if _is_attending(target.interaction_type, target.status):
+        _attendance_changed(connection, target, 1)
+
+
+@sa_event.listens_for(EventInteraction, "after_update")
+def _interaction_updated(mapper, connection, target):
+    state = inspect(target)
+    status_history = state.attrs.status.history
+    type_history = state.attrs.interaction_type.history
+    old_status = status_history.deleted[0] if status_history.deleted else target.status
+    old_type = type_history.deleted[0] if type_history.deleted else target.interaction_type
+    was_attending = _is_attending(old_type, old_status)
+    now_attending = _is_attending(target.interaction_type, target.status)
+    if was_attending != now_attending:
+        _attendance_changed(connection, target, 1 if now_attending else -1)
+
+
+@sa_event.listens_for(EventInteraction, "after_delete")
+def _interaction_deleted(mapper, connection, target):
+    if _is_attending(target.interaction_type, target.status):
+        _attendance_changed(connection, target, -1)
+
+
+@sa_event.listens_for(UserContactLink, "after_insert")
+def _contact_link_inserted(mapper, connection, target):
+    _stash_for(target, [("set_edge", "contact", target.owner_id, target.registered_user_id, 1)])
+
+
+@sa_event.listens_for(UserContactLink, "after_delete")
+def _contact_link_deleted(mapper, connection, target):
+    _stash_for(target, [("set_edge", "contact", target.owner_id, target.registered_user_id, 0)])
@@ -0,0 +1,162 @@
+"""
+Write-behind buffer
+
+Coalesces high-frequency, low-value timestamp updates (interaction read_at,
+user last_login, contact sync chunk last_synced_at) in memory instead of
+committing each one on the request path. Pending values are keyed by
+(target, row id), so repeated updates of the same row collapse into one.
+
+The buffer is flushed with one statement per target and batch:
+``UPDATE ... FROM (VALUES ...)`` on PostgreSQL, executemany elsewhere. Flushes
+happen every WRITE_BEHIND_FLUSH_INTERVAL_MS (background job), as soon as
+WRITE_BEHIND_MAX_ROWS rows are pending (in a helper thread) and on shutdown.
+A crash loses at most one interval / WRITE_BEHIND_MAX_ROWS of these updates.
+
+Updates are idempotent and monotonic: a target either keeps the first value
+written (read_at is only set while NULL) or only moves forward in time, so a
+late or repeated flush never overwrites newer data.
+"""
+
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from sqlalchemy import Integer, Table, bindparam, column, or_, update, values
+from sqlalchemy.orm import Session
+from sqlalchemy.types import TIMESTAMP
+
+from database import SessionLocal
+from models import EventInteraction, User, UserContactSyncChunk
+
+logger = logging.getLogger(__name__)
+
+WRITE_BEHIND_FLUSH_INTERVAL_MS = int(os.getenv("WRITE_BEHIND_FLUSH_INTERVAL_MS", "1000"))
+WRITE_BEHIND_MAX_ROWS = int(os.getenv("WRITE_BEHIND_MAX_ROWS", "1000"))
+
+# Rows per UPDATE statement (keeps bound parameters under psycopg limits)
+FLUSH_BATCH_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class WriteTarget:
+    """A timestamp column updated through the buffer"""
+
+    table: Table
+    column: str
+    # True: keep the first value (only set while NULL); False: keep the latest
+    first_wins: bool = False
+
+
+TARGETS: Dict[str, WriteTarget] = {
+    "interaction_read_at": WriteTarget(EventInteraction.__table__, "read_at", first_wins=True),
+    "user_last_login": WriteTarget(User.__table__, "last_login"),
+    "sync_chunk_last_synced_at": WriteTarget(UserContactSyncChunk.__table__, "last_synced_at"),
+}
+
+
+class WriteBehindBuffer:
+    """Per-process buffer of pending (target, row id) -> timestamp updates"""
+
+    def __init__(self, max_rows: int = WRITE_BEHIND_MAX_ROWS):
+        self.max_rows = max_rows
+        self._pending: Dict[Tuple[str, int], datetime] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def record(self, target: str, row_id: int, value: datetime) -> None:
+        """
+        Buffer an update of TARGETS[target] for one row.
+
+        Args:
+            target: Key of TARGETS
+            row_id: Primary key of the row
+            value: Timestamp to write (coalesced with a pending one)
+        """
+        first_wins = TARGETS[target].first_wins
+        key = (target, row_id)
+        with self._lock:
+            current = self._pending.get(key)
+            if current is None or (value < current if first_wins else value > current):
+                self._pending[key] = value
+            full = len(self._pending) >= self.max_rows
+
+        if full and not self._flush_lock.locked():
+            threading.Thread(target=self.flush_with_new_session, name="write_behind_flush", daemon=True).start()
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def clear(self) -> None:
+        """Drop pending updates without writing them"""
+        with self._lock:
+            self._pending.clear()
+
+    def flush(self, db: Session) -> int:
+        """
+        Write every pending update and commit.
+
+        On failure the updates are put back in the buffer (unless a newer value
+        was recorded meanwhile) and the error is raised.
+
+        Returns:
+            Number of buffered updates written
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+
+            by_target: Dict[str, List[Tuple[int, datetime]]] = {}
+            for (target, row_id), value in pending.items():
+                by_target.setdefault(target, []).append((row_id, value))
+
+            try:
+                for target, rows in by_target.items():
+                    for i in range(0, len(rows), FLUSH_BATCH_SIZE):
+                        _write_batch(db, TARGETS[target], rows[i : i + FLUSH_BATCH_SIZE])
+                db.commit()
+            except Exception:
+                db.rollback()
+                for (target, row_id), value in pending.items():
+                    self.record(target, row_id, value)
+                raise
+
+            return len(pending)
+
+    def flush_with_new_session(self) -> None:
+        """Flush with a session of its own (size trigger and shutdown); errors are logged"""
+        db = SessionLocal()
+        try:
+            self.flush(db)
+        except Exception:
+            logger.exception("❌ Write-behind flush failed")
+        finally:
+            db.close()
+
+
+def _write_batch(db: Session, target: WriteTarget, rows: List[Tuple[int, datetime]]) -> None:
+    table = target.table
+    col = table.c[target.column]
+
+    if db.get_bind().dialect.name == "postgresql":
+        data = values(column("id", Integer), column("value", TIMESTAMP(timezone=True)), name="write_behind").data(rows)
+        guard = col.is_(None) if target.first_wins else or_(col.is_(None), col < data.c.value)
+        db.execute(update(table).where(table.c.id == data.c.id, guard).values({target.column: data.c.value}))
+        return
+
+    guard = col.is_(None) if target.first_wins else or_(col.is_(None), col < bindparam("b_value"))
+    stmt = update(table).where(table.c.id == bindparam("b_id"), guard).values({target.column: bindparam("b_value")})
+    db.execute(stmt, [{"b_id": row_id, "b_value": value} for row_id, value in rows])
+
+
+write_behind = WriteBehindBuffer()
+
+
+def flush_write_behind(db: Session) -> None:
+    """Periodic job: flush the process buffer"""
+    write_behind.flush(db)